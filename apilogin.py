@@ -1,9 +1,14 @@
 import requests
+from fplhttp import client
 import re
 import secrets
 import hashlib
 import base64
 import uuid
+import json
+import os
+import tempfile
+import time
 
 
 URL = {
@@ -14,6 +19,11 @@ URL = {
         "resume": "https://account.premierleague.com/as/resume",
         "token": "https://account.premierleague.com/as/token",
 }
+CLIENT_ID = "bfcbaf69-aade-4c1b-8f00-c1cb8a193030"
+TOKEN_FILE = "fpl_tokens.json"
+# Seconds before the expiry of an access token after which it's renewed
+EXPIRY_MARGIN = 60
+PASSWORD_HASH_ITERATIONS = 200000
 
 
 def generate_code_verifier():
@@ -34,23 +44,95 @@ class Login:
         password: Password used for logging in
         team_id: Player's team ID
         access_token: Token needed to access API elements
+        token_store: The TokenStore the tokens are saved in
     """
-    def __init__(self, username, password):
-        self.username = ""
-        self.password = ""
+    def __init__(self, username, password, token_store=None):
+        self.username = username
+        self.password = password
         self.team_id = 0
         self.access_token = ""
 
+        if token_store is None:
+            token_store = TokenStore()
+        self.token_store = token_store
+        entry = token_store.load(username, password)
+        if entry is not None and entry["expires_at"] > time.time() + EXPIRY_MARGIN:
+            # The saved access token is still valid
+            self.access_token = entry["access_token"]
+            self.team_id = entry["team_id"]
+            return
+        if not self.renew("refresh"):
+            self.renew("sign_in")
+
+    def renew(self, method: str) -> bool:
+        """
+        Gets a new access token, after the saved one expired or was rejected by the API (the saved access token is
+        dropped first)
+
+        :param method: Option between 'refresh' (using the saved refresh token) and 'sign_in' (the full login)
+        :type method: str
+        :return: True if a new access token was saved, False if the refresh token is missing or was rejected
+        """
+        self.token_store.expire(self.username, self.password)
+        if method == "refresh":
+            entry = self.token_store.load(self.username, self.password)
+            if entry is None or not entry.get("refresh_token"):
+                return False
+            try:
+                token = self.refresh(entry["refresh_token"])
+            except (requests.exceptions.RequestException, KeyError, ValueError):
+                # The refresh token expired or was revoked, so the full login is needed
+                return False
+            self.team_id = entry["team_id"]
+        else:
+            token = self.sign_in(self.username, self.password)
+        self.access_token = token["access_token"]
+        self.token_store.save(self.username, self.password, token, self.team_id)
+        return True
+
+    @staticmethod
+    def refresh(refresh_token: str) -> dict:
+        """
+        Renews the access token with the refresh token (the 'offline_access' scope of the login)
+
+        :param refresh_token: The refresh token of the last login
+        :type refresh_token: str
+        :return: The JSON response of the token endpoint
+        """
+        response = client.post(
+            URL["token"],
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id": CLIENT_ID,
+            },
+        )
+        response.raise_for_status()
+        token = response.json()
+        if "refresh_token" not in token:
+            # The refresh token is kept when the server doesn't rotate it
+            token["refresh_token"] = refresh_token
+        return token
+
+    def sign_in(self, username, password) -> dict:
+        """
+        Logs in with the full PKCE flow and gets the team ID
+
+        :param username: E-mail used for logging in
+        :param password: Password used for logging in
+        :return: The JSON response of the token endpoint
+        """
         print("Authentication: ", end="")
         code_verifier = generate_code_verifier()  # code_verifier for PKCE
         code_challenge = generate_code_challenge(code_verifier)  # code_challenge from the code_verifier
         initial_state = uuid.uuid4().hex  # random initial state for the OAuth flow
 
-        session = requests.Session()
+        # Session with its own cookies for the login flow, using the shared connection pool
+        session = client.new_session()
 
         # Authorization
         payload_auth = {
-            "client_id": "bfcbaf69-aade-4c1b-8f00-c1cb8a193030",
+            "client_id": CLIENT_ID,
             "redirect_uri": "https://fantasy.premierleague.com/",
             "response_type": "code",
             "scope": "openid profile email offline_access",
@@ -58,7 +140,7 @@ class Login:
             "code_challenge": code_challenge,
             "code_challenge_method": "S256",
         }
-        auth = requests.post(URL["auth"], data=payload_auth)
+        auth = client.post(URL["auth"], data=payload_auth)
         auth.raise_for_status()
         auth_html = auth.text
 
@@ -73,15 +155,16 @@ class Login:
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
-        response = session.post(URL["start"], headers=headers)
+        response = client.post(URL["start"], session=session, headers=headers)
         response.raise_for_status()
         response_json = response.json()
         interaction_id = response_json["interactionId"]
 
         # Login
         print("Login: ", end="")
-        response = session.post(
+        response = client.post(
             URL["login"],
+            session=session,
             headers={
                 "interactionId": interaction_id,
             },
@@ -94,8 +177,9 @@ class Login:
         )
         response.raise_for_status()
 
-        response = session.post(
+        response = client.post(
             URL["login"],
+            session=session,
             headers={
                 "interactionId": interaction_id,
             },
@@ -120,9 +204,10 @@ class Login:
         response.raise_for_status()
         response_json = response.json()
 
-        response = session.post(
+        response = client.post(
             f"https://account.premierleague.com/davinci/connections/{response_json['connectionId']}/"
             f"capabilities/customHTMLTemplate",  # need to use new connectionId from prev response
+            session=session,
             headers=headers,
             json={
                 "id": response_json["id"],
@@ -143,8 +228,9 @@ class Login:
         dv_response = response.json()["dvResponse"]
 
         # Resume
-        response = session.post(
+        response = client.post(
             URL["resume"],
+            session=session,
             data={
                 "dvResponse": dv_response,
                 "state": new_state,
@@ -159,25 +245,148 @@ class Login:
 
         # Enter
         print("Accessing...")
-        response = session.post(
+        response = client.post(
             URL["token"],
+            session=session,
             data={
                 "grant_type": "authorization_code",
                 "redirect_uri": "https://fantasy.premierleague.com/",
                 "code": auth_code,
                 "code_verifier": code_verifier,
-                "client_id": "bfcbaf69-aade-4c1b-8f00-c1cb8a193030",
+                "client_id": CLIENT_ID,
             },
         )
         response.raise_for_status()
 
-        self.access_token = response.json()["access_token"]
-        response = session.get(
+        token = response.json()
+        self.access_token = token["access_token"]
+        response = client.get(
             "https://fantasy.premierleague.com/api/me/",
+            session=session,
             headers={"X-API-Authorization": f"Bearer {self.access_token}"})
         response.raise_for_status()
 
         self.team_id = response.json()["player"]["entry"]
+        return token
+
+
+class TokenStore:
+    """
+    Keeps the tokens and the team ID of every account on the disk, so that the login happens once per refresh token
+    lifetime. The accounts are keyed by a hash of the e-mail and the tokens are only given back for the same password
+    (checked against a salted hash)
+
+    Attributes:
+        path: The path of the token file
+    """
+    def __init__(self, path: str = TOKEN_FILE):
+        self.path = path
+
+    def read(self) -> dict:
+        """
+        Reads the token file
+
+        :return: A dictionary of the entry of every account
+        """
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def load(self, username, password):
+        """
+        Returns the saved entry of an account
+
+        :param username: E-mail used for logging in
+        :param password: Password used for logging in
+        :return: A dictionary of the entry (access_token, refresh_token, expires_at, team_id) or None if there is no
+        entry for the account and password
+        """
+        entry = self.read().get(account_key(username))
+        if entry is None or password_hash(password, entry["salt"]) != entry["password_hash"]:
+            return None
+        return entry
+
+    def save(self, username, password, token: dict, team_id: int) -> None:
+        """
+        Saves the tokens of an account (atomically and readable only by the user)
+
+        :param username: E-mail used for logging in
+        :param password: Password used for logging in
+        :param token: The JSON response of the token endpoint
+        :type token: dict
+        :param team_id: The team ID of the account
+        :type team_id: int
+        :return: None
+        """
+        entries = self.read()
+        salt = secrets.token_hex(16)
+        entries[account_key(username)] = {
+            "access_token": token["access_token"],
+            "refresh_token": token.get("refresh_token"),
+            "expires_at": time.time() + float(token.get("expires_in", 0)),
+            "team_id": team_id,
+            "salt": salt,
+            "password_hash": password_hash(password, salt),
+        }
+        self.write(entries)
+
+    def expire(self, username, password) -> None:
+        """
+        Drops the saved access token of an account (e.g. after the API rejected it), keeping the refresh token
+
+        :param username: E-mail used for logging in
+        :param password: Password used for logging in
+        :return: None
+        """
+        if self.load(username, password) is None:
+            return None
+        entries = self.read()
+        entries[account_key(username)].update({"access_token": "", "expires_at": 0})
+        self.write(entries)
+
+    def write(self, entries: dict) -> None:
+        """
+        Writes the token file (atomically and readable only by the user)
+
+        :param entries: The dictionary of the entry of every account
+        :type entries: dict
+        :return: None
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(entries, file, indent=4)
+            os.chmod(temporary_path, 0o600)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+def account_key(username) -> str:
+    """
+    Returns the key of an account in the token file
+
+    :param username: E-mail used for logging in
+    :return: A string of the hash of the e-mail
+    """
+    return hashlib.sha256(username.strip().lower().encode()).hexdigest()
+
+
+def password_hash(password, salt: str) -> str:
+    """
+    Hashes a password for checking it against the saved one
+
+    :param password: Password used for logging in
+    :param salt: The salt of the account's entry
+    :type salt: str
+    :return: A string of the hash
+    """
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), PASSWORD_HASH_ITERATIONS).hex()
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import random
+import timeit
+import numpy as np
+import pandas as pd
+from fplapi import fdr_matrix, TOTAL_GW_NUMBER
+
+
+def synthetic_fixtures(seed: int = 0) -> tuple:
+    """
+    Creates a season of fixtures similar to the ones of the FPL API (with blank and double Gameweeks)
+
+    :param seed: The seed of the random values
+    :type seed: int
+    :return: A tuple of the fixtures and the teams dataframes
+    """
+    rng = random.Random(seed)
+    teams = pd.DataFrame({"id": range(1, 21), "short_name": [f"T{team_id:02d}" for team_id in range(1, 21)]})
+    fixtures = []
+    for gw in range(1, TOTAL_GW_NUMBER + 1):
+        team_ids = list(range(1, 21))
+        rng.shuffle(team_ids)
+        pairs = [(team_ids[i], team_ids[i + 1]) for i in range(0, 20, 2)]
+        if gw in (25, 33):
+            # Double Gameweeks
+            pairs += [(team_a, team_h) for team_h, team_a in pairs[:4]]
+        for team_h, team_a in pairs:
+            fixtures.append({
+                "id": len(fixtures) + 1,
+                # Postponed fixtures don't have a Gameweek yet
+                "event": None if rng.random() < 0.02 else gw,
+                "team_h": team_h,
+                "team_a": team_a,
+                "team_h_difficulty": rng.randint(2, 5),
+                "team_a_difficulty": rng.randint(2, 5),
+            })
+    return pd.json_normalize(fixtures), teams
+
+
+def fdr_matrix_loops(fixtures: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    The nested loops FPLapi.fpl_fdr used before fdr_matrix (kept for comparison)
+
+    :param fixtures: The dataframe of the fixtures endpoint
+    :type fixtures: pd.DataFrame
+    :param teams: The dataframe of the teams from bootstrap-static
+    :type teams: pd.DataFrame
+    :return: A dataframe of the FDR per team and Gameweek
+    """
+    column_names = ["team"]
+    for i in range(TOTAL_GW_NUMBER):
+        column_names.append(f"gw{i+1}")
+
+    data = []
+    for team in teams["short_name"]:
+        team_list = [team]
+        gw_count = []
+        for i in fixtures["id"]:
+            if (
+                fixtures["team_a"][fixtures.index[i == fixtures["id"]].tolist()[0]]
+                == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
+                and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]]) is False
+            ):
+                if fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]] in gw_count:
+                    extra_game_fdr = fixtures["team_a_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
+                    team_list[-1] = team_list[-1] * extra_game_fdr / (team_list[-1] + extra_game_fdr)
+                else:
+                    team_list.append(fixtures["team_a_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]])
+                    gw_count.append(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
+            elif (
+                fixtures["team_h"][fixtures.index[i == fixtures["id"]].tolist()[0]]
+                == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
+                and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]]) is False
+            ):
+                if fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]] in gw_count:
+                    extra_game_fdr = fixtures["team_h_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
+                    team_list[-1] = team_list[-1] * extra_game_fdr / (team_list[-1] + extra_game_fdr)
+                else:
+                    team_list.append(fixtures["team_h_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]])
+                    gw_count.append(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
+        for n in range(1, 39):
+            if n not in gw_count:
+                team_list.insert(n, np.nan)
+                gw_count.insert(n - 1, n)
+        data.append(team_list)
+    return pd.DataFrame(data, columns=column_names)
+
+
+def benchmark_fdr(number: int = 3) -> None:
+    """
+    Checks that fdr_matrix gives the same table as the nested loops and prints the speedup
+
+    :param number: The number of runs timed for each builder
+    :type number: int
+    :return: None
+    """
+    fixtures, teams = synthetic_fixtures()
+    pd.testing.assert_frame_equal(fdr_matrix(fixtures, teams), fdr_matrix_loops(fixtures, teams))
+
+    loops_time = timeit.timeit(lambda: fdr_matrix_loops(fixtures, teams), number=number) / number
+    matrix_time = timeit.timeit(lambda: fdr_matrix(fixtures, teams), number=number) / number
+    print(f"FDR table ({len(fixtures)} fixtures)")
+    print(f"Nested loops: {loops_time * 1000:.1f} ms")
+    print(f"fdr_matrix:   {matrix_time * 1000:.1f} ms")
+    print(f"Speedup:      {loops_time / matrix_time:.0f}x")
+
+
+if __name__ == "__main__":
+    np.set_printoptions(legacy="1.25")
+    benchmark_fdr()
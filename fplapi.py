@@ -1,11 +1,155 @@
 import requests
 import numpy as np
 import pandas as pd
+import os
+import threading
+import time
 from functools import cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from apilogin import Login
+from fplcache import ResponseCache
+from fplhttp import client
 from datetime import datetime
 
 TOTAL_GW_NUMBER = 38
+MAX_CONCURRENT_REQUESTS = 8
+REQUESTS_PER_SECOND = 20
+# Seconds a cached response is used without asking the server (afterwards it's revalidated with a conditional request)
+CACHE_TTL = {
+    "bootstrap-static/": 300,
+    "fixtures": 3600,
+    "element-summary/": 3600,
+}
+DEFAULT_CACHE_TTL = 300
+# Status codes of a rejected access token
+AUTH_ERROR_CODES = (401, 403)
+
+
+class TokenBucket:
+    """
+    Token bucket used for limiting the rate of the requests sent to the FPL API (shared between threads)
+
+    Attributes:
+        rate: Float of the tokens added to the bucket per second
+        capacity: Float of the maximum number of tokens the bucket holds (the size of a burst of requests)
+        tokens: Float of the tokens currently in the bucket
+        last_time: Float of the last time the bucket was refilled
+        lock: Lock used for sharing the bucket between threads
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate: float) -> None:
+        """
+        Changes the rate (and the burst size) of the bucket
+
+        :param rate: The new number of requests per second
+        :type rate: float
+        :return: None
+        """
+        with self.lock:
+            self.rate = rate
+            self.capacity = rate
+            self.tokens = min(self.tokens, self.capacity)
+
+    def acquire(self) -> None:
+        """
+        Takes a token from the bucket, waiting until one is available
+
+        :return: None
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_time) * self.rate)
+                self.last_time = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return None
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Rate limiter shared by the public API requests of every thread (the connections come from the fplhttp client)
+rate_limiter = TokenBucket(REQUESTS_PER_SECOND, REQUESTS_PER_SECOND)
+# Responses kept on disk between runs (FPL_OFFLINE=1 serves the cache without touching the network)
+response_cache = ResponseCache(offline=os.environ.get("FPL_OFFLINE", "") == "1")
+
+
+def cache_ttl(url: str) -> float:
+    """
+    Returns the number of seconds the response of an endpoint stays fresh in the cache
+
+    :param url: The full URL of the endpoint
+    :type url: str
+    :return: A float of seconds
+    """
+    for endpoint, ttl in CACHE_TTL.items():
+        if f"/api/{endpoint}" in url:
+            return ttl
+    return DEFAULT_CACHE_TTL
+
+
+def get_json(url: str):
+    """
+    Requests a public FPL API endpoint through the shared client. Fresh responses are served from the disk cache,
+    stale ones are revalidated with a conditional request (a 304 response is served from the disk). The requests are
+    rate limited and the client retries them with an exponential backoff when the server is throttling (429) or
+    failing (5xx)
+
+    :param url: The full URL of the endpoint
+    :type url: str
+    :return: The decoded JSON response
+    """
+    entry = response_cache.load(url)
+    if entry is not None and response_cache.is_fresh(entry):
+        return entry["body"]
+    if response_cache.offline:
+        raise requests.exceptions.ConnectionError(f"There is no cached response for {url} (offline mode)")
+    ttl = cache_ttl(url)
+    headers = response_cache.conditional_headers(entry)
+
+    response = client.get(url, headers=headers, verify=True, rate_limiter=rate_limiter)
+    if response.status_code == 304 and entry is not None:
+        response_cache.refresh(entry, ttl)
+        return entry["body"]
+    response.raise_for_status()
+    body = response.json()
+    response_cache.store(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"), ttl)
+    return body
+
+
+class BootstrapStatic:
+    """
+    Holds a snapshot of the bootstrap-static endpoint of the FPL API, parsed once and shared by every consumer
+
+    Attributes:
+        elements: The dataframe of the players
+        teams: The dataframe of the Premier League teams
+        element_types: The dataframe of the player positions
+        events: The dataframe of the Gameweeks
+    """
+    def __init__(self, data: dict):
+        self.elements = pd.json_normalize(data["elements"])
+        self.teams = pd.json_normalize(data["teams"])
+        self.element_types = pd.json_normalize(data["element_types"])
+        self.events = pd.json_normalize(data["events"])
+
+
+@cache
+def bootstrap_static() -> BootstrapStatic:
+    """
+    Gets the bootstrap-static snapshot of the session. The multi-MB payload is downloaded and parsed only once and
+    the raw JSON is dropped after parsing
+
+    :return: The BootstrapStatic snapshot
+    """
+    base_url = "https://fantasy.premierleague.com/api/"
+    return BootstrapStatic(get_json(f"{base_url}bootstrap-static/"))
 
 
 @cache
@@ -19,10 +163,12 @@ class FPLapi:
         main_df: The main dataframe with all the player stats
         fixtures_df: The dataframe containing the info on the FDR per team
         team_id: The teams id we get after entering the log-in information
+        team: The TeamSnapshot of the user's team (requested once with team_snapshot)
     """
     def __init__(self, username, password):
         self.apilogin = Login(username, password)
         self.team_id = self.apilogin.team_id
+        self.team = None
 
         pd.set_option("display.max_columns", None)
         self.main_df = self.fpl_player_stats()
@@ -35,13 +181,11 @@ class FPLapi:
 
         :return: A dataframe containing players' FPL information
         """
-        # Requesting data from www.premierleague.com and transforming into usable Dataframe
-        base_url = "https://fantasy.premierleague.com/api/"
-        r = requests.get(f"{base_url}bootstrap-static/", verify=True).json()
-
-        players = pd.json_normalize(r["elements"])
-        teams = pd.json_normalize(r["teams"])
-        positions = pd.json_normalize(r["element_types"])
+        # Transforming the bootstrap-static data from www.premierleague.com into usable Dataframe
+        snapshot = bootstrap_static()
+        players = snapshot.elements
+        teams = snapshot.teams
+        positions = snapshot.element_types
 
         players = players.rename(columns={"team": "team_id"})
         teams_df = teams[["id", "short_name"]]
@@ -72,116 +216,273 @@ class FPLapi:
         """
         np.set_printoptions(legacy="1.25")
         base_url = "https://fantasy.premierleague.com/api/"
-        r = requests.get(f"{base_url}fixtures", verify=True).json()
-        r_2 = requests.get(f"{base_url}bootstrap-static/", verify=True).json()
+        r = get_json(f"{base_url}fixtures")
 
         fixtures = pd.json_normalize(r)
-        teams = pd.json_normalize(r_2["teams"])
-
-        column_names = ["team"]
-        for i in range(TOTAL_GW_NUMBER):
-            column_names.append(f"gw{i+1}")
-
-        data = []
-        for team in teams["short_name"]:
-            team_list = [team]
-            gw_count = []
-            for i in fixtures["id"]:
-                if (
-                    fixtures["team_a"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
-                    and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]]) is False
-                ):
-                    if fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]] in gw_count:
-                        extra_game_fdr = fixtures["team_a_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                        team_list[-1] = team_list[-1] * extra_game_fdr / (team_list[-1] + extra_game_fdr)
-                    else:
-                        team_list.append(fixtures["team_a_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-                        gw_count.append(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-                elif (
-                    fixtures["team_h"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
-                    and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]]) is False
-                ):
-                    if fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]] in gw_count:
-                        extra_game_fdr = fixtures["team_h_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                        team_list[-1] = team_list[-1] * extra_game_fdr / (team_list[-1] + extra_game_fdr)
-                    else:
-                        team_list.append(fixtures["team_h_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-                        gw_count.append(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-            for n in range(1, 39):
-                if n not in gw_count:
-                    team_list.insert(n, np.nan)
-                    gw_count.insert(n - 1, n)
-                    # Temporary comment of code that might be useful in future bug (predictions were made...)
-                    # for i in fixtures["id"]:
-                    #     if (
-                    #         fixtures["team_a"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    #         == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
-                    #         and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-                    #     ):
-                    #         team_list.pop(n)
-                    #         team_list.insert(
-                    #             n, fixtures["team_a_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    #         )
-                    #     elif (
-                    #           fixtures["team_h"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    #           == teams["id"][teams.index[team == teams["short_name"]].tolist()[0]]
-                    #           and pd.isna(fixtures["event"][fixtures.index[i == fixtures["id"]].tolist()[0]])
-                    #     ):
-                    #         team_list.pop(n)
-                    #         team_list.insert(
-                    #             n, fixtures["team_h_difficulty"][fixtures.index[i == fixtures["id"]].tolist()[0]]
-                    #         )
-            data.append(team_list)
-        self.fixtures_df = pd.DataFrame(data, columns=column_names)
+        teams = bootstrap_static().teams
+
+        self.fixtures_df = fdr_matrix(fixtures, teams)
         return self.fixtures_df
 
-    # @cache
+    def team_snapshot(self, refresh: bool = False) -> "TeamSnapshot":
+        """
+        Gets the snapshot of the user's team. The my-team endpoint is requested once per session and every consumer
+        shares the result
+
+        :param refresh: True for requesting the team again (e.g. after making transfers on the official site)
+        :type refresh: bool
+        :return: The TeamSnapshot of the user's team
+        """
+        if self.team is None or refresh:
+            response_team = self.authorized_get(f"https://fantasy.premierleague.com/api/my-team/{self.team_id}")
+            response_team.raise_for_status()
+            self.team = TeamSnapshot(response_team.json())
+        return self.team
+
+    def authorized_get(self, url: str):
+        """
+        Requests an endpoint that needs the login. When the access token is rejected (it was revoked or expired
+        early), it's renewed with the refresh token and then with a new login before giving up
+
+        :param url: The full URL of the endpoint
+        :type url: str
+        :return: The response of the last request
+        """
+        response = client.get(url, headers={"X-API-Authorization": f"Bearer {self.apilogin.access_token}"})
+        for method in ("refresh", "sign_in"):
+            if response.status_code not in AUTH_ERROR_CODES:
+                break
+            if self.apilogin.renew(method):
+                response = client.get(url, headers={"X-API-Authorization": f"Bearer {self.apilogin.access_token}"})
+        return response
+
+    def refresh_team(self) -> "TeamSnapshot":
+        """
+        Requests the user's team again and replaces the snapshot of the session
+
+        :return: The new TeamSnapshot
+        """
+        return self.team_snapshot(refresh=True)
+
     def get_team(self, username, password) -> dict:
         """
-        Gets information from the player's team id
+        Gets information from the player's team id (from the snapshot of the session). The selling prices aren't
+        written to the main_df, which is shared by every session (see FPLstats.set_prices)
 
         :return: A dictionary containing information on the user's FPL team
         """
-        session = requests.Session()
+        return self.team_snapshot().as_dict()
 
-        response_team = session.get(
-            f"https://fantasy.premierleague.com/api/my-team/{self.team_id}",
-            headers={
-                "X-API-Authorization": f"Bearer {FPLapi(username, password).apilogin.access_token}",
-            }
-        )
-        response_team_json = response_team.json()
-        picks = pd.json_normalize(response_team_json["picks"])
-        transfers = pd.json_normalize(response_team_json["transfers"])
-
-        element_prices = []
-        for price in picks["selling_price"]:
-            element_prices.append(price / 10)
-
-        team_dict = {
-            "total_budget": picks["selling_price"].sum() / 10 + (transfers["bank"][0] / 10),
-            "starters_budget": picks["selling_price"].sum() / 10 - picks["selling_price"][11:15].sum() / 10,
-            "changes_budget": sum([picks["selling_price"][11], picks["selling_price"][12], picks["selling_price"][13],
-                                   picks["selling_price"][14]]) / 10,
-            "bank_budget": transfers["bank"][0] / 10,
-            "team_elements": [element for element in picks["element"]],
-            "starters_prices": [price for price in element_prices[0:11]],
-            "changes_prices": [price for price in element_prices[11:15]]
+
+class TeamSnapshot:
+    """
+    Holds a snapshot of the user's team from the my-team endpoint of the FPL API. The first 11 picks are the starters
+    and the last 4 the substitutes
+
+    Attributes:
+        team_elements: List of the player IDs of the picks
+        prices: List of the selling prices of the picks (in millions)
+        bank_budget: Float of the money in the bank (in millions)
+        total_budget: Float of the selling prices of the team plus the bank
+        starters_budget: Float of the selling prices of the starters
+        changes_budget: Float of the selling prices of the substitutes
+        starters_prices: List of the selling prices of the starters
+        changes_prices: List of the selling prices of the substitutes
+    """
+    def __init__(self, data: dict):
+        picks = pd.json_normalize(data["picks"])
+        transfers = pd.json_normalize(data["transfers"])
+
+        self.team_elements: list = picks["element"].astype(int).tolist()
+        self.prices: list = (picks["selling_price"] / 10).tolist()
+        self.bank_budget: float = transfers["bank"][0] / 10
+        self.starters_prices: list = self.prices[0:11]
+        self.changes_prices: list = self.prices[11:15]
+        self.starters_budget: float = picks["selling_price"][0:11].sum() / 10
+        self.changes_budget: float = picks["selling_price"][11:15].sum() / 10
+        self.total_budget: float = picks["selling_price"].sum() / 10 + self.bank_budget
+
+    def selling_prices(self) -> dict:
+        """
+        Returns the selling price of every player of the team
+
+        :return: A dictionary of the selling price of every player ID
+        """
+        return dict(zip(self.team_elements, self.prices))
+
+    def as_dict(self) -> dict:
+        """
+        Returns the snapshot in the dictionary form of the get_team method
+
+        :return: A dictionary containing information on the user's FPL team
+        """
+        return {
+            "total_budget": self.total_budget,
+            "starters_budget": self.starters_budget,
+            "changes_budget": self.changes_budget,
+            "bank_budget": self.bank_budget,
+            "team_elements": list(self.team_elements),
+            "starters_prices": list(self.starters_prices),
+            "changes_prices": list(self.changes_prices),
         }
-        # Changing the player cost in the main_df based on the selling price we get from the API
-        # The functionality of changing the main_df here is based on the fact that the info of the main_df is stored in
-        # the cache and the fpl_player_stats function just calls the result from there without running again
-        # (a bit of cheating someone might say... *sips tea sardonically*)
-        for element in team_dict["team_elements"]:
-            self.main_df.loc[self.main_df.index[self.main_df["id_x"] == element], ["cost"]] = (
-                element_prices[team_dict["team_elements"].index(element)]
-            )
-        return team_dict
+
+
+def harmonic_fdr(fdr_values: pd.Series) -> float:
+    """
+    Combines the FDR of the fixtures of a team in the same Gameweek (double Gameweeks) in the order they are played
+
+    :param fdr_values: The FDR values of the fixtures
+    :type fdr_values: pd.Series
+    :return: The combined FDR
+    """
+    fdr_values = fdr_values.tolist()
+    fdr_final = fdr_values[0]
+    for fdr_value in fdr_values[1:]:
+        fdr_final = fdr_final * fdr_value / (fdr_final + fdr_value)
+    return fdr_final
+
+
+def fdr_matrix(fixtures: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the team x Gameweek FDR table from the fixtures in one pass. Double Gameweeks are combined with the harmonic
+    formula and blank Gameweeks are left as NaN
+
+    :param fixtures: The dataframe of the fixtures endpoint
+    :type fixtures: pd.DataFrame
+    :param teams: The dataframe of the teams from bootstrap-static
+    :type teams: pd.DataFrame
+    :return: A dataframe of the FDR per team (rows) and Gameweek (gw1...gw38 columns)
+    """
+    column_names = [f"gw{i + 1}" for i in range(TOTAL_GW_NUMBER)]
+    scheduled = fixtures[fixtures["event"].notna()].reset_index(drop=True)
+
+    # One row per team and fixture, keeping the order of the fixtures for the double Gameweeks
+    team_fixtures = pd.concat([
+        pd.DataFrame({
+            "order": scheduled.index,
+            "team_id": scheduled[f"team_{side}"],
+            "event": scheduled["event"].astype(int),
+            "fdr": scheduled[f"team_{side}_difficulty"],
+        })
+        for side in ["a", "h"]
+    ]).sort_values("order", kind="stable")
+
+    fdr_groups = team_fixtures.groupby(["team_id", "event"])["fdr"]
+    fixture_count = fdr_groups.size().unstack()
+    fdr_table = fdr_groups.first().unstack()
+    double_gws = fixture_count > 1
+    if double_gws.any().any():
+        fdr_table = fdr_table.astype(float)
+        double_gw_list = double_gws.stack()
+        for team_id, event in double_gw_list[double_gw_list].index:
+            fdr_table.loc[team_id, event] = harmonic_fdr(fdr_groups.get_group((team_id, event)))
+
+    gw_numbers = list(range(1, TOTAL_GW_NUMBER + 1))
+    fdr_table = fdr_table.reindex(index=teams["id"], columns=gw_numbers)
+    double_columns = double_gws.reindex(columns=gw_numbers, fill_value=False).any()
+    for gw in gw_numbers:
+        # Gameweeks without blanks or doubles keep the integer FDR values
+        if not double_columns[gw] and fdr_table[gw].notna().all():
+            fdr_table[gw] = fdr_table[gw].astype(fixtures["team_h_difficulty"].dtype)
+    fdr_table.columns = column_names
+    fdr_table.insert(0, "team", teams["short_name"].to_numpy())
+    return fdr_table.reset_index(drop=True)
+
+
+def fpl_player_summary(player_id: int) -> pd.DataFrame:
+    """
+    Gets the full history of a player for the current season from the element-summary payload
+
+    :param player_id: The player's ID on the FPL API
+    :type player_id: int
+    :return: A dataframe of the player's history with one row per fixture played
+    """
+    base_url = "https://fantasy.premierleague.com/api/"
+    r = get_json(f"{base_url}element-summary/{player_id}")
+    return pd.json_normalize(r["history"])
 
 
 @cache
+def fpl_player_history_all(player_id: int) -> dict:
+    """
+    Gets data from every previous Gameweek for a player from a single element-summary request (the result is cached,
+    so the payload is downloaded only once per player)
+
+    :param player_id: The player's ID on the FPL API
+    :type player_id: int
+    :return: A dictionary of the values used for factor point calculation keyed by Gameweek (only the Gameweeks the
+    player has a fixture in are included)
+    """
+    history = fpl_player_summary(player_id)
+    if "round" not in history.columns:
+        return {}
+
+    # One row per Gameweek (double Gameweeks are summed, the first fixture gives the date and the cost)
+    rounds = history.groupby("round", sort=True).agg(
+        date=("kickoff_time", "first"),
+        gw_points=("total_points", "sum"),
+        bonus=("bonus", "sum"),
+        value=("value", "first"),
+    )
+    # Filling the blank Gameweeks so that cumulative and rolling sums are calculated over Gameweeks and not fixtures
+    gw_range = pd.RangeIndex(1, max(TOTAL_GW_NUMBER, int(rounds.index.max())) + 1)
+    gw_points = rounds["gw_points"].reindex(gw_range, fill_value=0)
+    total_points = gw_points.cumsum()
+    form_points = gw_points.rolling(5, min_periods=1).sum()
+    bonus = rounds["bonus"].reindex(gw_range, fill_value=0).cumsum()
+
+    player_id = history["element"][0]
+    player_history = {}
+    for fixture in rounds.index:
+        fixture = int(fixture)
+        fixture_total = total_points[fixture]
+        if fixture <= 5:
+            form = fixture_total / fixture
+        else:
+            form = form_points[fixture] / 5
+        cost = rounds["value"][fixture] / 10
+        player_history[fixture] = {
+            "id": player_id,
+            "date": rounds["date"][fixture],
+            "gw": fixture,
+            "gw_points": gw_points[fixture],
+            "total_points": round(fixture_total, 1),
+            "ppg": round(fixture_total / fixture, 1),
+            "form": round(form, 1),
+            "value_season": round(fixture_total / cost, 1),
+            "bonus": round(bonus[fixture] + fixture, 1),
+        }
+    return player_history
+
+
+def fetch_player_histories(player_ids: list, max_workers: int = MAX_CONCURRENT_REQUESTS,
+                           requests_per_second: float = None):
+    """
+    Downloads the history of many players concurrently. The results are given back as soon as they arrive (in the
+    order the requests finish), while the rest of the requests keep running in the background
+
+    :param player_ids: The players' IDs on the FPL API
+    :type player_ids: list
+    :param max_workers: The maximum number of requests running at the same time
+    :type max_workers: int
+    :param requests_per_second: The rate limit of the requests while the histories are downloaded (the shared rate
+    limit is kept if not given)
+    :type requests_per_second: float
+    :return: A generator of tuples of the player ID and the dictionary of fpl_player_history_all
+    """
+    previous_rate = rate_limiter.rate
+    if requests_per_second is not None:
+        rate_limiter.set_rate(requests_per_second)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fpl_player_history_all, int(player_id)): player_id for player_id in player_ids}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    finally:
+        # The rate of the other requests isn't changed
+        rate_limiter.set_rate(previous_rate)
+
+
 def fpl_player_history(player_id: int, fixture: int) -> dict:
     """
     Gets data from previous Gameweeks for a player
@@ -192,43 +493,9 @@ def fpl_player_history(player_id: int, fixture: int) -> dict:
     :type fixture: int
     :return: A dictionary of values used for factor point calculation
     """
-    pd.set_option("display.max_columns", None)
-    np.set_printoptions(legacy="1.25")
-
-    base_url = "https://fantasy.premierleague.com/api/"
-    r = requests.get(f"{base_url}element-summary/{player_id}", verify=True).json()
-    history = pd.json_normalize(r["history"])
-
-    try:
-        date = history[history["round"] == fixture]["kickoff_time"].tolist()[0]
-        gw = history[history["round"] == fixture]["round"].tolist()[0]
-        fixture_points = history[history["round"] == fixture]["total_points"].sum()
-        total_points = history[history["round"] <= fixture]["total_points"].sum()
-        points_per_game = total_points / fixture
-        form = 0
-        if fixture <= 5:
-            form = total_points / fixture
-        elif fixture > 5:
-            form_points = history[(history["round"] <= fixture)
-                                  & (history["round"] > fixture - 5)]["total_points"].sum()
-            form = form_points / 5
-        cost = history[history["round"] == fixture]["value"].tolist()[0] / 10
-        value_season = total_points / cost
-        bonus = history[history["round"] <= fixture]["bonus"].sum() + fixture
-
-        player_history_stats = {
-            "id": history["element"][0],
-            "date": date,
-            "gw": gw,
-            "gw_points": fixture_points,
-            "total_points": round(total_points, 1),
-            "ppg": round(points_per_game, 1),
-            "form": round(form, 1),
-            "value_season": round(value_season, 1),
-            "bonus": round(bonus, 1),
-        }
-    except KeyError:
-        player_history_stats = {
+    player_history = fpl_player_history_all(player_id)
+    if len(player_history) == 0:
+        return {
             "id": player_id,
             "date": datetime.min,
             "gw": 0,
@@ -239,8 +506,10 @@ def fpl_player_history(player_id: int, fixture: int) -> dict:
             "value_season": 0,
             "bonus": 0,
         }
-
-    return player_history_stats
+    if fixture not in player_history:
+        # The player had no fixture in the given Gameweek
+        raise IndexError(f"No fixture in GW{fixture} for player {player_id}")
+    return player_history[fixture]
 
 
 @cache
@@ -254,15 +523,8 @@ def check_status(username: str, password: str) -> None:
     :type password: str
     :return: None
     """
-    session = requests.Session()
-
-    response_team = session.get(
-        f"https://fantasy.premierleague.com/api/my-team/{FPLapi(username, password).team_id}",
-        headers={
-            "X-API-Authorization": f"Bearer {FPLapi(username, password).apilogin.access_token}",
-        }
-    )
-    response_team.raise_for_status()
+    # The snapshot of the team is kept for the rest of the session
+    FPLapi(username, password).team_snapshot()
 
 
 @cache
@@ -272,10 +534,7 @@ def gw_played() -> int:
 
     :return: An integer of the last Gameweek played
     """
-    base_url = "https://fantasy.premierleague.com/api/"
-    r = requests.get(f"{base_url}bootstrap-static/", verify=True).json()
-
-    events = pd.json_normalize(r["events"])
+    events = bootstrap_static().events
 
     last_gw = 0
     for n in events["id"]:
@@ -286,6 +545,19 @@ def gw_played() -> int:
     return last_gw
 
 
+def finished_gameweeks() -> dict:
+    """
+    Returns the Gameweeks that are finished and whose data has been checked by the FPL
+
+    :return: A dictionary of the deadline of every finished Gameweek
+    """
+    events = bootstrap_static().events
+    finished = events["finished"].astype(bool)
+    if "data_checked" in events.columns:
+        finished &= events["data_checked"].astype(bool)
+    return dict(zip(events["id"][finished].astype(int).tolist(), events["deadline_time"][finished].tolist()))
+
+
 # if __name__ == "__main__":
 #     print(fpl_player_history(713, 1))
     # print(FPLapi(username, password).fpl_player_stats())
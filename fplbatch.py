@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from getpass import getpass
+from multiprocessing import freeze_support
+
+import numpy as np
+
+import fplapi
+import fplfactors
+import fploptimizer
+import fpltransfers
+from fplsquad import SquadState
+from fplstats import FPLstats, PlayerTable, PriceOverlay, MIN_GW_NUMBER, MAX_GW_NUMBER
+
+MAX_PROCESSES = os.cpu_count() or 1
+# Number of GWs of the point calculation when no last GW is given
+DEFAULT_GW_PERIOD = 5
+TEAM_SIZE = 11
+# Characters of the team names kept in the names of the result files
+FILE_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Player table and points per GW of the worker process, set once by init_worker
+worker_table = None
+worker_gameweek_scores = None
+
+
+def load_teams(path: str) -> list:
+    """
+    Loads the team definitions of the batch. The file is a .json list of teams, each a dictionary of its 'name', the
+    IDs of its 11 players ('elements'), their selling prices ('prices', the current prices if left out), the money in
+    the bank ('bank') and optionally the free transfers ('free_transfers'), the excluded player IDs ('unavailable')
+    and the mode ('normal' or 'free_hit')
+
+    :param path: The path of the .json file
+    :type path: str
+    :return: A list of the team dictionaries, each with its position in the file under 'team_id'
+    """
+    with open(path, "r") as file:
+        teams = json.load(file)
+    for number, team in enumerate(teams, start=1):
+        # The position in the file identifies the team (the names can repeat)
+        team["team_id"] = number
+        team["name"] = str(team.get("name", f"team_{number}"))
+    return teams
+
+
+def init_worker(table: PlayerTable, gameweek_scores) -> None:
+    """
+    Keeps the scored player table (and the points per GW of the schedule) in the worker process, so that they are
+    sent once per worker instead of once per team
+
+    :param table: The player table of the batch (with the shared prices)
+    :type table: PlayerTable
+    :param gameweek_scores: The points of every player per GW of the schedule (None for no schedule)
+    :return: None
+    """
+    global worker_table, worker_gameweek_scores
+    worker_table = table
+    worker_gameweek_scores = gameweek_scores
+
+
+def analyze_team(team: dict) -> dict:
+    """
+    Runs the suggestions and optimizations of a team in a worker process
+
+    :param team: The team dictionary (see load_teams)
+    :type team: dict
+    :return: The result of team_result, or a dictionary of the error under 'error' if the team fails
+    """
+    try:
+        result = team_result(worker_table, team, worker_gameweek_scores)
+    except Exception as error:
+        # A failing team is reported in its result instead of stopping the other teams
+        result = {"name": team["name"], "error": f"{type(error).__name__}: {error}"}
+    result["team_id"] = team["team_id"]
+    return result
+
+
+def team_result(table: PlayerTable, team: dict, gameweek_scores=None) -> dict:
+    """
+    Calculates the single transfer suggestions, the best move sets, the best starting 11 for the team's budget and
+    (if given the points per GW) the transfer schedule of a team. The selling prices of the team are applied to a copy
+    of the cost column only, so every team uses the same loaded table
+
+    :param table: The player table of the batch (with the shared prices)
+    :type table: PlayerTable
+    :param team: The team dictionary (see load_teams)
+    :type team: dict
+    :param gameweek_scores: The points of every player per GW of the schedule (None for no schedule)
+    :return: A dictionary of the results
+    """
+    elements = [int(element) for element in team["elements"]]
+    if len(elements) != TEAM_SIZE or len(set(elements)) != TEAM_SIZE:
+        raise ValueError(f"A team needs {TEAM_SIZE} different players")
+    unknown_elements = [element for element in elements if element not in table.rows]
+    if len(unknown_elements) > 0:
+        raise KeyError(f"Unknown player IDs: {unknown_elements}")
+    mode = team.get("mode", "normal")
+    calculation_mode = "captain_points" if mode == "free_hit" else "point_calculation"
+    prices = PriceOverlay()
+    if "prices" in team:
+        prices.update(dict(zip(elements, team["prices"])))
+    team_table = table.with_prices(prices)
+    unavailable_elements = [int(element) for element in team.get("unavailable", [])]
+    bank_budget = round(float(team.get("bank", 0.0)), 1)
+    free_transfers = int(team.get("free_transfers", 1))
+
+    squad = SquadState()
+    for element in elements:
+        squad.add(element, team_table.stat(element, "position"), team_table.stat(element, "team"),
+                  round(float(team_table.stat(element, "cost")), 1), float(team_table.stat(element, calculation_mode)))
+    starters_budget = round(squad.cost, 1)
+    max_budget = round(starters_budget + bank_budget, 1)
+
+    suggestions = fpltransfers.single_transfer_suggestions(
+        team_table, squad, unavailable_elements, starters_budget, max_budget
+    )
+    plan = fpltransfers.plan_transfers(
+        team_table, squad, unavailable_elements, bank_budget, mode, free_transfers=free_transfers
+    )
+    columns = team_table.columns
+    candidates = fploptimizer.SquadCandidates(
+        columns["id_x"], columns["position"], columns["team"], columns["cost"], columns[calculation_mode],
+        excluded_elements=unavailable_elements
+    )
+    best_team = fploptimizer.optimize_systems(candidates, max_budget)
+
+    result = {
+        "name": team["name"],
+        "team": [player_entry(team_table, element) for element in elements],
+        "points": squad.score,
+        "team_value": starters_budget,
+        "bank": bank_budget,
+        "single_transfers": [
+            {
+                "out": player_entry(team_table, suggestion["out"]),
+                "in": [dict(player_entry(team_table, element), value_possibility=percentage)
+                       for element, percentage in zip(suggestion["in"], suggestion["value_possibility"])],
+            }
+            for suggestion in suggestions
+        ],
+        "move_sets": [move_set_entry(team_table, move_set) for move_set in plan["move_sets"]],
+        "move_sets_complete": plan["complete"],
+        "best_team": None,
+    }
+    if best_team["best"] is not None:
+        best_result = best_team["systems"][best_team["best"]]
+        result["best_team"] = {
+            "system": best_team["best"],
+            "team": [player_entry(team_table, element) for element in best_result["elements"]],
+            "points": best_result["score"],
+            "cost": best_result["cost"],
+        }
+    if gameweek_scores is not None:
+        schedule = fpltransfers.plan_gameweeks(
+            team_table, squad, gameweek_scores, unavailable_elements, bank_budget, free_transfers=free_transfers
+        )
+        result["schedule"] = {
+            "gameweeks": [move_set_entry(team_table, gameweek) for gameweek in schedule["gameweeks"]],
+            "points": schedule["points"],
+            "complete": schedule["complete"],
+        }
+    return result
+
+
+def player_entry(table: PlayerTable, element) -> dict:
+    """
+    Describes a player in the results
+
+    :param table: The player table of the team
+    :type table: PlayerTable
+    :param element: Player ID
+    :return: A dictionary of the player's ID, name, position, team and price
+    """
+    return {
+        "element": element,
+        "name": table.stat(element, "name"),
+        "position": table.stat(element, "position"),
+        "team": table.stat(element, "team"),
+        "price": round(float(table.stat(element, "cost")), 1),
+    }
+
+
+def move_set_entry(table: PlayerTable, move_set: dict) -> dict:
+    """
+    Describes a move set (or a GW of a schedule) in the results, with the players leaving and coming in
+
+    :param table: The player table of the team
+    :type table: PlayerTable
+    :param move_set: A move set of fpltransfers.plan_transfers (or a GW of fpltransfers.plan_gameweeks)
+    :type move_set: dict
+    :return: A dictionary of the move set
+    """
+    entry = dict(move_set)
+    entry["out"] = [player_entry(table, element) for element in move_set["out"]]
+    entry["in"] = [player_entry(table, element) for element in move_set["in"]]
+    return entry
+
+
+def builtin(value):
+    """
+    Turns the NumPy values of the results into Python values for the .json files
+
+    :param value: A value of the results
+    :return: The value with Python types only
+    """
+    if isinstance(value, dict):
+        return {key: builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def run_batch(fpl: FPLstats, teams: list, output_dir: str, first_gw_number: int, last_gw_number: int,
+              schedule: bool = False, processes: int = MAX_PROCESSES) -> None:
+    """
+    Scores the players once and runs every team against the scored table in parallel worker processes, writing one
+    .json result per team to the output directory (named after the team ID and name)
+
+    :param fpl: The FPLstats of the batch
+    :type fpl: FPLstats
+    :param teams: A list of the team dictionaries (see load_teams)
+    :type teams: list
+    :param output_dir: The directory of the results
+    :type output_dir: str
+    :param first_gw_number: An integer of the first GW of the point calculation
+    :type first_gw_number: int
+    :param last_gw_number: An integer of the last GW of the point calculation
+    :type last_gw_number: int
+    :param schedule: Whether a transfer schedule of the next PLAN_HORIZON GWs is planned for every team
+    :type schedule: bool
+    :param processes: The number of worker processes (1 runs the teams one after the other)
+    :type processes: int
+    :return: None
+    """
+    fpl.calculate_points([first_gw_number, last_gw_number])
+    gameweek_scores = None
+    if schedule:
+        gameweek_scores = fpl.gameweek_points(
+            first_gw_number, min(first_gw_number + fpltransfers.PLAN_HORIZON - 1, MAX_GW_NUMBER)
+        )
+    os.makedirs(output_dir, exist_ok=True)
+
+    if processes > 1 and len(teams) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(teams)), initializer=init_worker,
+                                 initargs=(fpl.players, gameweek_scores)) as executor:
+            results = executor.map(analyze_team, teams)
+            write_results(results, output_dir, first_gw_number, last_gw_number, len(teams))
+    else:
+        init_worker(fpl.players, gameweek_scores)
+        write_results(map(analyze_team, teams), output_dir, first_gw_number, last_gw_number, len(teams))
+
+
+def write_results(results, output_dir: str, first_gw_number: int, last_gw_number: int, team_number: int) -> None:
+    """
+    Writes the result of every team as soon as it arrives
+
+    :param results: An iterable of the results of analyze_team
+    :param output_dir: The directory of the results
+    :type output_dir: str
+    :param first_gw_number: An integer of the first GW of the point calculation
+    :type first_gw_number: int
+    :param last_gw_number: An integer of the last GW of the point calculation
+    :type last_gw_number: int
+    :param team_number: The number of teams of the batch
+    :type team_number: int
+    :return: None
+    """
+    for number, result in enumerate(results, start=1):
+        result["first_gw"] = first_gw_number
+        result["last_gw"] = last_gw_number
+        fplfactors.write_json(os.path.join(output_dir, result_file_name(result)), builtin(result))
+        status = f"error: {result['error']}" if "error" in result else "done"
+        print(f"{number}/{team_number} {result['name']}: {status}")
+
+
+def result_file_name(result: dict) -> str:
+    """
+    Names the result file of a team after its ID and its name (only letters, digits, '_' and '-' are kept, so the
+    file always stays in the output directory)
+
+    :param result: The result of analyze_team
+    :type result: dict
+    :return: A string of the file name
+    """
+    name = FILE_NAME_CHARACTERS.sub("_", result["name"]).strip("_")
+    return f"{result['team_id']:03d}_{name or 'team'}.json"
+
+
+def main() -> None:
+    """
+    Batch entry point: python fplbatch.py teams.json results --first-gw 10 --last-gw 14
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Runs the FPL Analysis suggestions for many teams at once.")
+    parser.add_argument("teams", help="The .json file of the teams")
+    parser.add_argument("output_dir", help="The directory of the .json results (one per team)")
+    parser.add_argument("--first-gw", type=int, help="The first GW of the point calculation (the next GW if not given)")
+    parser.add_argument("--last-gw", type=int, help=f"The last GW of the point calculation "
+                                                    f"({DEFAULT_GW_PERIOD} GWs if not given)")
+    parser.add_argument("--schedule", action="store_true",
+                        help=f"Plans the transfers of the next {fpltransfers.PLAN_HORIZON} GWs for every team")
+    parser.add_argument("--processes", type=int, default=MAX_PROCESSES, help="The number of worker processes")
+    arguments = parser.parse_args()
+
+    teams = load_teams(arguments.teams)
+    username = input("E-mail: ")
+    password = getpass("Password: ")
+    fplapi.check_status(username, password)
+
+    first_gw_number = arguments.first_gw
+    if first_gw_number is None:
+        first_gw_number = min(fplapi.gw_played() + 1, MAX_GW_NUMBER)
+    last_gw_number = arguments.last_gw
+    if last_gw_number is None:
+        last_gw_number = min(first_gw_number + DEFAULT_GW_PERIOD - 1, MAX_GW_NUMBER)
+    if last_gw_number > MAX_GW_NUMBER or first_gw_number < MIN_GW_NUMBER or first_gw_number > last_gw_number:
+        parser.error("Invalid GW numbers.")
+
+    run_batch(FPLstats(username, password), teams, arguments.output_dir, first_gw_number, last_gw_number,
+              schedule=arguments.schedule, processes=arguments.processes)
+
+
+if __name__ == "__main__":
+    # The worker processes import this module again (and the .exe runs it again)
+    freeze_support()
+    main()
@@ -0,0 +1,134 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIRECTORY = "fpl_cache"
+COMPRESS_LEVEL = 5
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of the FPL API responses, keyed by URL. Every entry is stored compressed along with its
+    validators (ETag and Last-Modified) and the time it stops being fresh
+
+    Attributes:
+        directory: The directory the entries are stored in
+        offline: Whether the cache is used without touching the network
+    """
+    def __init__(self, directory: str = CACHE_DIRECTORY, offline: bool = False):
+        self.directory = directory
+        self.offline = offline
+
+    def path(self, url: str) -> str:
+        """
+        Returns the path of the entry of a URL
+
+        :param url: The URL of the request
+        :type url: str
+        :return: A string of the path of the entry file
+        """
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def load(self, url: str):
+        """
+        Loads the entry of a URL
+
+        :param url: The URL of the request
+        :type url: str
+        :return: A dictionary of the entry (url, etag, last_modified, expires, body) or None if there is no valid entry
+        """
+        try:
+            with gzip.open(self.path(url), "rt", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """
+        Checks if an entry can be used without asking the server
+
+        :param entry: The entry of a URL
+        :type entry: dict
+        :return: True or False
+        """
+        return self.offline or entry["expires"] > time.time()
+
+    def store(self, url: str, body, etag: str, last_modified: str, ttl: float) -> dict:
+        """
+        Stores a response (the file is replaced atomically so that a crash never leaves a broken entry)
+
+        :param url: The URL of the request
+        :type url: str
+        :param body: The decoded JSON body of the response
+        :param etag: The ETag header of the response
+        :type etag: str
+        :param last_modified: The Last-Modified header of the response
+        :type last_modified: str
+        :param ttl: The number of seconds the entry stays fresh
+        :type ttl: float
+        :return: A dictionary of the stored entry
+        """
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires": time.time() + ttl,
+            "body": body,
+        }
+        self.write(entry)
+        return entry
+
+    def refresh(self, entry: dict, ttl: float) -> None:
+        """
+        Makes an entry fresh again after the server confirmed it is unchanged (304 response)
+
+        :param entry: The entry of a URL
+        :type entry: dict
+        :param ttl: The number of seconds the entry stays fresh
+        :type ttl: float
+        :return: None
+        """
+        entry["expires"] = time.time() + ttl
+        self.write(entry)
+
+    def write(self, entry: dict) -> None:
+        """
+        Writes an entry to the disk
+
+        :param entry: The entry of a URL
+        :type entry: dict
+        :return: None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as raw_file:
+                with gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=COMPRESS_LEVEL) as file:
+                    file.write(json.dumps(entry).encode("utf-8"))
+            os.replace(temporary_path, self.path(entry["url"]))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def conditional_headers(self, entry) -> dict:
+        """
+        Returns the headers of a conditional request for a cached entry
+
+        :param entry: The entry of a URL (or None)
+        :type entry: dict
+        :return: A dictionary of the request headers
+        """
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
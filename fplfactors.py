@@ -0,0 +1,346 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import fplscoring
+
+CHECKPOINT_FILE = "factors_checkpoint.json"
+# Number of players collected between two checkpoint writes
+CHECKPOINT_EVERY = 50
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+MAX_PROCESSES = os.cpu_count() or 1
+
+
+class FactorStore:
+    """
+    Holds the point formula factors (factors.json) and a checkpoint of the (GW, player) pairs collected for the GWs
+    that haven't been fitted yet, so that an interrupted update resumes where it stopped. Both files are written
+    atomically
+
+    Attributes:
+        factors_path: The path of the factors
+        checkpoint_path: The path of the checkpoint
+        factors: Dictionary of the factors of every GW (the schema of factors.json)
+        pending: Dictionary of the collected rows per GW and player ID, each the HISTORY_FIELDS followed by the FDR
+        and the date (None for players without a fixture in the GW)
+    """
+    def __init__(self, factors_path: str = fplscoring.FACTORS_FILE, checkpoint_path: str = CHECKPOINT_FILE):
+        self.factors_path = factors_path
+        self.checkpoint_path = checkpoint_path
+        try:
+            with open(factors_path, "r") as file:
+                self.factors = json.load(file)
+        except FileNotFoundError:
+            self.factors = starting_factors()
+            write_json(factors_path, self.factors)
+        try:
+            with open(checkpoint_path, "r") as file:
+                self.pending = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.pending = {}
+
+    def update_gameweeks(self, finished_gameweeks: dict) -> list:
+        """
+        Finds the finished GWs that haven't been fitted after their deadline
+
+        :param finished_gameweeks: Dictionary of the deadline of every finished GW (from fplapi.finished_gameweeks)
+        :type finished_gameweeks: dict
+        :return: A list of the GWs (as the string keys of factors.json)
+        """
+        update_gws = []
+        for gw, deadline in sorted(finished_gameweeks.items()):
+            gw = str(gw)
+            if gw not in self.factors:
+                continue
+            last_date = datetime.strptime(self.factors[gw]["last_date"], DATE_FORMAT)
+            if last_date < datetime.strptime(deadline, DATE_FORMAT):
+                update_gws.append(gw)
+        # Rows of GWs that were fitted or aren't being updated are dropped
+        self.pending = {gw: self.pending.get(gw, {}) for gw in update_gws}
+        return update_gws
+
+    def missing_players(self, player_ids: list, update_gws: list) -> list:
+        """
+        Lists the players that haven't been collected for every GW of the update
+
+        :param player_ids: The player IDs
+        :type player_ids: list
+        :param update_gws: The GWs of the update
+        :type update_gws: list
+        :return: A list of the player IDs
+        """
+        return [player_id for player_id in player_ids
+                if any(str(player_id) not in self.pending[gw] for gw in update_gws)]
+
+    def add(self, gw: str, player_id: int, player_history_data, fdr: float) -> None:
+        """
+        Records the values of a player for a GW
+
+        :param gw: The GW
+        :type gw: str
+        :param player_id: The player ID
+        :type player_id: int
+        :param player_history_data: The player's values for the GW from fplapi.fpl_player_history_all (None if he
+        had no fixture)
+        :param fdr: The FDR of the player's team for the GW
+        :type fdr: float
+        :return: None
+        """
+        row = None
+        if player_history_data is not None:
+            row = [float(player_history_data[field]) for field in fplscoring.HISTORY_FIELDS]
+            row += [float(fdr), player_history_data["date"]]
+        self.pending[gw][str(player_id)] = row
+
+    def rows(self, gw: str) -> tuple:
+        """
+        Returns the collected rows of a GW in the order of the player IDs
+
+        :param gw: The GW
+        :type gw: str
+        :return: A tuple of the player IDs, the array of players x HISTORY_FIELDS, the array of the FDR and the list
+        of the dates
+        """
+        rows = [(int(player_id), row) for player_id, row in self.pending[gw].items() if row is not None]
+        rows.sort(key=lambda row: row[0])
+        history = np.array([row[:len(fplscoring.HISTORY_FIELDS)] for player_id, row in rows], dtype=float)
+        history = history.reshape(len(rows), len(fplscoring.HISTORY_FIELDS))
+        fdr = np.array([row[-2] for player_id, row in rows], dtype=float)
+        return [player_id for player_id, row in rows], history, fdr, [row[-1] for player_id, row in rows]
+
+    def save_checkpoint(self) -> None:
+        """
+        Writes the collected rows to the disk
+
+        :return: None
+        """
+        write_json(self.checkpoint_path, self.pending)
+
+    def commit(self, gw: str, gw_factors: dict, last_date: str) -> None:
+        """
+        Stores the factors of a fitted GW, writes them to the disk and drops the GW from the checkpoint
+
+        :param gw: The GW
+        :type gw: str
+        :param gw_factors: The factors of the GW (None keeps the previous ones)
+        :type gw_factors: dict
+        :param last_date: The date of the last fixture of the GW
+        :type last_date: str
+        :return: None
+        """
+        if gw_factors is not None:
+            self.factors[gw].update(gw_factors)
+        self.factors[gw]["gw"] = int(gw)
+        if datetime.strptime(last_date, DATE_FORMAT) > datetime.strptime(self.factors[gw]["last_date"], DATE_FORMAT):
+            self.factors[gw]["last_date"] = last_date
+        write_json(self.factors_path, self.factors)
+        self.pending.pop(gw, None)
+        if len(self.pending) == 0 and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        else:
+            self.save_checkpoint()
+
+
+def player_factors(gw_factors: dict, player_history_data: dict, fdr: float) -> None:
+    """
+    Adds a player's Gameweek to the running point formula factors of that Gameweek
+
+    :param gw_factors: The factors of the Gameweek from the .json file (updated in place)
+    :type gw_factors: dict
+    :param player_history_data: The player's values for the Gameweek from fplapi.fpl_player_history_all
+    :type player_history_data: dict
+    :param fdr: The FDR of the player's team for the Gameweek
+    :type fdr: float
+    :return: None
+    """
+    if (
+        player_history_data["total_points"] <= 0
+        or player_history_data["ppg"] <= 0
+        or player_history_data["value_season"] <= 0
+        or player_history_data["bonus"] <= 0
+        or player_history_data["form"] <= 0
+    ):
+        return None
+    else:
+        total_points_factor = player_history_data["gw_points"] / player_history_data["total_points"]
+        ppg_factor = player_history_data["gw_points"] / player_history_data["ppg"]
+        value_factor = player_history_data["gw_points"] / player_history_data["value_season"]
+        bonus_factor = player_history_data["gw_points"] / player_history_data["bonus"]
+        form_factor = player_history_data["gw_points"] / player_history_data["form"]
+
+    if np.isnan(fdr) or player_history_data["gw_points"] == 0:
+        return None
+    else:
+        fdr_factor = player_history_data["gw_points"] / fdr
+
+    new_factors = {
+        "total_points_factor": total_points_factor,
+        "ppg_factor": ppg_factor,
+        "value_factor": value_factor,
+        "bonus_factor": bonus_factor,
+        "form_factor": form_factor,
+        "fdr_factor": fdr_factor,
+    }
+    player_num = gw_factors["player_num"]
+    for factor_name, factor in new_factors.items():
+        if player_num == 1:
+            gw_factors[factor_name] = factor
+        else:
+            gw_factors[factor_name] += (
+                factor
+                * (
+                   player_num
+                   * factor
+                   - gw_factors[factor_name]
+                )
+                / (
+                   factor
+                   * player_num
+                   * (player_num + 1)
+                )
+            )
+    gw_factors["player_num"] = player_num + 1
+    gw_factors["gw"] = int(player_history_data["gw"])
+    check_new_last_date = datetime.strptime(player_history_data["date"], DATE_FORMAT)
+    if check_new_last_date >= datetime.strptime(gw_factors["last_date"], DATE_FORMAT):
+        gw_factors["last_date"] = player_history_data["date"]
+
+
+def fit_gameweek(values: np.ndarray, player_ids: list, dates: list, gw: str, gw_factors: dict, fitter: str) -> dict:
+    """
+    Fits the factors of a GW from its collected rows
+
+    :param values: An array of players x (HISTORY_FIELDS + FDR) of the GW (rows after the players are NaN padding)
+    :type values: np.ndarray
+    :param player_ids: The player IDs of the rows
+    :type player_ids: list
+    :param dates: The dates of the rows
+    :type dates: list
+    :param gw: The GW
+    :type gw: str
+    :param gw_factors: The previous factors of the GW (used by the incremental fitter)
+    :type gw_factors: dict
+    :param fitter: Option between 'least_squares' and 'incremental' (see FPLstats.calculation_factors)
+    :type fitter: str
+    :return: The factors of the GW (None if they can't be fitted)
+    """
+    field_number = len(fplscoring.HISTORY_FIELDS)
+    if fitter == "incremental":
+        gw_factors = dict(gw_factors)
+        for row, (player_id, date) in enumerate(zip(player_ids, dates)):
+            player_history_data = dict(zip(fplscoring.HISTORY_FIELDS, values[row, :field_number].tolist()))
+            player_history_data.update({"id": player_id, "gw": int(gw), "date": date})
+            player_factors(gw_factors, player_history_data, values[row, field_number])
+        return gw_factors
+    # One least squares solve over all the players of the GW
+    return fplscoring.fit_factors(values[:, :field_number], values[:, field_number])
+
+
+def fit_shared_gameweek(task: tuple) -> dict:
+    """
+    Fits a GW in a worker process, reading its rows from the shared memory of fit_gameweeks
+
+    :param task: A tuple of the shared memory name, the shape of the array, the GW index and the arguments of
+    fit_gameweek after the values
+    :type task: tuple
+    :return: The result of fit_gameweek
+    """
+    name, shape, g, player_ids, dates, gw, gw_factors, fitter = task
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        values = np.array(np.ndarray(shape, dtype=np.float64, buffer=shared.buf)[g])
+    finally:
+        shared.close()
+    return fit_gameweek(values, player_ids, dates, gw, gw_factors, fitter)
+
+
+def fit_gameweeks(store: FactorStore, update_gws: list, fitter: str, processes: int = MAX_PROCESSES) -> dict:
+    """
+    Fits every GW of the update. The GWs don't depend on each other, so they are fitted in parallel processes that
+    read the rows from one array of GWs x players x (HISTORY_FIELDS + FDR) in shared memory instead of getting it
+    pickled
+
+    :param store: The factor store holding the collected rows
+    :type store: FactorStore
+    :param update_gws: The GWs of the update
+    :type update_gws: list
+    :param fitter: Option between 'least_squares' and 'incremental' (see FPLstats.calculation_factors)
+    :type fitter: str
+    :param processes: The number of worker processes
+    :type processes: int
+    :return: A dictionary of the factors of every GW (None if they can't be fitted) and the date of its last fixture
+    (None if no player had a fixture)
+    """
+    rows = [store.rows(gw) for gw in update_gws]
+    player_number = max(len(player_ids) for player_ids, history, fdr, dates in rows)
+    shape = (len(update_gws), player_number, len(fplscoring.HISTORY_FIELDS) + 1)
+    values = np.full(shape, np.nan)
+    for g, (player_ids, history, fdr, dates) in enumerate(rows):
+        values[g, :len(player_ids), :-1] = history
+        values[g, :len(player_ids), -1] = fdr
+    arguments = [(player_ids, dates, gw, store.factors[gw], fitter)
+                 for gw, (player_ids, history, fdr, dates) in zip(update_gws, rows)]
+
+    if processes > 1 and len(update_gws) > 1:
+        shared = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(shape, dtype=np.float64, buffer=shared.buf)[:] = values
+            with ProcessPoolExecutor(max_workers=min(processes, len(update_gws))) as executor:
+                results = list(executor.map(
+                    fit_shared_gameweek, [(shared.name, shape, g) + argument for g, argument in enumerate(arguments)]
+                ))
+        finally:
+            shared.close()
+            shared.unlink()
+    else:
+        results = [fit_gameweek(values[g], *argument) for g, argument in enumerate(arguments)]
+    return {gw: (result, max(dates, default=None))
+            for gw, result, (player_ids, history, fdr, dates) in zip(update_gws, results, rows)}
+
+
+def starting_factors() -> dict:
+    """
+    Creates the factors used before the first update
+
+    :return: A dictionary in the schema of factors.json
+    """
+    factors = {}
+    for gw in range(1, 39):
+        factors[str(gw)] = {
+            "total_points_factor": 0,
+            "ppg_factor": 0,
+            "value_factor": 0,
+            "bonus_factor": 0,
+            "form_factor": 0,
+            "fdr_factor": 1,
+            "player_num": 1,
+            "gw": gw,
+            "last_date": "2023-08-17T14:00:00Z",
+        }
+    return factors
+
+
+def write_json(path: str, data: dict) -> None:
+    """
+    Writes a .json file atomically (to a temporary file that replaces the old one), so that an interrupted write
+    never leaves a broken file
+
+    :param path: The path of the file
+    :type path: str
+    :param data: The data
+    :type data: dict
+    :return: None
+    """
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w") as file:
+            json.dump(data, file, indent=4)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
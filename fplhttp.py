@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Number of hosts kept in the pool (the FPL API and the login server) and connections kept alive per host
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 5
+RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Path segments replaced in the endpoint names of the statistics (IDs and hashes)
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{16,})$")
+
+
+class HttpClient:
+    """
+    HTTP client shared by every request of the program. The connections are pooled and kept alive per host, so the
+    TLS handshake is paid once per process, every request has a timeout and the failed ones are retried with an
+    exponential backoff. The number of requests, the bytes and the time are counted per endpoint
+
+    Attributes:
+        adapter: The pooled adapter mounted on every session of the client
+        session: The session used when no other session is given
+        stats: Dictionary of the requests, errors, bytes and seconds of every endpoint
+        lock: Lock used for updating the statistics from many threads
+    """
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE):
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = self.new_session()
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def new_session(self) -> requests.Session:
+        """
+        Creates a session with its own cookies that shares the connection pool of the client (used by the login flow)
+
+        :return: A requests Session
+        """
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        session.headers["Accept-Encoding"] = "gzip, deflate"
+        return session
+
+    def request(self, method: str, url: str, session: requests.Session = None, retries: int = None,
+                rate_limiter=None, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying it when the connection fails or the server is throttling (429) or failing (5xx)
+
+        :param method: The HTTP method
+        :type method: str
+        :param url: The full URL
+        :type url: str
+        :param session: The session used (the client's session if None)
+        :type session: requests.Session
+        :param retries: The number of retries (MAX_RETRIES for GET requests and none for the rest if None)
+        :type retries: int
+        :param rate_limiter: An object with an acquire() method called before every attempt
+        :param kwargs: The arguments of requests.Session.request
+        :return: The response of the last attempt
+        """
+        if session is None:
+            session = self.session
+        if retries is None:
+            retries = MAX_RETRIES if method.upper() == "GET" else 0
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+
+        for attempt in range(retries + 1):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.record(url, None, time.perf_counter() - start)
+                if attempt == retries:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            self.record(url, response, time.perf_counter() - start)
+            if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    time.sleep(int(retry_after))
+                else:
+                    time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                continue
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request (see request)
+
+        :param url: The full URL
+        :type url: str
+        :return: The response
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a POST request (see request)
+
+        :param url: The full URL
+        :type url: str
+        :return: The response
+        """
+        return self.request("POST", url, **kwargs)
+
+    def record(self, url: str, response, seconds: float) -> None:
+        """
+        Adds a request to the statistics of its endpoint
+
+        :param url: The full URL
+        :type url: str
+        :param response: The response (None if the connection failed)
+        :param seconds: The time of the request
+        :type seconds: float
+        :return: None
+        """
+        endpoint = endpoint_name(url)
+        with self.lock:
+            endpoint_stats = self.stats.setdefault(endpoint, {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0})
+            endpoint_stats["requests"] += 1
+            endpoint_stats["seconds"] += seconds
+            if response is None or response.status_code >= 400:
+                endpoint_stats["errors"] += 1
+            if response is not None:
+                endpoint_stats["bytes"] += len(response.content)
+
+    def report(self) -> str:
+        """
+        Formats the statistics of every endpoint
+
+        :return: A string of a table of the requests, errors, bytes (after decompression) and mean time per endpoint
+        """
+        lines = [f"{'Endpoint':<64}{'Requests':>10}{'Errors':>8}{'KB':>10}{'Mean ms':>10}"]
+        with self.lock:
+            for endpoint, endpoint_stats in sorted(self.stats.items()):
+                lines.append(
+                    f"{endpoint:<64}{endpoint_stats['requests']:>10}{endpoint_stats['errors']:>8}"
+                    f"{endpoint_stats['bytes'] / 1024:>10.1f}"
+                    f"{endpoint_stats['seconds'] / endpoint_stats['requests'] * 1000:>10.1f}"
+                )
+        return "\n".join(lines)
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Names the endpoint of a URL, with the IDs of the path replaced, so that the requests of every player or team are
+    counted together
+
+    :param url: The full URL
+    :type url: str
+    :return: A string of the host and the path
+    """
+    parsed = urlparse(url)
+    path = "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in parsed.path.split("/"))
+    return f"{parsed.netloc}{path}"
+
+
+# Client shared by the API requests and the login
+client = HttpClient()
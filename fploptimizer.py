@@ -0,0 +1,249 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+POSITIONS = ["GKP", "DEF", "MID", "FWD"]
+# Maximum number of starting players per position over all the valid systems
+MAX_POSITION_COUNTS = {"GKP": 1, "DEF": 5, "MID": 5, "FWD": 3}
+MAX_PLAYERS_PER_TEAM = 3
+# Number of explored squads after which the search stops and returns the best squad found with its optimality gap
+NODE_LIMIT = 2000000
+SCORE_TOLERANCE = 1e-9
+
+
+class SquadCandidates:
+    """
+    Holds the players that can be picked by the optimizer, per position and sorted by score. Players that can always
+    be replaced by a better and cheaper player of the same position are removed in advance
+
+    Attributes:
+        elements: Dictionary of the array of player IDs per position
+        scores: Dictionary of the array of player scores per position
+        costs: Dictionary of the array of player costs per position (in 0.1m units)
+        clubs: Dictionary of the array of player Premier League team codes per position
+        club_number: Integer of the number of Premier League teams
+    """
+    def __init__(self, elements, positions, teams, costs, scores, excluded_elements=(),
+                 position_counts: dict = None):
+        if position_counts is None:
+            position_counts = MAX_POSITION_COUNTS
+        elements = np.asarray(elements)
+        positions = np.asarray(positions)
+        costs = np.rint(np.asarray(costs, dtype=float) * 10).astype(np.int64)
+        scores = np.asarray(scores, dtype=float)
+        club_names, clubs = np.unique(np.asarray(teams), return_inverse=True)
+        self.club_number = len(club_names)
+
+        available = np.isfinite(scores) & ~np.isin(elements, list(excluded_elements))
+        self.elements = {}
+        self.scores = {}
+        self.costs = {}
+        self.clubs = {}
+        for position in POSITIONS:
+            rows = np.flatnonzero(available & (positions == position))
+            rows = rows[np.lexsort((costs[rows], -scores[rows]))]
+            rows = rows[~dominated(scores[rows], costs[rows], clubs[rows], position_counts[position])]
+            self.elements[position] = elements[rows]
+            self.scores[position] = scores[rows]
+            self.costs[position] = costs[rows]
+            self.clubs[position] = clubs[rows]
+
+
+def dominated(scores: np.ndarray, costs: np.ndarray, clubs: np.ndarray, position_count: int) -> np.ndarray:
+    """
+    Finds the players that never need to be in the best squad. A player is dominated by the players of the same
+    position with better (or equal) score and lower (or equal) cost. He can be skipped when either 'position_count'
+    of them play for his own team or there are dominating players in 'position_count' + 3 other teams, since then one
+    of them is always free to replace him without breaking the team limit
+
+    :param scores: The scores of the players of a position sorted by score (descending)
+    :type scores: np.ndarray
+    :param costs: The costs of the players
+    :type costs: np.ndarray
+    :param clubs: The Premier League team codes of the players
+    :type clubs: np.ndarray
+    :param position_count: The maximum number of starting players of the position
+    :type position_count: int
+    :return: A boolean array of the dominated players
+    """
+    player_number = len(scores)
+    if player_number == 0:
+        return np.zeros(0, dtype=bool)
+    # dominating[i, j] is True when player j dominates player i (ties are broken by the sorting order)
+    better_or_equal = (scores[None, :] >= scores[:, None]) & (costs[None, :] <= costs[:, None])
+    strictly_better = (scores[None, :] > scores[:, None]) | (costs[None, :] < costs[:, None])
+    earlier = np.arange(player_number)[None, :] < np.arange(player_number)[:, None]
+    dominating = better_or_equal & (strictly_better | earlier)
+
+    same_club = clubs[None, :] == clubs[:, None]
+    same_club_count = (dominating & same_club).sum(axis=1)
+    club_codes = np.unique(clubs)
+    other_club_count = np.zeros(player_number, dtype=np.int64)
+    for club in club_codes:
+        other_club_count += (dominating[:, clubs == club].any(axis=1) & (clubs != club))
+    return (same_club_count >= position_count) | (other_club_count >= position_count + MAX_PLAYERS_PER_TEAM)
+
+
+def bound_tables(candidates: SquadCandidates, counts: list, budget: int) -> list:
+    """
+    Calculates the upper bounds of the search. For every position, table[i, k, b] is the best score of picking k
+    players of the position from the i-th player onwards plus all the players of the next positions with a cost of
+    at most b (the team limit is ignored, which makes it an upper bound)
+
+    :param candidates: The players that can be picked
+    :type candidates: SquadCandidates
+    :param counts: The number of players per position (in the order of POSITIONS)
+    :type counts: list
+    :param budget: The budget of the squad (in 0.1m units)
+    :type budget: int
+    :return: A list of the tables of every position
+    """
+    tables = [None] * len(POSITIONS)
+    next_positions = np.zeros(budget + 1)
+    for p in reversed(range(len(POSITIONS))):
+        scores = candidates.scores[POSITIONS[p]]
+        costs = candidates.costs[POSITIONS[p]]
+        count = counts[p]
+        table = np.full((len(scores) + 1, count + 1, budget + 1), -np.inf)
+        table[len(scores), 0] = next_positions
+        for i in reversed(range(len(scores))):
+            table[i] = table[i + 1]
+            cost = costs[i]
+            if cost <= budget:
+                table[i, 1:, cost:] = np.maximum(
+                    table[i + 1, 1:, cost:], table[i + 1, :-1, :budget + 1 - cost] + scores[i]
+                )
+        tables[p] = table
+        next_positions = table[0, count]
+    return tables
+
+
+def optimize_squad(candidates: SquadCandidates, system: list, budget: float, node_limit: int = NODE_LIMIT):
+    """
+    Finds the starting 11 with the highest total score for a system under the budget and the team limit of 3 players,
+    using branch-and-bound over the players sorted by score
+
+    :param candidates: The players that can be picked
+    :type candidates: SquadCandidates
+    :param system: List of number of players per position in the team (DEF, MID, FWD)
+    :type system: list
+    :param budget: The maximum cost of the starting 11
+    :type budget: float
+    :param node_limit: The number of explored squads after which the search stops
+    :type node_limit: int
+    :return: A dictionary of the squad (elements, score, cost, bound, gap, optimal, nodes) or None if no squad fits
+    the budget
+    """
+    budget_units = int(round(budget * 10))
+    counts = [1, system[0], system[1], system[2]]
+    if budget_units < 0:
+        return None
+    tables = bound_tables(candidates, counts, budget_units)
+    root_bound = tables[0][0, counts[0], budget_units]
+    if not np.isfinite(root_bound):
+        return None
+
+    position_elements = [candidates.elements[position] for position in POSITIONS]
+    position_scores = [candidates.scores[position].tolist() for position in POSITIONS]
+    position_costs = [candidates.costs[position].tolist() for position in POSITIONS]
+    position_clubs = [candidates.clubs[position].tolist() for position in POSITIONS]
+    club_count = [0] * candidates.club_number
+    picks = []
+    best = {"score": -np.inf, "picks": [], "cost": 0}
+    nodes = [0]
+
+    def search(p: int, start: int, count: int, budget_left: int, score: float) -> bool:
+        # Returns False when the node limit is reached
+        if count == 0:
+            if p == len(POSITIONS) - 1:
+                if score > best["score"]:
+                    best["score"] = score
+                    best["picks"] = list(picks)
+                    best["cost"] = budget_units - budget_left
+                return True
+            return search(p + 1, 0, counts[p + 1], budget_left, score)
+        table = tables[p]
+        scores = position_scores[p]
+        costs = position_costs[p]
+        clubs = position_clubs[p]
+        for i in range(start, len(scores)):
+            # The bound only gets worse for the next players, so the rest of the players are skipped
+            if score + table[i, count, budget_left] <= best["score"] + SCORE_TOLERANCE:
+                break
+            cost = costs[i]
+            club = clubs[i]
+            if cost > budget_left or club_count[club] >= MAX_PLAYERS_PER_TEAM:
+                continue
+            nodes[0] += 1
+            if nodes[0] > node_limit:
+                return False
+            club_count[club] += 1
+            picks.append((p, i))
+            complete = search(p, i + 1, count - 1, budget_left - cost, score + scores[i])
+            picks.pop()
+            club_count[club] -= 1
+            if not complete:
+                return False
+        return True
+
+    optimal = search(0, 0, counts[0], budget_units, 0.0)
+    if len(best["picks"]) == 0:
+        return None
+    return {
+        "elements": [position_elements[p][i].item() for p, i in best["picks"]],
+        "score": best["score"],
+        "cost": round(best["cost"] / 10, 1),
+        "bound": root_bound if not optimal else best["score"],
+        "gap": 0.0 if optimal else max(0.0, root_bound - best["score"]),
+        "optimal": optimal,
+        "nodes": nodes[0],
+    }
+
+
+def valid_systems() -> list:
+    """
+    Lists every valid system (3-5 DEF, 1-5 MID, 1-3 FWD and 10 outfield players, as in FPLteam.choose_system)
+
+    :return: A list of the systems as lists of the number of DEF, MID and FWD
+    """
+    systems = []
+    for system_def in range(3, 6):
+        for system_fwd in range(1, 4):
+            system_mid = 10 - system_def - system_fwd
+            if 1 <= system_mid <= 5:
+                systems.append([system_def, system_mid, system_fwd])
+    return systems
+
+
+def optimize_systems(candidates: SquadCandidates, budget: float, systems: list = None, processes: int = 1) -> dict:
+    """
+    Finds the best starting 11 of every system in one run. The candidate lists are sorted and pruned once (for the
+    maximum number of players per position) and shared by all the systems, which can also run in parallel processes
+
+    :param candidates: The players that can be picked (built with the default MAX_POSITION_COUNTS)
+    :type candidates: SquadCandidates
+    :param budget: The maximum cost of the starting 11
+    :type budget: float
+    :param systems: The systems to optimize (all the valid systems if not given)
+    :type systems: list
+    :param processes: The number of worker processes (1 runs the systems one after the other)
+    :type processes: int
+    :return: A dictionary of the results of optimize_squad per system name (e.g. '4-4-2') under 'systems' and the name
+    of the best system under 'best' (None if no system fits the budget)
+    """
+    if systems is None:
+        systems = valid_systems()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(systems))) as executor:
+            results = list(executor.map(optimize_squad, repeat(candidates), systems, repeat(budget)))
+    else:
+        results = [optimize_squad(candidates, system, budget) for system in systems]
+
+    system_results = {}
+    best_system = None
+    for system, result in zip(systems, results):
+        system_name = "-".join(str(number) for number in system)
+        system_results[system_name] = result
+        if result is not None and (best_system is None or result["score"] > system_results[best_system]["score"]):
+            best_system = system_name
+    return {"systems": system_results, "best": best_system}
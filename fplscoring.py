@@ -0,0 +1,273 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+FACTORS_FILE = "factors.json"
+FACTOR_NAMES = ["total_points_factor", "ppg_factor", "value_factor", "bonus_factor", "form_factor", "fdr_factor"]
+# The values of fplapi.fpl_player_history_all used for fitting the factors (the features in the order of
+# FACTOR_NAMES after the points of the GW)
+HISTORY_FIELDS = ["gw_points", "total_points", "ppg", "value_season", "bonus", "form"]
+
+# The values the scores are made of, calculated from the player data and the number of GWs played
+SCORE_FEATURES = {
+    "total_points": lambda player_data, gw_number: player_data["total_points"],
+    "total_points_hit": lambda player_data, gw_number: np.abs(player_data["total_points"] - 4),
+    "value_season": lambda player_data, gw_number: player_data["value_season"],
+    "points_per_game": lambda player_data, gw_number: player_data["points_per_game"],
+    "form_new": lambda player_data, gw_number: player_data["form_new"],
+    "form_change": lambda player_data, gw_number: np.abs(player_data["form_new"].astype(float) - (4 / 5.0)),
+    "bonus_new": lambda player_data, gw_number: player_data["bonus_new"],
+    "cost": lambda player_data, gw_number: player_data["cost"],
+    "fdr_final": lambda player_data, gw_number: player_data["fdr_final"],
+    "gw_number": lambda player_data, gw_number: np.full(len(player_data), gw_number),
+}
+
+# Every score is a product of features, each raised to a sum of the averaged factors times a coefficient
+# (e.g. the captaincy points use total_points ** (2 * total_points_factor))
+SCORE_FORMULAS = {
+    # Points for player comparison
+    "point_calculation": {
+        "total_points": {"total_points_factor": 1},
+        "value_season": {"value_factor": 1},
+        "points_per_game": {"ppg_factor": 1},
+        "form_new": {"form_factor": 1},
+        "bonus_new": {"bonus_factor": 1},
+        "fdr_final": {"fdr_factor": -1},
+    },
+    # Points for captaincy comparison
+    "captain_points": {
+        "total_points": {"total_points_factor": 2},
+        "points_per_game": {"ppg_factor": 1},
+        "form_new": {"form_factor": 1},
+        "bonus_new": {"bonus_factor": 1},
+        "fdr_final": {"fdr_factor": -1},
+    },
+    # Points for transfer comparison
+    "transfer_points": {
+        "total_points_hit": {"total_points_factor": 1, "value_factor": 1, "ppg_factor": 1},
+        "bonus_new": {"bonus_factor": 1},
+        "form_change": {"form_factor": 1},
+        "cost": {"value_factor": -1},
+        "fdr_final": {"fdr_factor": -1},
+        "gw_number": {"ppg_factor": -1},
+    },
+    # Points for manager comparison
+    "manager_points": {
+        "total_points": {"total_points_factor": 3},
+        "form_new": {"form_factor": 1},
+        "fdr_final": {"fdr_factor": -1},
+    },
+}
+
+
+def load_factors() -> dict:
+    """
+    Loads the point formula factors of every GW
+
+    :return: The dictionary of the .json file
+    """
+    with open(FACTORS_FILE, "r") as file:
+        return json.load(file)
+
+
+def average_factors(factors: dict, first_gw_number: int, last_gw_number: int) -> np.ndarray:
+    """
+    Averages the factors of a GW period the way the point formulas use them (the sum of the GW factors over 10)
+
+    :param factors: The dictionary of load_factors
+    :type factors: dict
+    :param first_gw_number: An integer of the input of the first GW
+    :type first_gw_number: int
+    :param last_gw_number: An integer of the input of the last GW
+    :type last_gw_number: int
+    :return: An array of the averaged factors (in the order of FACTOR_NAMES)
+    """
+    return np.array([
+        sum(factors[str(gw)][factor_name] for gw in range(first_gw_number, last_gw_number + 1)) / 10
+        for factor_name in FACTOR_NAMES
+    ])
+
+
+def formula_coefficients(score_names: list, feature_names: list) -> np.ndarray:
+    """
+    Turns the registered formulas into an array of the coefficients of every factor in the exponent of every feature
+
+    :param score_names: The scores (keys of SCORE_FORMULAS)
+    :type score_names: list
+    :param feature_names: The features (keys of SCORE_FEATURES)
+    :type feature_names: list
+    :return: An array of features x factors x scores
+    """
+    coefficients = np.zeros((len(feature_names), len(FACTOR_NAMES), len(score_names)))
+    for s, score_name in enumerate(score_names):
+        for feature_name, feature_factors in SCORE_FORMULAS[score_name].items():
+            for factor_name, coefficient in feature_factors.items():
+                coefficients[feature_names.index(feature_name), FACTOR_NAMES.index(factor_name), s] = coefficient
+    return coefficients
+
+
+class ScoringEngine:
+    """
+    Calculates the registered scores of every player. The logs of the features are calculated once, so every score
+    (or every set of factors) is a single matrix product in log space
+
+    Attributes:
+        score_names: List of the calculated scores
+        feature_names: List of the features the scores use
+        coefficients: Array of features x factors x scores of the formulas
+        logs: Array of players x features of log(|feature|) (0 for features equal to 0)
+        zeros: Array of players x features of the features equal to 0 (as 0/1)
+        negatives: Array of players x features of the negative features (as 0/1)
+    """
+    def __init__(self, player_data: pd.DataFrame, gw_number: int, score_names: list = None):
+        if score_names is None:
+            score_names = list(SCORE_FORMULAS)
+        self.score_names = list(score_names)
+        self.feature_names = [feature_name for feature_name in SCORE_FEATURES
+                              if any(feature_name in SCORE_FORMULAS[score_name] for score_name in self.score_names)]
+        self.coefficients = formula_coefficients(self.score_names, self.feature_names)
+
+        features = np.column_stack([
+            np.asarray(SCORE_FEATURES[feature_name](player_data, gw_number), dtype=float)
+            for feature_name in self.feature_names
+        ])
+        self.logs, self.zeros, self.negatives = feature_logs(features)
+
+    def exponents(self, factors: np.ndarray) -> np.ndarray:
+        """
+        Calculates the exponent of every feature in every score for every set of factors
+
+        :param factors: An array of sets x FACTOR_NAMES of averaged factors
+        :type factors: np.ndarray
+        :return: An array of features x scores x sets
+        """
+        return np.tensordot(self.coefficients, np.atleast_2d(factors), axes=([1], [1]))
+
+    def scores(self, factors: np.ndarray) -> np.ndarray:
+        """
+        Calculates the scores of every player (not normalized) for one set of factors
+
+        :param factors: The averaged factors (in the order of FACTOR_NAMES)
+        :type factors: np.ndarray
+        :return: An array of players x scores
+        """
+        return self.sweep(np.asarray(factors)[None, :])[:, :, 0]
+
+    def sweep(self, factors: np.ndarray, window_features: dict = None) -> np.ndarray:
+        """
+        Calculates the scores of every player (not normalized) for many GW windows in one pass. A feature equal to 0
+        makes the score 0 (or infinite for a negative exponent) and a negative feature makes it NaN, as the power
+        would, unless its exponent is 0
+
+        :param factors: An array of windows x FACTOR_NAMES of the averaged factors of every window
+        :type factors: np.ndarray
+        :param window_features: Dictionary of the features that change with the window (e.g. 'fdr_final'), each an
+        array of players x windows that replaces the engine's values
+        :type window_features: dict
+        :return: An array of players x scores x windows
+        """
+        if window_features is None:
+            window_features = {}
+        exponents = self.exponents(factors)
+        positive = (exponents > 0).astype(float)
+        negative_exponent = (exponents < 0).astype(float)
+        nonzero = (exponents != 0).astype(float)
+        logs, zeros, negatives = self.logs.copy(), self.zeros.copy(), self.negatives.copy()
+        columns = [self.feature_names.index(feature_name) for feature_name in window_features
+                   if feature_name in self.feature_names]
+        logs[:, columns] = 0.0
+        zeros[:, columns] = 0.0
+        negatives[:, columns] = 0.0
+
+        log_scores = np.einsum("pk,ksw->psw", logs, exponents)
+        zero_positive = np.einsum("pk,ksw->psw", zeros, positive)
+        zero_negative = np.einsum("pk,ksw->psw", zeros, negative_exponent)
+        negative = np.einsum("pk,ksw->psw", negatives, nonzero)
+        for feature_name, values in window_features.items():
+            if feature_name not in self.feature_names:
+                continue
+            k = self.feature_names.index(feature_name)
+            window_logs, window_zeros, window_negatives = feature_logs(np.asarray(values, dtype=float))
+            log_scores += window_logs[:, None, :] * exponents[k][None, :, :]
+            zero_positive += window_zeros[:, None, :] * positive[k][None, :, :]
+            zero_negative += window_zeros[:, None, :] * negative_exponent[k][None, :, :]
+            negative += window_negatives[:, None, :] * nonzero[k][None, :, :]
+
+        with np.errstate(over="ignore"):
+            scores = np.exp(log_scores)
+        scores[zero_negative > 0] = np.inf
+        scores[zero_positive > 0] = 0.0
+        scores[(negative > 0) | ((zero_positive > 0) & (zero_negative > 0))] = np.nan
+        return scores
+
+
+def feature_logs(features: np.ndarray) -> tuple:
+    """
+    Takes the logs of features for the log space products
+
+    :param features: An array of the features
+    :type features: np.ndarray
+    :return: A tuple of the arrays of log(|feature|) (0 for features equal to 0), of the features equal to 0 and of
+    the negative features (the last two as 0/1)
+    """
+    with np.errstate(divide="ignore"):
+        logs = np.where(features == 0, 0.0, np.log(np.abs(features)))
+    return logs, (features == 0).astype(float), (features < 0).astype(float)
+
+
+def window_factors(factors: dict, windows: list) -> np.ndarray:
+    """
+    Averages the factors of many GW windows at once from the cumulative sums of the GW factors
+
+    :param factors: The dictionary of load_factors
+    :type factors: dict
+    :param windows: A list of the (first GW, last GW) of every window
+    :type windows: list
+    :return: An array of windows x FACTOR_NAMES
+    """
+    gw_factors = np.array([[factors[str(gw)][factor_name] for factor_name in FACTOR_NAMES]
+                           for gw in range(1, len(factors) + 1)])
+    cumulative = np.concatenate([np.zeros((1, len(FACTOR_NAMES))), np.cumsum(gw_factors, axis=0)])
+    firsts = np.array([window[0] for window in windows])
+    lasts = np.array([window[1] for window in windows])
+    return (cumulative[lasts] - cumulative[firsts - 1]) / 10
+
+
+def fit_factors(history: np.ndarray, fdr: np.ndarray) -> dict:
+    """
+    Fits the factors of a GW with least squares in log space, so that the points of the GW are closest to the power
+    product the scores use: log(gw_points) = a1*log(total_points) + a2*log(ppg) + a3*log(value_season)
+    + a4*log(bonus) + a5*log(form) - a6*log(fdr) + constant. Only the players with positive values and points take
+    part (as in FPLstats.player_factors). The constant is left out, since the scores are normalized
+
+    :param history: An array of players x HISTORY_FIELDS of the GW (NaN for players without a fixture)
+    :type history: np.ndarray
+    :param fdr: An array of the FDR of every player's team for the GW
+    :type fdr: np.ndarray
+    :return: A dictionary of the factors (FACTOR_NAMES) and the number of players taking part plus 1 ('player_num'),
+    or None if there aren't enough players
+    """
+    values = np.column_stack([history, fdr])
+    with np.errstate(invalid="ignore"):
+        valid = np.all(np.isfinite(values) & (values > 0), axis=1)
+    player_number = int(valid.sum())
+    if player_number <= len(FACTOR_NAMES):
+        return None
+    logs = np.log(values[valid])
+    design = np.column_stack([logs[:, 1:-1], -logs[:, -1], np.ones(player_number)])
+    solution = np.linalg.lstsq(design, logs[:, 0], rcond=None)[0]
+    fitted = {factor_name: float(factor) for factor_name, factor in zip(FACTOR_NAMES, solution)}
+    fitted["player_num"] = player_number + 1
+    return fitted
+
+
+def normalize(scores: np.ndarray) -> np.ndarray:
+    """
+    Scales the scores to the 0-100 range used by the program (the best player gets 100 * max / (max + 1))
+
+    :param scores: An array of the scores (one column per score)
+    :type scores: np.ndarray
+    :return: An array of the normalized scores
+    """
+    return scores * 100 / (np.nanmax(scores, axis=0) + 1)
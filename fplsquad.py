@@ -0,0 +1,230 @@
+class SquadState:
+    """
+    Incremental state of a squad. Every player sits in a slot and the per-team and per-position counters, the total
+    score and the total cost are updated on every change, so adding, removing and swapping players never rebuilds any
+    list
+
+    Attributes:
+        slots: List of the (element, position, team, cost, score) tuple of every slot (None for an empty slot)
+        slot_of: Dictionary of the slot of every player ID
+        free_slots: List of the empty slots
+        team_counts: Dictionary of the number of players per Premier League team
+        position_counts: Dictionary of the number of players per position
+        score: Float of the total score of the squad
+        cost: Float of the total cost of the squad
+    """
+    __slots__ = ("slots", "slot_of", "free_slots", "team_counts", "position_counts", "score", "cost")
+
+    def __init__(self):
+        self.slots = []
+        self.slot_of = {}
+        self.free_slots = []
+        self.team_counts = {}
+        self.position_counts = {}
+        self.score = 0.0
+        self.cost = 0.0
+
+    def __contains__(self, element) -> bool:
+        return element in self.slot_of
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def elements(self) -> list:
+        """
+        Returns the player IDs of the squad in slot order
+
+        :return: A list of player IDs
+        """
+        return [player[0] for player in self.slots if player is not None]
+
+    def players(self) -> list:
+        """
+        Returns the players of the squad in slot order
+
+        :return: A list of (element, position, team, cost, score) tuples
+        """
+        return [player for player in self.slots if player is not None]
+
+    def team_count(self, team: str) -> int:
+        """
+        Returns the number of players of a Premier League team in the squad
+
+        :param team: The Premier League team
+        :type team: str
+        :return: An integer of the number of players
+        """
+        return self.team_counts.get(team, 0)
+
+    def position_count(self, position: str) -> int:
+        """
+        Returns the number of players of a position in the squad
+
+        :param position: The position
+        :type position: str
+        :return: An integer of the number of players
+        """
+        return self.position_counts.get(position, 0)
+
+    def player(self, element) -> tuple:
+        """
+        Returns a player of the squad
+
+        :param element: Player ID
+        :type element: int
+        :return: The (element, position, team, cost, score) tuple of the player
+        """
+        return self.slots[self.slot_of[element]]
+
+    def team(self, element) -> str:
+        """
+        Returns the Premier League team of a player of the squad
+
+        :param element: Player ID
+        :type element: int
+        :return: A string of the team
+        """
+        return self.slots[self.slot_of[element]][2]
+
+    def player_score(self, element) -> float:
+        """
+        Returns the score of a player of the squad
+
+        :param element: Player ID
+        :type element: int
+        :return: A float of the score
+        """
+        return self.slots[self.slot_of[element]][4]
+
+    def add(self, element, position: str, team: str, cost: float, score: float) -> None:
+        """
+        Adds a player to the first empty slot
+
+        :param element: Player ID
+        :type element: int
+        :param position: The player's position
+        :type position: str
+        :param team: The player's Premier League team
+        :type team: str
+        :param cost: The player's cost
+        :type cost: float
+        :param score: The player's score
+        :type score: float
+        :return: None
+        """
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.slots)
+            self.slots.append(None)
+        self.place(slot, (element, position, team, cost, score))
+
+    def remove(self, element) -> tuple:
+        """
+        Removes a player and leaves his slot empty
+
+        :param element: Player ID
+        :type element: int
+        :return: The (element, position, team, cost, score) tuple of the removed player
+        """
+        slot = self.slot_of[element]
+        player = self.clear(slot)
+        self.free_slots.append(slot)
+        return player
+
+    def swap(self, out_element, element, position: str, team: str, cost: float, score: float) -> tuple:
+        """
+        Replaces a player with another one in the same slot
+
+        :param out_element: Player ID of the player leaving
+        :type out_element: int
+        :param element: Player ID of the player coming in
+        :type element: int
+        :param position: The new player's position
+        :type position: str
+        :param team: The new player's Premier League team
+        :type team: str
+        :param cost: The new player's cost
+        :type cost: float
+        :param score: The new player's score
+        :type score: float
+        :return: The (element, position, team, cost, score) tuple of the player leaving
+        """
+        slot = self.slot_of[out_element]
+        player = self.clear(slot)
+        self.place(slot, (element, position, team, cost, score))
+        return player
+
+    def place(self, slot: int, player: tuple) -> None:
+        """
+        Puts a player in an empty slot and updates the counters
+
+        :param slot: The slot
+        :type slot: int
+        :param player: The (element, position, team, cost, score) tuple of the player
+        :type player: tuple
+        :return: None
+        """
+        element, position, team, cost, score = player
+        self.slots[slot] = player
+        self.slot_of[element] = slot
+        self.team_counts[team] = self.team_counts.get(team, 0) + 1
+        self.position_counts[position] = self.position_counts.get(position, 0) + 1
+        self.score += score
+        self.cost += cost
+
+    def clear(self, slot: int) -> tuple:
+        """
+        Empties a slot and updates the counters
+
+        :param slot: The slot
+        :type slot: int
+        :return: The (element, position, team, cost, score) tuple of the player of the slot
+        """
+        player = self.slots[slot]
+        element, position, team, cost, score = player
+        self.slots[slot] = None
+        del self.slot_of[element]
+        self.team_counts[team] -= 1
+        self.position_counts[position] -= 1
+        self.score -= score
+        self.cost -= cost
+        return player
+
+    def copy(self):
+        """
+        Copies the squad (the players are immutable tuples, so only the containers are copied)
+
+        :return: A new SquadState
+        """
+        squad = SquadState.__new__(SquadState)
+        squad.slots = list(self.slots)
+        squad.slot_of = dict(self.slot_of)
+        squad.free_slots = list(self.free_slots)
+        squad.team_counts = dict(self.team_counts)
+        squad.position_counts = dict(self.position_counts)
+        squad.score = self.score
+        squad.cost = self.cost
+        return squad
+
+    def checkpoint(self):
+        """
+        Saves the state of the squad before trying moves
+
+        :return: A copy of the squad used by rollback
+        """
+        return self.copy()
+
+    def rollback(self, checkpoint) -> None:
+        """
+        Brings the squad back to a saved state
+
+        :param checkpoint: The state returned by checkpoint
+        :type checkpoint: SquadState
+        :return: None
+        """
+        for attribute in SquadState.__slots__:
+            value = getattr(checkpoint, attribute)
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            setattr(self, attribute, value)
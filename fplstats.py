@@ -1,12 +1,17 @@
 import numpy as np
+import pandas as pd
 import fplapi
+import fplscoring
+import fplfactors
 from fplapi import FPLapi
-import json
-from datetime import datetime
-from functools import cache
 
 MIN_GW_NUMBER = 1
 MAX_GW_NUMBER = 38
+# FDR given to a team without any fixtures in the chosen GW period
+BLANK_FDR = 9999
+# Default way of calculating the point formula factors (see FPLstats.calculation_factors). The factors.json file is
+# made with the incremental fitter, whose factors are on a different scale from the least squares exponents
+FACTOR_FITTER = "incremental"
 
 
 class FPLstats:
@@ -17,45 +22,94 @@ class FPLstats:
         fplapi: Calls the FPLapi class for getting information from the official source of the Fantasy Premier League
         player_data: Calls the method for the official Fantasy Premier League stats
         fdr_data: Calls the method for the official Fantasy Premier League FDR
+        fdr_cumulative: Array of the cumulative sums of 1/FDR per team (column n holds the sum of GWs 1 to n)
+        fdr_team_index: Array of the row of each player's team in the fdr_data
+        fdr_final: Array of the FDR of every team (in the order of the fdr_data) for the GW period of calculate_points
+        players: The PlayerTable used for looking up player stats (rebuilt with refresh_players)
+        prices: The PriceOverlay of the prices of the session (e.g. the selling prices of the user's team)
     """
     def __init__(self, username, password):
         # Getting the Dataframes
         self.fplapi = FPLapi(username, password)
-        self.player_data = self.fplapi.fpl_player_stats()
+        # The player data of the FPLapi is shared by every session, so the columns of the session (FDR and scores)
+        # are added to a shallow copy and the prices of the session are kept in an overlay
+        self.player_data = self.fplapi.fpl_player_stats().copy(deep=False)
         self.fdr_data = self.fplapi.fpl_fdr()
+        self.fdr_cumulative = fdr_cumulative_reciprocal(self.fdr_data)
+        self.fdr_team_index = pd.Index(self.fdr_data["team"]).get_indexer(self.player_data["team"])
+        self.fdr_final = np.zeros(0)
+        self.prices = PriceOverlay()
+        self.players = PlayerTable(self.player_data, self.prices)
         self.last_gw_number = 0
         np.set_printoptions(legacy="1.25")
 
-    def calculate_points(self) -> None:
+    def calculate_points(self, fdr_range: list = None) -> None:
         """
         Calculates the stats that are taken into account when creating the team or searching for players. The results
         are stored in the players Dataframe created in the fplapi.py
 
+        :param fdr_range: A list of the first and last GW of the calculation (asked for if None)
+        :type fdr_range: list
         :return: None
         """
         # Number of GWs to calculate
-        fdr_range = fdr_input()
-        fdr_gw = calculate_fdr(fdr_range[0], fdr_range[1])
+        if fdr_range is None:
+            fdr_range = fdr_input()
         # Number of GWs the statistics correspond to
         self.last_gw_number = fplapi.gw_played()
         # Calculating the FDR part of the function
-        self.fdr_product(fdr_gw)
+        self.fdr_product(fdr_range[0], fdr_range[1])
 
         # The functions used for team selection
         self.player_data["bonus_new"] = self.player_data["bonus"] + 1
         self.player_data["form_new"] = self.player_data["form"].astype(float) + (1/1000)
-        # Calculating points for player comparison
-        self.point_calculation(fdr_range[0], fdr_range[1])
-        # Calculating points for captaincy comparison
-        self.captain_points(fdr_range[0], fdr_range[1])
-        # Calculating points for transfer comparison
-        self.transfer_points(self.last_gw_number, fdr_range[0], fdr_range[1])
-        # Calculating points for manager comparison
-        self.manager_points(fdr_range[0], fdr_range[1])
+        # Calculating the points for player, captaincy, transfer and manager comparison
+        self.calculate_scores(fdr_range[0], fdr_range[1])
 
         self.player_data.sort_values(by=["point_calculation", "points_per_game"], ascending=False)
+        self.refresh_players()
+
+    def refresh_players(self) -> None:
+        """
+        Rebuilds the player lookup table. Needs to be called every time the scores in the player_data change (the
+        prices are changed with set_prices)
+
+        :return: None
+        """
+        self.players.rebuild(self.player_data)
+
+    def set_prices(self, prices: dict) -> None:
+        """
+        Sets the prices of players for this session only (e.g. the selling prices of the user's team), leaving the
+        shared player data unchanged
+
+        :param prices: Dictionary of the price of every player ID
+        :type prices: dict
+        :return: None
+        """
+        self.prices.update(prices)
+        self.players.reprice()
+
+    def clear_prices(self) -> None:
+        """
+        Removes the prices of the session, so the prices of the shared player data are used again
+
+        :return: None
+        """
+        self.prices.clear()
+        self.players.reprice()
+
+    def priced_player_data(self) -> pd.DataFrame:
+        """
+        Returns the player data with the prices of the session (a copy of the cost column is made only if the session
+        has any prices)
+
+        :return: A dataframe of the player stats
+        """
+        if len(self.prices) == 0:
+            return self.player_data
+        return self.player_data.assign(cost=self.prices.apply(self.player_data["id_x"], self.player_data["cost"]))
 
-    @cache
     def player_stat(self, player_element: str, statistic_value: str):
         """
         Returns a specific player's stat
@@ -66,255 +120,28 @@ class FPLstats:
         :type statistic_value: str
         :return: A specific stat for a specific player
         """
-        return (
-            self.player_data[statistic_value]
-            [self.player_data.index[self.player_data["id_x"] == player_element].tolist()[0]]
-        )
+        return self.players.stat(player_element, statistic_value)
 
-    def fdr_product(self, fdr_gw: list) -> None:
+    def fdr_window(self, first_gw_number: int, last_gw_number: int) -> np.ndarray:
         """
-        Calculates the FDR part of the function
+        Calculates the FDR of every team for a GW period. The FDR of multiple GWs combines as a harmonic sum
+        (f*g/(f+g)), so 1/FDR of the period is the sum of 1/FDR of its GWs and comes from two columns of the
+        cumulative sums
 
-        :param fdr_gw: A list of the first and last GWs included in the calculations
-        :type fdr_gw: list
-        :return: None
+        :param first_gw_number: An integer of the input of the first GW (or an array of them for many periods)
+        :type first_gw_number: int
+        :param last_gw_number: An integer of the input of the last GW (or an array of them for many periods)
+        :type last_gw_number: int
+        :return: An array of the FDR per team (in the order of the fdr_data), with a column per period for arrays
         """
-        fdr_index = []
-        for player_team in self.player_data["team"]:
-            fdr_index.append(self.fdr_data.index[self.fdr_data["team"] == player_team].tolist()[0])
-
-        # Calculating FDR for multiple GWs
-        fdr_rows = []
-        fdr_final = 0
-        fdr_final_list = []
-        fdr_final_list_calc = []
-        for gw in fdr_gw:
-            fdr_rows.append(self.fdr_data[gw].tolist())
-        if len(fdr_rows) == 1:
-            fdr_final_list_calc = fdr_rows[0]
-            for fdr_value in fdr_final_list_calc:
-                if np.isnan(fdr_value):
-                    fdr_final_list_calc[fdr_final_list_calc.index(fdr_value)] = 9999
-        else:
-            for i in range(20):
-                fdr_final_sublist = []
-                for row in fdr_rows:
-                    fdr_final_sublist.append(row[0])
-                    row.pop(0)
-                fdr_final_list.append(fdr_final_sublist)
-            for team_fdr in fdr_final_list:
-                i = 0
-                for fdr_value in team_fdr:
-                    if np.isnan(fdr_value):
-                        continue
-                    if i == 0 and not np.isnan(fdr_value):
-                        fdr_final = fdr_value
-                    else:
-                        fdr_final = fdr_final * fdr_value / (fdr_final + fdr_value)
-                    i += 1
-                fdr_final_list_calc.append(fdr_final)
-                fdr_final = 0
-        self.fdr_data["final"] = fdr_final_list_calc
-        self.player_data["fdr_final"] = ""
-        new_fdr_final_list = self.player_data["fdr_final"].to_list()
-        for i in range(len(new_fdr_final_list)):
-            new_fdr_final_list[i] = self.fdr_data["final"].to_list()[fdr_index[i]]
-        self.player_data["fdr_final"] = new_fdr_final_list
-
-    def calculation_factors(self) -> None:
-        """
-        Used to calculate the point formula factors for every value. Creates a .json file with the values
+        reciprocal_sum = self.fdr_cumulative[:, last_gw_number] - self.fdr_cumulative[:, first_gw_number - 1]
+        # Teams without any fixtures in the period
+        blank = reciprocal_sum <= 0
+        return np.where(blank, BLANK_FDR, 1 / np.where(blank, 1, reciprocal_sum))
 
-        :return: None
+    def fdr_product(self, first_gw_number: int, last_gw_number: int) -> None:
         """
-        try:
-            with open("factors.json", "r") as data:
-                factors = json.load(data)
-        except FileNotFoundError:
-            factors_dict_start = {}
-            for gw_start in range(1, 39):
-                factors_dict_start[gw_start] = {}
-                factors_dict_start[gw_start]["total_points_factor"] = 0
-                factors_dict_start[gw_start]["ppg_factor"] = 0
-                factors_dict_start[gw_start]["value_factor"] = 0
-                factors_dict_start[gw_start]["bonus_factor"] = 0
-                factors_dict_start[gw_start]["form_factor"] = 0
-                factors_dict_start[gw_start]["fdr_factor"] = 1
-                factors_dict_start[gw_start]["player_num"] = 1
-                factors_dict_start[gw_start]["gw"] = gw_start
-                factors_dict_start[gw_start]["last_date"] = "2023-08-17T14:00:00Z"
-            with open("factors.json", "w") as data:
-                json.dump(factors_dict_start, data, indent=4)
-            with open("factors.json", "r") as data_file:
-                factors = json.load(data_file)
-
-        for gw in factors.keys():
-            player_id_list = self.player_data["id_x"].tolist()
-            player_id_list.sort()
-            try:
-                player_check = fplapi.fpl_player_history(1, int(gw))
-            except IndexError:
-                player_check = fplapi.fpl_player_history(100, int(gw))
-            except KeyError:
-                return None
-            player_check_date = datetime.strptime(player_check["date"], "%Y-%m-%dT%H:%M:%SZ")
-            factors_check_date = datetime.strptime(factors[gw]["last_date"], "%Y-%m-%dT%H:%M:%SZ")
-            if (
-                player_check_date <= factors_check_date
-            ):
-                continue
-
-            new_total_points_factor = factors[gw]["total_points_factor"]
-            new_ppg_factor = factors[gw]["ppg_factor"]
-            new_value_factor = factors[gw]["value_factor"]
-            new_bonus_factor = factors[gw]["bonus_factor"]
-            new_form_factor = factors[gw]["form_factor"]
-            new_fdr_factor = factors[gw]["fdr_factor"]
-            new_player_num = factors[gw]["player_num"]
-
-            print(f"{gw}/{MAX_GW_NUMBER}")
-            for player_id in player_id_list:
-                print(f"{player_id}/{len(player_id_list)}")
-                try:
-                    player_history_data = fplapi.fpl_player_history(int(player_id), int(gw))
-                except IndexError:
-                    continue
-
-                if (
-                    player_history_data["total_points"] <= 0
-                    or player_history_data["ppg"] <= 0
-                    or player_history_data["value_season"] <= 0
-                    or player_history_data["bonus"] <= 0
-                    or player_history_data["form"] <= 0
-                ):
-                    continue
-                else:
-                    total_points_factor = player_history_data["gw_points"] / player_history_data["total_points"]
-                    ppg_factor = player_history_data["gw_points"] / player_history_data["ppg"]
-                    value_factor = player_history_data["gw_points"] / player_history_data["value_season"]
-                    bonus_factor = player_history_data["gw_points"] / player_history_data["bonus"]
-                    form_factor = player_history_data["gw_points"] / player_history_data["form"]
-
-                team = self.player_data[self.player_data["id_x"] == player_id]["team"].tolist()[0]
-                fdr = self.fdr_data[self.fdr_data["team"] == team][f"gw{gw}"].tolist()[0]
-                if np.isnan(fdr) or player_history_data["gw_points"] == 0:
-                    continue
-                else:
-                    fdr_factor = player_history_data["gw_points"] / fdr
-
-                if new_player_num == 1:
-                    new_total_points_factor = total_points_factor
-                    new_ppg_factor = ppg_factor
-                    new_value_factor = value_factor
-                    new_bonus_factor = bonus_factor
-                    new_form_factor = form_factor
-                    new_fdr_factor = fdr_factor
-                else:
-                    new_total_points_factor += (
-                        total_points_factor
-                        * (
-                           factors[gw]["player_num"]
-                           * total_points_factor
-                           - factors[gw]["total_points_factor"]
-                        )
-                        / (
-                           total_points_factor
-                           * factors[gw]["player_num"]
-                           * (factors[gw]["player_num"] + 1)
-                        )
-
-                    )
-                    new_ppg_factor += (
-                            ppg_factor
-                            * (
-                               factors[gw]["player_num"]
-                               * ppg_factor
-                               - factors[gw]["ppg_factor"]
-                            )
-                            / (
-                               ppg_factor
-                               * factors[gw]["player_num"]
-                               * (factors[gw]["player_num"] + 1)
-                            )
-
-                    )
-                    new_value_factor += (
-                            value_factor
-                            * (
-                               factors[gw]["player_num"]
-                               * value_factor
-                               - factors[gw]["value_factor"]
-                            )
-                            / (
-                               value_factor
-                               * factors[gw]["player_num"]
-                               * (factors[gw]["player_num"] + 1)
-                            )
-
-                    )
-                    new_bonus_factor += (
-                            bonus_factor
-                            * (
-                               factors[gw]["player_num"]
-                               * bonus_factor
-                               - factors[gw]["bonus_factor"]
-                            )
-                            / (
-                               bonus_factor
-                               * factors[gw]["player_num"]
-                               * (factors[gw]["player_num"] + 1)
-                            )
-
-                    )
-                    new_form_factor += (
-                            form_factor
-                            * (
-                               factors[gw]["player_num"]
-                               * form_factor
-                               - factors[gw]["form_factor"]
-                            )
-                            / (
-                               form_factor
-                               * factors[gw]["player_num"]
-                               * (factors[gw]["player_num"] + 1)
-                            )
-
-                    )
-                    new_fdr_factor += (
-                            fdr_factor
-                            * (
-                               factors[gw]["player_num"]
-                               * fdr_factor
-                               - factors[gw]["fdr_factor"]
-                            )
-                            / (
-                               fdr_factor
-                               * factors[gw]["player_num"]
-                               * (factors[gw]["player_num"] + 1)
-                            )
-
-                    )
-                new_player_num += 1
-                new_last_date = player_history_data["date"]
-                check_new_last_date = datetime.strptime(player_history_data["date"], "%Y-%m-%dT%H:%M:%SZ")
-
-                factors[gw]["total_points_factor"] = new_total_points_factor
-                factors[gw]["ppg_factor"] = new_ppg_factor
-                factors[gw]["value_factor"] = new_value_factor
-                factors[gw]["bonus_factor"] = new_bonus_factor
-                factors[gw]["form_factor"] = new_form_factor
-                factors[gw]["fdr_factor"] = new_fdr_factor
-                factors[gw]["player_num"] = new_player_num
-                factors[gw]["gw"] = int(gw)
-                if check_new_last_date >= datetime.strptime(factors[gw]["last_date"], "%Y-%m-%dT%H:%M:%SZ"):
-                    factors[gw]["last_date"] = new_last_date
-
-            with open("factors.json", "w") as data:
-                json.dump(factors, data, indent=4)
-
-    def point_calculation(self, first_gw_number: int, last_gw_number: int) -> None:
-        """
-        Calculates the basic points for player comparison
+        Calculates the FDR part of the function
 
         :param first_gw_number: An integer of the input of the first GW
         :type first_gw_number: int
@@ -322,203 +149,108 @@ class FPLstats:
         :type last_gw_number: int
         :return: None
         """
-        with open("factors.json", "r") as file:
-            factors = json.load(file)
-        factors_average = {
-            "total_points_factor": 0,
-            "ppg_factor": 0,
-            "value_factor": 0,
-            "bonus_factor": 0,
-            "form_factor": 0,
-            "fdr_factor": 0,
-        }
+        fdr_final = self.fdr_window(first_gw_number, last_gw_number)
+        # The fdr_data is shared by every session, so the FDR of the period is kept on the session
+        self.fdr_final = fdr_final
+        self.player_data["fdr_final"] = np.take(fdr_final, self.fdr_team_index)
 
-        for gw in range(first_gw_number, last_gw_number + 1):
-            factors_average["total_points_factor"] += factors[str(gw)]["total_points_factor"] / 10
-            factors_average["ppg_factor"] += factors[str(gw)]["ppg_factor"] / 10
-            factors_average["value_factor"] += factors[str(gw)]["value_factor"] / 10
-            factors_average["bonus_factor"] += factors[str(gw)]["bonus_factor"] / 10
-            factors_average["form_factor"] += factors[str(gw)]["form_factor"] / 10
-            factors_average["fdr_factor"] += factors[str(gw)]["fdr_factor"] / 10
-
-        self.player_data["point_calculation"] = (
-                self.player_data["total_points"]
-                ** factors_average["total_points_factor"]
-                * self.player_data["value_season"].astype(float)
-                ** factors_average["value_factor"]
-                * self.player_data["points_per_game"].astype(float)
-                ** factors_average["ppg_factor"]
-                * self.player_data["form_new"].astype(float)
-                ** factors_average["form_factor"]
-                * self.player_data["bonus_new"]
-                ** factors_average["bonus_factor"]
-                / (
-                   self.player_data["fdr_final"]
-                   ** factors_average["fdr_factor"]
-                )
-        )
-
-        self.player_data["point_calculation"] = (
-                self.player_data["point_calculation"]
-                * 100
-                / (max(self.player_data["point_calculation"]) + 1)
-        )
-
-    def captain_points(self, first_gw_number: int, last_gw_number: int) -> None:
-        """
-        Calculates the captaincy points
-
-        :param first_gw_number: An integer of the input of the first GW
-        :type first_gw_number: int
-        :param last_gw_number: An integer of the input of the last GW
-        :type last_gw_number: int
+    def calculation_factors(self, fitter: str = FACTOR_FITTER) -> None:
+        """
+        Used to calculate the point formula factors for every value. Creates a .json file with the values. Only the
+        GWs finished after their last update are fitted, and the collected players are checkpointed, so an interrupted
+        update resumes from the players left
+
+        :param fitter: Option between 'incremental' (every player is added to the running factors) and 'least_squares'
+        (one fit of all the players per GW) that determines how the factors are calculated. Only the new GWs are
+        fitted, so the fitter needs to be the one the factors.json file was made with (the scores average the factors
+        of many GWs)
+        :type fitter: str
         :return: None
         """
-        with open("factors.json", "r") as file:
-            factors = json.load(file)
-        factors_average = {
-            "total_points_factor": 0,
-            "ppg_factor": 0,
-            "value_factor": 0,
-            "bonus_factor": 0,
-            "form_factor": 0,
-            "fdr_factor": 0,
-        }
+        store = fplfactors.FactorStore()
+        # Finished Gameweeks that haven't been fitted yet
+        finished_gameweeks = fplapi.finished_gameweeks()
+        update_gws = store.update_gameweeks(finished_gameweeks)
+        if len(update_gws) == 0:
+            return None
+
+        player_id_list = self.player_data["id_x"].tolist()
+        player_id_list.sort()
+        player_teams = dict(zip(self.player_data["id_x"].tolist(), self.player_data["team"].tolist()))
+        fdr_rows = {team: row for row, team in enumerate(self.fdr_data["team"].tolist())}
+        # The FDR of every team for the Gameweeks of the update
+        fdr_values = self.fdr_data[[f"gw{gw}" for gw in update_gws]].to_numpy(dtype=float)
+        # Players already collected before an interrupted update are skipped
+        missing_players = store.missing_players(player_id_list, update_gws)
+
+        print(f"GWs: {', '.join(update_gws)}/{MAX_GW_NUMBER}")
+        # The element-summary requests run concurrently and every player is recorded for each Gameweek as soon as his
+        # history arrives (the store sorts the players by ID for the fit)
+        player_histories = fplapi.fetch_player_histories(missing_players)
+        for player_number, (player_id, player_history) in enumerate(player_histories, start=1):
+            print(f"\r{len(player_id_list) - len(missing_players) + player_number}/{len(player_id_list)}", end="")
+            team_fdr = fdr_values[fdr_rows[player_teams[player_id]]]
+            for g, gw in enumerate(update_gws):
+                store.add(gw, player_id, player_history.get(int(gw)), team_fdr[g])
+            if player_number % fplfactors.CHECKPOINT_EVERY == 0:
+                store.save_checkpoint()
+        store.save_checkpoint()
+        print("")
+
+        # The Gameweeks are fitted in parallel processes
+        fitted_gameweeks = fplfactors.fit_gameweeks(store, update_gws, fitter)
+        for gw in update_gws:
+            gw_factors, last_date = fitted_gameweeks[gw]
+            store.commit(gw, gw_factors, last_date or finished_gameweeks[int(gw)])
+
+    def calculate_scores(self, first_gw_number: int, last_gw_number: int) -> None:
+        """
+        Calculates the points for player, captaincy, transfer and manager comparison (the formulas of
+        fplscoring.SCORE_FORMULAS) in one pass
 
-        for gw in range(first_gw_number, last_gw_number + 1):
-            factors_average["total_points_factor"] += factors[str(gw)]["total_points_factor"] / 10
-            factors_average["ppg_factor"] += factors[str(gw)]["ppg_factor"] / 10
-            factors_average["value_factor"] += factors[str(gw)]["value_factor"] / 10
-            factors_average["bonus_factor"] += factors[str(gw)]["bonus_factor"] / 10
-            factors_average["form_factor"] += factors[str(gw)]["form_factor"] / 10
-            factors_average["fdr_factor"] += factors[str(gw)]["fdr_factor"] / 10
-
-        self.player_data["captain_points"] = (
-                self.player_data["total_points"]
-                ** (2 * factors_average["total_points_factor"])
-                * self.player_data["points_per_game"].astype(float)
-                ** factors_average["ppg_factor"]
-                * self.player_data["form_new"].astype(float)
-                ** factors_average["form_factor"]
-                * self.player_data["bonus_new"]
-                ** factors_average["bonus_factor"]
-                / (
-                   self.player_data["fdr_final"]
-                   ** factors_average["fdr_factor"]
-                )
-        )
-
-        self.player_data["captain_points"] = (
-                self.player_data["captain_points"]
-                * 100
-                / (max(self.player_data["captain_points"]) + 1)
-        )
-
-    def transfer_points(self, gw_number: int, first_gw_number: int, last_gw_number: int) -> None:
-        """
-        Calculates the transfer points
-
-        :param gw_number: An integer of the number of GWs played
-        :type gw_number: int
         :param first_gw_number: An integer of the input of the first GW
         :type first_gw_number: int
         :param last_gw_number: An integer of the input of the last GW
         :type last_gw_number: int
         :return: None
         """
-        with open("factors.json", "r") as file:
-            factors = json.load(file)
-        factors_average = {
-            "total_points_factor": 0,
-            "ppg_factor": 0,
-            "value_factor": 0,
-            "bonus_factor": 0,
-            "form_factor": 0,
-            "fdr_factor": 0,
-        }
+        factors = fplscoring.average_factors(fplscoring.load_factors(), first_gw_number, last_gw_number)
+        engine = fplscoring.ScoringEngine(self.priced_player_data(), self.last_gw_number)
+        scores = fplscoring.normalize(engine.scores(factors))
+        for i, score_name in enumerate(engine.score_names):
+            self.player_data[score_name] = scores[:, i]
 
-        for gw in range(first_gw_number, last_gw_number + 1):
-            factors_average["total_points_factor"] += factors[str(gw)]["total_points_factor"] / 10
-            factors_average["ppg_factor"] += factors[str(gw)]["ppg_factor"] / 10
-            factors_average["value_factor"] += factors[str(gw)]["value_factor"] / 10
-            factors_average["bonus_factor"] += factors[str(gw)]["bonus_factor"] / 10
-            factors_average["form_factor"] += factors[str(gw)]["form_factor"] / 10
-            factors_average["fdr_factor"] += factors[str(gw)]["fdr_factor"] / 10
-
-        self.player_data["transfer_points"] = (
-                np.abs(self.player_data["total_points"] - 4)
-                ** (
-                    factors_average["total_points_factor"]
-                    + factors_average["value_factor"]
-                    + factors_average["ppg_factor"]
-                )
-                * self.player_data["bonus_new"]
-                ** factors_average["bonus_factor"]
-                * (
-                   np.abs(self.player_data["form_new"].astype(float) - (4 / 5.0))
-                   ** factors_average["form_factor"]
-                )
-                / (
-                   self.player_data["cost"]
-                   ** factors_average["value_factor"]
-                   * self.player_data["fdr_final"]
-                   ** factors_average["fdr_factor"]
-                   * gw_number
-                   ** factors_average["ppg_factor"]
-                )
-        )
-
-        self.player_data["transfer_points"] = (
-                self.player_data["transfer_points"]
-                * 100
-                / (max(self.player_data["transfer_points"]) + 1)
-        )
-
-    def manager_points(self, first_gw_number: int, last_gw_number: int) -> None:
-        """
-        Calculates points for manager comparison
+    def window_scores(self, windows: list, score_name: str = "point_calculation") -> np.ndarray:
+        """
+        Calculates a score of every player for many GW windows in one pass, each window with its own averaged factors
+        and FDR (the same score calculate_scores gives for that window). Needs the stats added by calculate_points
+
+        :param windows: A list of the (first GW, last GW) of every window
+        :type windows: list
+        :param score_name: The score (a formula of fplscoring.SCORE_FORMULAS)
+        :type score_name: str
+        :return: An array of players x windows (in the order of the player_data)
+        """
+        firsts = np.array([window[0] for window in windows])
+        lasts = np.array([window[1] for window in windows])
+        factors = fplscoring.window_factors(fplscoring.load_factors(), windows)
+        fdr = np.take(self.fdr_window(firsts, lasts), self.fdr_team_index, axis=0)
+        engine = fplscoring.ScoringEngine(self.priced_player_data(), self.last_gw_number, [score_name])
+        scores = engine.sweep(factors, window_features={"fdr_final": fdr})[:, 0, :]
+        return fplscoring.normalize(scores)
+
+    def gameweek_points(self, first_gw_number: int, last_gw_number: int) -> np.ndarray:
+        """
+        Calculates the basic points of every player for every GW of a period, each with the factors and the FDR of
+        its own GW (used by the Gameweek planner). Needs the stats added by calculate_points
 
         :param first_gw_number: An integer of the input of the first GW
         :type first_gw_number: int
         :param last_gw_number: An integer of the input of the last GW
         :type last_gw_number: int
-        :return: None
+        :return: An array of players x GWs (in the order of the player_data)
         """
-        with open("factors.json", "r") as file:
-            factors = json.load(file)
-        factors_average = {
-            "total_points_factor": 0,
-            "ppg_factor": 0,
-            "value_factor": 0,
-            "bonus_factor": 0,
-            "form_factor": 0,
-            "fdr_factor": 0,
-        }
-
-        for gw in range(first_gw_number, last_gw_number + 1):
-            factors_average["total_points_factor"] += factors[str(gw)]["total_points_factor"] / 10
-            factors_average["ppg_factor"] += factors[str(gw)]["ppg_factor"] / 10
-            factors_average["value_factor"] += factors[str(gw)]["value_factor"] / 10
-            factors_average["bonus_factor"] += factors[str(gw)]["bonus_factor"] / 10
-            factors_average["form_factor"] += factors[str(gw)]["form_factor"] / 10
-            factors_average["fdr_factor"] += factors[str(gw)]["fdr_factor"] / 10
-
-        self.player_data["manager_points"] = (
-            self.player_data["total_points"]
-            ** (3 * factors_average["total_points_factor"])
-            * self.player_data["form_new"].astype(float)
-            ** factors_average["form_factor"]
-            / (
-                self.player_data["fdr_final"]
-                ** factors_average["fdr_factor"]
-            )
-        )
-
-        self.player_data["manager_points"] = (
-                self.player_data["manager_points"]
-                * 100
-                / (max(self.player_data["manager_points"]) + 1)
-        )
+        return self.window_scores([(gw, gw) for gw in range(first_gw_number, last_gw_number + 1)])
 
 
 def fdr_input() -> list:
@@ -549,20 +281,212 @@ def fdr_input() -> list:
     return [first_gw_number, last_gw_number]
 
 
-def calculate_fdr(first_gw_number: int, last_gw_number: int) -> list:
+def next_windows(first_gw_number: int, lengths: list) -> list:
     """
-    Calculates the FDR based on the user's input
+    Creates the GW windows of different lengths starting from the same GW (cut at the last GW of the season)
 
-    :param first_gw_number: An integer of the input of the first GW
+    :param first_gw_number: An integer of the first GW of every window
     :type first_gw_number: int
-    :param last_gw_number: An integer of the input of the last GW
-    :type last_gw_number: int
-    :return: A list of the GWs that are going to be included in the calculations
+    :param lengths: A list of the number of GWs of every window (e.g. [1, 3, 5, 8])
+    :type lengths: list
+    :return: A list of the (first GW, last GW) of every window
+    """
+    return [(first_gw_number, min(first_gw_number + length - 1, MAX_GW_NUMBER)) for length in lengths]
+
+
+class PriceOverlay:
+    """
+    Sparse map of the prices of a session that differ from the shared player data (e.g. the selling prices of the
+    user's team). The shared data is never changed, so many sessions can use one loaded dataset
+
+    Attributes:
+        prices: Dictionary of the price of every player ID of the overlay
+    """
+    def __init__(self, prices: dict = None):
+        self.prices = {}
+        if prices is not None:
+            self.update(prices)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def update(self, prices: dict) -> None:
+        """
+        Sets the prices of players
+
+        :param prices: Dictionary of the price of every player ID
+        :type prices: dict
+        :return: None
+        """
+        for element, price in prices.items():
+            self.prices[int(element)] = float(price)
+
+    def clear(self) -> None:
+        """
+        Removes every price, so the prices of the shared player data are used
+
+        :return: None
+        """
+        self.prices = {}
+
+    def apply(self, elements, costs) -> np.ndarray:
+        """
+        Applies the overlay to the costs of the shared data (the costs are copied, never changed)
+
+        :param elements: The player IDs
+        :param costs: The costs of the shared data (in the order of the IDs)
+        :return: An array of the costs with the prices of the overlay
+        """
+        costs = np.array(costs, dtype=float)
+        if len(self.prices) == 0:
+            return costs
+        elements = np.asarray(elements)
+        overlay_elements = np.fromiter(self.prices.keys(), dtype=np.int64, count=len(self.prices))
+        overlay_prices = np.fromiter(self.prices.values(), dtype=float, count=len(self.prices))
+        order = np.argsort(overlay_elements)
+        overlay_elements, overlay_prices = overlay_elements[order], overlay_prices[order]
+        positions = np.clip(np.searchsorted(overlay_elements, elements), 0, len(overlay_elements) - 1)
+        found = overlay_elements[positions] == elements
+        costs[found] = overlay_prices[positions[found]]
+        return costs
+
+
+class PlayerTable:
+    """
+    Player ID indexed copy of the player data with a contiguous NumPy array per stat, used for constant-time lookups.
+    The cost column holds the prices of the PriceOverlay of the session
+
+    Attributes:
+        columns: Dictionary of the array of every stat
+        rows: Dictionary of the row of every player ID in the arrays
+        rankings: Dictionary of the (elements, scores, costs) of every (position, stat), sorted by the stat
+        (descending) and built on the first query
+        prices: The PriceOverlay applied to the costs
+        base_costs: Array of the costs of the shared player data
+    """
+    def __init__(self, player_data: pd.DataFrame, prices: PriceOverlay = None):
+        self.columns = {}
+        self.rows = {}
+        self.rankings = {}
+        self.prices = prices if prices is not None else PriceOverlay()
+        self.base_costs = np.zeros(0)
+        self.rebuild(player_data)
+
+    def rebuild(self, player_data: pd.DataFrame) -> None:
+        """
+        Copies the player data into the arrays
+
+        :param player_data: The dataframe of the player stats
+        :type player_data: pd.DataFrame
+        :return: None
+        """
+        self.columns = {
+            statistic_value: np.ascontiguousarray(player_data[statistic_value].to_numpy())
+            for statistic_value in player_data.columns
+        }
+        self.rows = {element: row for row, element in enumerate(player_data["id_x"].tolist())}
+        self.base_costs = self.columns["cost"]
+        self.reprice()
+
+    def reprice(self) -> None:
+        """
+        Applies the PriceOverlay to the cost column. Needs to be called every time the overlay changes
+
+        :return: None
+        """
+        self.columns["cost"] = self.prices.apply(self.columns["id_x"], self.base_costs)
+        self.rankings = {}
+
+    def with_prices(self, prices: PriceOverlay) -> "PlayerTable":
+        """
+        Creates a table with other prices that shares every array of this table except the cost column (used for
+        running many teams against one loaded table)
+
+        :param prices: The PriceOverlay of the new table
+        :type prices: PriceOverlay
+        :return: The new PlayerTable
+        """
+        table = PlayerTable.__new__(PlayerTable)
+        table.columns = dict(self.columns)
+        table.rows = self.rows
+        table.base_costs = self.base_costs
+        table.prices = prices
+        table.reprice()
+        return table
+
+    def stat(self, player_element: int, statistic_value: str):
+        """
+        Returns a specific player's stat
+
+        :param player_element: Player ID
+        :type player_element: int
+        :param statistic_value: Type of stat returned
+        :type statistic_value: str
+        :return: A specific stat for a specific player
+        """
+        return self.columns[statistic_value][self.rows[player_element]]
+
+    def ranking(self, position: str, statistic_value: str) -> tuple:
+        """
+        Returns the players of a position sorted by a stat (descending), with their stats and costs in parallel arrays
+
+        :param position: The position
+        :type position: str
+        :param statistic_value: The stat the players are sorted by
+        :type statistic_value: str
+        :return: A tuple of the player IDs (list), the stats and the costs (arrays)
+        """
+        key = (position, statistic_value)
+        if key not in self.rankings:
+            rows = np.flatnonzero(self.columns["position"] == position)
+            scores = np.asarray(self.columns[statistic_value][rows], dtype=float)
+            # Players without a valid stat go last
+            order = np.argsort(-scores, kind="stable")
+            rows = rows[order]
+            self.rankings[key] = (
+                self.columns["id_x"][rows].tolist(), scores[order], np.asarray(self.columns["cost"][rows], dtype=float)
+            )
+        return self.rankings[key]
+
+    def candidates(self, position: str, statistic_value: str, min_score: float = None, strict: bool = True,
+                   max_cost: float = None) -> list:
+        """
+        Finds the players of a position with a stat over 'min_score' and a cost of at most 'max_cost'. The players
+        over the score come from a binary search of the ranking, so only they are checked for the cost
+
+        :param position: The position
+        :type position: str
+        :param statistic_value: The stat the players are compared by
+        :type statistic_value: str
+        :param min_score: The stat the players need to beat (no limit if None)
+        :type min_score: float
+        :param strict: Whether a stat equal to 'min_score' is left out
+        :type strict: bool
+        :param max_cost: The maximum cost (no limit if None)
+        :type max_cost: float
+        :return: A list of the player IDs sorted by the stat (descending)
+        """
+        elements, scores, costs = self.ranking(position, statistic_value)
+        end = len(elements)
+        if min_score is not None:
+            end = int(np.searchsorted(-scores, -min_score, side="left" if strict else "right"))
+        if max_cost is None:
+            return elements[:end]
+        # The costs are compared in 0.1m units (as the optimizer does), so float errors don't decide the limit
+        return [elements[i] for i in np.flatnonzero(np.rint(costs[:end] * 10) <= np.rint(max_cost * 10))]
+
+
+def fdr_cumulative_reciprocal(fdr_data: pd.DataFrame) -> np.ndarray:
+    """
+    Calculates the cumulative sums of 1/FDR per team used for the FDR of any GW period (blank GWs add nothing)
+
+    :param fdr_data: The dataframe of the FDR per team and GW
+    :type fdr_data: pd.DataFrame
+    :return: An array of teams x (GWs + 1), where column n holds the sum of 1/FDR of GWs 1 to n
     """
-    fdr_gw = []
-    for gw in range(first_gw_number, last_gw_number + 1):
-        fdr_gw.append(f"gw{gw}")
-    return fdr_gw
+    fdr_values = fdr_data[[f"gw{gw}" for gw in range(MIN_GW_NUMBER, MAX_GW_NUMBER + 1)]].to_numpy(dtype=float)
+    reciprocal = np.where(np.isnan(fdr_values), 0.0, 1 / fdr_values)
+    return np.concatenate([np.zeros((len(fdr_values), 1)), np.cumsum(reciprocal, axis=1)], axis=1)
 
 
 # if __name__ == "__main__":
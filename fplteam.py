@@ -1,4 +1,7 @@
-from fplstats import FPLstats
+from fplstats import FPLstats, MIN_GW_NUMBER, MAX_GW_NUMBER
+from fplsquad import SquadState
+import fploptimizer
+import fpltransfers
 from itertools import combinations
 from unidecode import unidecode
 from datetime import datetime
@@ -12,9 +15,9 @@ class FPLteam:
 
     Attributes:
         fpl: Calls the FPLstats class for using player stats and calculating points
+        squad: SquadState of the team's players with their positions, Premier League teams, costs and points
         team: List of the players of the team
-        team_positions: List of the team's players' positions
-        player_teams: List of the team's players' Premier League team
+        team_elements: List of the player IDs of the team
         managers: List of possible managers
         points_sum: Float of the total points calculated for the team based on the program's formula
         player_points: List of the individual players' calculated points
@@ -29,18 +32,13 @@ class FPLteam:
         managers_prices: List of managers' prices
         unavailable_players_list: List of players excluded from the calculation
         system: List of number of players per position in the team
+        auto_system: Whether the best system is picked by the optimizer instead of the user
     """
     def __init__(self, username, password):
         self.fpl = FPLstats(username, password)
 
-        self.team = []
-        self.team_elements = []
-        self.team_positions = []
-        self.player_teams = []
+        self.squad = SquadState()
         self.managers = []
-        self.points_sum = 0.0
-        self.player_points = []
-        self.captain_points = []
         self.manager_points = []
         self.total_budget = 100.0
         self.starters_budget = 0.0
@@ -52,33 +50,89 @@ class FPLteam:
         self.unavailable_players_list = []
         self.unavailable_players_list_elements = []
         self.system = [9999, 9999, 9999]
+        self.auto_system = False
 
         self.fpl.calculate_points()
 
-    def add_player(self, mode: str, element: str) -> None:
+    @property
+    def team(self) -> list:
         """
-        Adds a player's statistics to the team lists
+        Lists the names of the team's players
+
+        :return: A list of the players of the team
+        """
+        return [self.fpl.player_stat(element, "name") for element in self.squad.elements()]
+
+    @property
+    def team_elements(self) -> list:
+        """
+        Lists the player IDs of the team
+
+        :return: A list of the player IDs
+        """
+        return self.squad.elements()
+
+    @property
+    def points_sum(self) -> float:
+        """
+        Returns the total points calculated for the team
+
+        :return: A float of the total points
+        """
+        return self.squad.score
+
+    @property
+    def player_points(self) -> list:
+        """
+        Lists the individual players' calculated points
+
+        :return: A list of the players' points
+        """
+        return [player[4] for player in self.squad.players()]
+
+    @property
+    def captain_points(self) -> list:
+        """
+        Lists the individual players' calculated points for captaincy
+
+        :return: A list of the players' captaincy points
+        """
+        return [self.fpl.player_stat(element, "captain_points") for element in self.squad.elements()]
+
+    def squad_player(self, mode: str, element) -> tuple:
+        """
+        Gathers the statistics of a player that the squad keeps
 
         :param mode: Option between 'normal' and 'free_hit' that determines the type of update
         :type mode: str
         :param element: Player ID
         :type element: str
-        :return: None
+        :return: The (element, position, team, cost, points) tuple of the player
         """
         calculation_mode = ""
         if mode == "normal":
             calculation_mode = "point_calculation"
         elif mode == "free_hit":
             calculation_mode = "captain_points"
-        self.team_positions.append(self.fpl.player_stat(element, "position"))
-        self.team.append(self.fpl.player_stat(element, "name"))
-        self.points_sum += self.fpl.player_stat(element, calculation_mode)
-        self.player_teams.append(self.fpl.player_stat(element, "team"))
-        self.starters_budget += round(self.fpl.player_stat(element, "cost"), 1)
-        self.bank_budget -= round(self.fpl.player_stat(element, "cost"), 1)
-        self.player_points.append(self.fpl.player_stat(element, calculation_mode))
-        self.captain_points.append(self.fpl.player_stat(element, "captain_points"))
-        self.team_elements.append(element)
+        return (
+            element, self.fpl.player_stat(element, "position"), self.fpl.player_stat(element, "team"),
+            round(self.fpl.player_stat(element, "cost"), 1), self.fpl.player_stat(element, calculation_mode)
+        )
+
+    def add_player(self, mode: str, element: str) -> None:
+        """
+        Adds a player's statistics to the team lists
+
+        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
+        :type mode: str
+        :param element: Player ID
+        :type element: str
+        :return: None
+        """
+        player = self.squad_player(mode, element)
+        self.squad.add(*player)
+        self.starters_budget += player[3]
+        self.bank_budget -= player[3]
 
     def remove_player(self, mode: str, element: str) -> None:
         """
@@ -90,20 +144,28 @@ class FPLteam:
         :type element: str
         :return: None
         """
-        calculation_mode = ""
-        if mode == "normal":
-            calculation_mode = "point_calculation"
-        elif mode == "free_hit":
-            calculation_mode = "captain_points"
-        self.team_positions.pop(self.team.index(self.fpl.player_stat(element, "name")))
-        self.points_sum -= self.fpl.player_stat(element, calculation_mode)
-        self.player_teams.pop(self.team.index(self.fpl.player_stat(element, "name")))
-        self.starters_budget -= round(self.fpl.player_stat(element, "cost"), 1)
-        self.bank_budget += round(self.fpl.player_stat(element, "cost"), 1)
-        self.player_points.pop(self.team.index(self.fpl.player_stat(element, "name")))
-        self.captain_points.pop(self.team.index(self.fpl.player_stat(element, "name")))
-        self.team.remove(self.fpl.player_stat(element, "name"))
-        self.team_elements.remove(element)
+        cost = round(self.fpl.player_stat(element, "cost"), 1)
+        self.squad.remove(element)
+        self.starters_budget -= cost
+        self.bank_budget += cost
+
+    def swap_player(self, mode: str, out_element: str, element: str) -> None:
+        """
+        Replaces a player of the team with another one in the same place of the team lists
+
+        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
+        :type mode: str
+        :param out_element: Player ID of the player leaving
+        :type out_element: str
+        :param element: Player ID of the player coming in
+        :type element: str
+        :return: None
+        """
+        player = self.squad_player(mode, element)
+        out_cost = round(self.fpl.player_stat(out_element, "cost"), 1)
+        self.squad.swap(out_element, *player)
+        self.starters_budget += player[3] - out_cost
+        self.bank_budget -= player[3] - out_cost
 
     def reset_info(self) -> None:
         """
@@ -111,14 +173,8 @@ class FPLteam:
 
         :return: None
         """
-        self.team = []
-        self.team_elements = []
-        self.team_positions = []
-        self.player_teams = []
+        self.squad = SquadState()
         self.managers = []
-        self.points_sum = 0.0
-        self.player_points = []
-        self.captain_points = []
         self.manager_points = []
         self.total_budget = 100.0
         self.starters_budget = 0.0
@@ -130,6 +186,9 @@ class FPLteam:
         self.unavailable_players_list = []
         self.unavailable_players_list_elements = []
         self.system = [9999, 9999, 9999]
+        self.auto_system = False
+        # The selling prices of a previous team aren't kept
+        self.fpl.clear_prices()
 
     def print_result(self) -> None:
         """
@@ -139,15 +198,17 @@ class FPLteam:
         """
         print(f"\nIn the bank: {round(self.bank_budget, 1)}")
         print(f"Squad transfer value: {round(self.starters_budget, 1)}")
-        print(f"Squad: {self.team}")
-        print(f"Potential captains: 1) {self.team[self.captain_points.index(max(self.captain_points))]}"
-              f"\t2) {self.team[self.captain_points.index(sorted(self.captain_points)[-2])]}")
+        team = self.team
+        captain_points = self.captain_points
+        print(f"Squad: {team}")
+        print(f"Potential captains: 1) {team[captain_points.index(max(captain_points))]}"
+              f"\t2) {team[captain_points.index(sorted(captain_points)[-2])]}")
         self.manager_pick()
         print(f"Potential manager: {self.managers[self.manager_points.index(max(self.manager_points))]}")
         print(f"Manager price: {self.managers_prices[self.manager_points.index(max(self.manager_points))]}")
         print(f"Total points: {self.points_sum}")
         print(f"Each player's points: {self.player_points}")
-        print(f"Captaincy points: {self.captain_points}")
+        print(f"Captaincy points: {captain_points}")
         print(f"Manager points: {self.manager_points[self.manager_points.index(max(self.manager_points))]}")
 
     def create_new_team(self, username, password) -> None:
@@ -163,13 +224,21 @@ class FPLteam:
         total_money = self.total_budget
         changes_money = self.changes_budget
         self.reset_info()
-        self.choose_system()
+        # The selling prices of the user's team are kept for the new team
+        self.fpl.set_prices(self.fpl.fplapi.team_snapshot().selling_prices())
+        self.choose_system(allow_auto=True)
+        builder_choice = "exact" if self.auto_system else enter_builder_choice()
         self.bank_budget = bank_money
         self.total_budget = total_money
         self.changes_budget = changes_money
 
-        self.create_loop_players(mode="normal")
-        self.update_team(mode="normal")
+        if self.auto_system:
+            self.optimize_systems(mode="normal")
+        elif builder_choice == "exact":
+            self.optimize_team(mode="normal")
+        else:
+            self.create_loop_players(mode="normal")
+            self.update_team(mode="normal")
         for element in self.team_elements:
             self.starters_prices.append(self.fpl.player_stat(element, "cost"))
 
@@ -184,12 +253,20 @@ class FPLteam:
         bank_money = self.total_budget - 16.5
         total_budget = self.total_budget
         self.reset_info()
-        self.choose_system()
+        # The selling prices of the user's team are kept for the new team
+        self.fpl.set_prices(self.fpl.fplapi.team_snapshot().selling_prices())
+        self.choose_system(allow_auto=True)
+        builder_choice = "exact" if self.auto_system else enter_builder_choice()
         self.bank_budget = bank_money
         self.total_budget = total_budget
 
-        self.create_loop_players(mode="free_hit")
-        self.update_team(mode="free_hit")
+        if self.auto_system:
+            self.optimize_systems(mode="free_hit")
+        elif builder_choice == "exact":
+            self.optimize_team(mode="free_hit")
+        else:
+            self.create_loop_players(mode="free_hit")
+            self.update_team(mode="free_hit")
 
     def enter_new_team(self) -> None:
         """
@@ -202,7 +279,7 @@ class FPLteam:
         budget_choice = enter_budget_choice()
 
         print("\nPlease enter your team (or type 'cancel' to go back).")
-        while len(self.team) < 11:
+        while len(self.squad) < 11:
             team_player = enter_player()
             player_price = enter_budget(budget_choice)
             self.enter_loop_players(team_player, budget_choice, player_price)
@@ -295,7 +372,7 @@ class FPLteam:
         # Values that are going to be checked from the team
         changing_players_elements = []
         final_changing_players_elements = []
-        temp_teams = [team for team in self.player_teams]
+        temp_squad = self.squad.copy()
         temp_teams_change = []
         max_budget = []
         used_players_elements = []
@@ -318,16 +395,16 @@ class FPLteam:
                 # Loop again and retry all players
                 # (basically try the players that might have been suitable before the change by looping again)
                 for player_element in changing_players_elements:
-                    if player_element in self.team_elements or player_element in used_players_elements:
+                    if player_element in self.squad or player_element in used_players_elements:
                         # First check replacing players without checking points just to remove them
                         self.change_players_first_loop(
                             used_players_elements, changing_players_elements, player_element, max_budget,
-                            temp_teams, temp_teams_change, mode=mode
+                            temp_squad, temp_teams_change, mode=mode
                         )
                     else:
                         self.change_players_more_loops(
                             used_players_elements, changing_players_elements, player_element, max_budget,
-                            temp_teams, temp_teams_change, mode=mode
+                            temp_squad, temp_teams_change, mode=mode
                         )
         for player_element in changing_players_elements:
             self.add_player(mode="normal", element=player_element)
@@ -354,7 +431,7 @@ class FPLteam:
             for i in range(11):
                 # Loop again and retry all players
                 # (basically try the players that might have been suitable before the change by looping again)
-                for player_element in self.team_elements:
+                for player_element in self.squad.elements():
                     if (
                         player_element in self.unavailable_players_list_elements
                         or player_element in used_players_elements
@@ -365,6 +442,78 @@ class FPLteam:
                         self.update_team_more_loops(used_players_elements, player_element, max_budget, mode)
         self.print_result()
 
+    def squad_candidates(self, mode: str) -> fploptimizer.SquadCandidates:
+        """
+        Gathers the players that the exact optimizer can pick (managers and excluded players are left out)
+
+        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
+        :type mode: str
+        :return: The SquadCandidates of the optimizer
+        """
+        calculation_mode = ""
+        if mode == "normal":
+            calculation_mode = "point_calculation"
+        elif mode == "free_hit":
+            calculation_mode = "captain_points"
+        players = self.fpl.players.columns
+        return fploptimizer.SquadCandidates(
+            players["id_x"], players["position"], players["team"], players["cost"], players[calculation_mode],
+            excluded_elements=self.unavailable_players_list_elements
+        )
+
+    def optimize_team(self, mode: str) -> None:
+        """
+        Creates the best possible starting 11 for the system with the exact optimizer (replaces the create_loop_players
+        and update_team loops)
+
+        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
+        :type mode: str
+        :return: None
+        """
+        max_budget = round(self.total_budget - self.changes_budget, 1)
+        result = fploptimizer.optimize_squad(self.squad_candidates(mode), self.system, max_budget)
+        if result is None:
+            print("\nThere is no valid team for the given budget.")
+            raise ValueError
+        for element in result["elements"]:
+            self.add_player(mode=mode, element=element)
+        if result["optimal"]:
+            print("\nOptimal team found.")
+        else:
+            print(f"\nBest team found (optimality gap: {round(result['gap'], 2)} points).")
+        self.print_result()
+
+    def optimize_systems(self, mode: str, processes: int = 1) -> None:
+        """
+        Creates the best possible starting 11 out of every valid system with the exact optimizer and keeps the best
+        system
+
+        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
+        :type mode: str
+        :param processes: The number of processes the systems are divided into
+        :type processes: int
+        :return: None
+        """
+        max_budget = round(self.total_budget - self.changes_budget, 1)
+        results = fploptimizer.optimize_systems(self.squad_candidates(mode), max_budget, processes=processes)
+        if results["best"] is None:
+            print("\nThere is no valid team for the given budget.")
+            raise ValueError
+
+        print("\nSystem\t\tTotal points")
+        for system_name, result in results["systems"].items():
+            if result is None:
+                print(f"{system_name:<16}-")
+            else:
+                print(f"{system_name:<16}{round(result['score'], 2)}")
+        print(f"Best system: {results['best']}")
+
+        best_result = results["systems"][results["best"]]
+        self.system = [int(number) for number in results["best"].split("-")]
+        for element in best_result["elements"]:
+            self.add_player(mode=mode, element=element)
+        self.print_result()
+
     def transfer_players(self, mode: str) -> None:
         """
         Used for transferring players and hold information on player availability
@@ -518,6 +667,29 @@ class FPLteam:
             print("\nThere is no point running the single player changes suggestion since the Free Hit choice "
                   "gives the optimal team.")
 
+        plan_suggestion = ""
+        while plan_suggestion != "yes" and plan_suggestion != "no":
+            plan_suggestion = input(f"\nWould you like to run the transfer planner for up to "
+                                    f"{fpltransfers.MAX_TRANSFERS} player changes (yes/no/cancel)? ").lower()
+            if plan_suggestion == "cancel":
+                raise ValueError
+            if plan_suggestion == "yes":
+                self.transfer_plan(mode=mode, free_transfers=enter_free_transfers())
+            elif plan_suggestion != "no":
+                print("\nInvalid answer.")
+
+        if mode == "normal":
+            schedule_suggestion = ""
+            while schedule_suggestion != "yes" and schedule_suggestion != "no":
+                schedule_suggestion = input(f"\nWould you like a transfer schedule for the next "
+                                            f"{fpltransfers.PLAN_HORIZON} GWs (yes/no/cancel)? ").lower()
+                if schedule_suggestion == "cancel":
+                    raise ValueError
+                if schedule_suggestion == "yes":
+                    self.gameweek_plan(first_gw_number=enter_first_gw(), free_transfers=enter_free_transfers())
+                elif schedule_suggestion != "no":
+                    print("\nInvalid answer.")
+
         extended_suggestion = ""
         while (
                extended_suggestion.lower() != "yes"
@@ -538,13 +710,19 @@ class FPLteam:
             if extended_suggestion.lower() == "cancel":
                 raise ValueError
 
-    def choose_system(self) -> None:
+    def choose_system(self, allow_auto: bool = False) -> None:
         """
         Holds information on the team's system
 
+        :param allow_auto: Whether the user can let the optimizer pick the best system ('auto')
+        :type allow_auto: bool
         :return: None
         """
-        print("\nPlease enter the system for your squad.")
+        if allow_auto:
+            print("\nPlease enter the system for your squad (or type 'auto' to try every system).")
+        else:
+            print("\nPlease enter the system for your squad.")
+        self.auto_system = False
         self.system[0] = 9999
         self.system[1] = 9999
         self.system[2] = 9999
@@ -561,6 +739,9 @@ class FPLteam:
                 system_def = input("\nDEF: ")
                 if system_def == "cancel":
                     raise ReferenceError
+                if allow_auto and system_def.lower() == "auto":
+                    self.auto_system = True
+                    return None
                 self.system[0] = int(system_def)
                 system_mid = input("MID: ")
                 if system_mid == "cancel":
@@ -630,18 +811,18 @@ class FPLteam:
         for element in self.fpl.player_data["id_x"]:
             if (
                 # Check team limit
-                self.player_teams.count(self.fpl.player_stat(element, "team")) > 2
+                self.squad.team_count(self.fpl.player_stat(element, "team")) > 2
                 # Check managers out
                 or self.fpl.player_stat(element, "position") == "MNG"
                 # Check position limit
                 or (self.fpl.player_stat(element, "position") == "GKP"
-                    and self.team_positions.count("GKP") == 1)
+                    and self.squad.position_count("GKP") == 1)
                 or (self.fpl.player_stat(element, "position") == "DEF"
-                    and self.team_positions.count("DEF") == self.system[0])
+                    and self.squad.position_count("DEF") == self.system[0])
                 or (self.fpl.player_stat(element, "position") == "MID"
-                    and self.team_positions.count("MID") == self.system[1])
+                    and self.squad.position_count("MID") == self.system[1])
                 or (self.fpl.player_stat(element, "position") == "FWD"
-                    and self.team_positions.count("FWD") == self.system[2])
+                    and self.squad.position_count("FWD") == self.system[2])
             ):
                 continue
             else:
@@ -670,31 +851,24 @@ class FPLteam:
                 # Check if the player exists
                 unidecode(player.lower()) == unidecode(team_player.lower())
                 # Check if the player is already in the team
-                and player not in self.team
+                and element not in self.squad
                 # Check team limit
-                and self.player_teams.count(self.fpl.player_stat(element, "team")) < 3
+                and self.squad.team_count(self.fpl.player_stat(element, "team")) < 3
                 # Check position limit
                 and (
                      self.fpl.player_stat(element, "position") == "GKP"
-                     and self.team_positions.count("GKP") < 1
+                     and self.squad.position_count("GKP") < 1
                      or self.fpl.player_stat(element, "position") == "DEF"
-                     and self.team_positions.count("DEF") < self.system[0]
+                     and self.squad.position_count("DEF") < self.system[0]
                      or self.fpl.player_stat(element, "position") == "MID"
-                     and self.team_positions.count("MID") < self.system[1]
+                     and self.squad.position_count("MID") < self.system[1]
                      or self.fpl.player_stat(element, "position") == "FWD"
-                     and self.team_positions.count("FWD") < self.system[2]
+                     and self.squad.position_count("FWD") < self.system[2]
                 )
             ):
-                # Changing the player cost in the main_df based on the selling price we get
-                # from the input
-                # The functionality of changing the main_df here is based on the fact that the
-                # info of the main_df is stored in the cache and the fpl_player_stats function
-                # just calls the result from there without running again
-                # (a bit of cheating someone might say... *sips tea sardonically*)
+                # The selling price of the input is used for this session only
                 if budget_choice.lower() == "yes":
-                    self.fpl.fplapi.main_df.loc[self.fpl.fplapi.main_df.index[
-                        self.fpl.fplapi.main_df["id_x"] == element], ["cost"]
-                    ] = player_price
+                    self.fpl.set_prices({element: player_price})
                     self.starters_prices.append(player_price)
                 self.add_player(mode="normal", element=element)
                 invalid = False
@@ -768,16 +942,8 @@ class FPLteam:
         :type username: str
         :return:
         """
-        # Changing the player cost in the main_df based on the selling price we get
-        # from the saved_team
-        # The functionality of changing the main_df here is based on the fact that the
-        # info of the main_df is stored in the cache and the fpl_player_stats function
-        # just calls the result from there without running again
-        # (a bit of cheating someone might say... *sips tea sardonically*)
-        for element in saved_team[username]["Team_elements"]:
-            self.fpl.fplapi.main_df.loc[self.fpl.fplapi.main_df.index[
-                self.fpl.fplapi.main_df["id_x"] == element], ["cost"]] = saved_team[username]["Starters_prices"][
-                saved_team[username]["Team_elements"].index(element)]
+        # The selling prices of the saved team are used for this session only
+        self.fpl.set_prices(dict(zip(saved_team[username]["Team_elements"], saved_team[username]["Starters_prices"])))
         for element in saved_team[username]["Team_elements"]:
             self.add_player(mode="normal", element=element)
 
@@ -805,11 +971,10 @@ class FPLteam:
 
         :return: None
         """
-        team_list_elements = self.fpl.fplapi.get_team(username, password)["team_elements"]
-        team_starters_ids = []
-        for number in range(11):
-            team_starters_ids.append(team_list_elements[number])
-        for element in team_starters_ids:
+        team = self.fpl.fplapi.team_snapshot()
+        # The selling prices of the team are used for this session only
+        self.fpl.set_prices(team.selling_prices())
+        for element in team.team_elements[0:11]:
             self.add_player(mode="normal", element=element)
 
     def user_budget_changes(self, username, password) -> None:
@@ -818,12 +983,15 @@ class FPLteam:
 
         :return: None
         """
-        self.total_budget = round(self.fpl.fplapi.get_team(username, password)["total_budget"], 1)
-        self.starters_budget = round(self.fpl.fplapi.get_team(username, password)["starters_budget"], 1)
-        self.changes_budget = round(self.fpl.fplapi.get_team(username, password)["changes_budget"], 1)
-        self.bank_budget = round(self.fpl.fplapi.get_team(username, password)["bank_budget"], 1)
-        self.starters_prices = self.fpl.fplapi.get_team(username, password)["starters_prices"]
-        self.changes_prices = self.fpl.fplapi.get_team(username, password)["changes_prices"]
+        team = self.fpl.fplapi.team_snapshot()
+        self.total_budget = round(team.total_budget, 1)
+        self.starters_budget = round(team.starters_budget, 1)
+        self.changes_budget = round(team.changes_budget, 1)
+        self.bank_budget = round(team.bank_budget, 1)
+        self.starters_prices = list(team.starters_prices)
+        self.changes_prices = list(team.changes_prices)
+        # The selling prices of the team are used for this session only
+        self.fpl.set_prices(team.selling_prices())
 
     def pl_all_teams(self) -> list:
         """
@@ -849,7 +1017,7 @@ class FPLteam:
         :return: None
         """
         for team in all_teams:
-            if self.player_teams.count(team) < 3:
+            if self.squad.team_count(team) < 3:
                 for n in range(11):
                     for element in used_players_elements:
                         if self.fpl.player_stat(element, "team") == team:
@@ -857,7 +1025,7 @@ class FPLteam:
 
     def change_players_first_loop(
             self, used_players_elements: list, changing_players_elements: list, player_element: str, max_budget: list,
-            temp_teams: list, temp_teams_change: list, mode: str
+            temp_squad: SquadState, temp_teams_change: list, mode: str
     ) -> None:
         """
         First loop through players in the change_players method (Just replacing the original changing players)
@@ -870,8 +1038,8 @@ class FPLteam:
         :type player_element: str
         :param max_budget: A list containing the maximum budget for the player change
         :type max_budget: list
-        :param temp_teams: A list of the team's players' premier league teams
-        :type temp_teams: list
+        :param temp_squad: A copy of the team's squad that follows the changes
+        :type temp_squad: SquadState
         :param temp_teams_change: A list of the changing players' premier league teams
         :type temp_teams_change: list
         :param mode: Option between 'normal' and 'free_hit' that determines the type of update
@@ -883,13 +1051,18 @@ class FPLteam:
             calculation_mode = "point_calculation"
         elif mode == "free_hit":
             calculation_mode = "captain_points"
-        for element in self.fpl.player_data["id_x"]:
+        # Players of the same position with valid points that fit the budget, best first
+        other_costs = sum([self.fpl.player_stat(pl_element, "cost") for pl_element in changing_players_elements
+                           if pl_element != player_element])
+        candidates = self.fpl.players.candidates(
+            self.fpl.player_stat(player_element, "position"), calculation_mode, min_score=0,
+            max_cost=max_budget[0] - other_costs
+        )
+        for element in candidates:
             if (
                 self.player_checks(element, player_element, used_players_elements)
                 # Check if the player is already in the players that are about to change
                 and element not in changing_players_elements
-                # Check for valid points
-                and self.fpl.player_stat(element, calculation_mode) > 0
             ):
                 temporary_budget = round(
                     (
@@ -900,7 +1073,7 @@ class FPLteam:
                 )
                 if temporary_budget <= max_budget[0]:
                     # Checking the budget limit
-                    player_team_number = (temp_teams.count(self.fpl.player_stat(element, "team")))
+                    player_team_number = temp_squad.team_count(self.fpl.player_stat(element, "team"))
                     if (
                         self.fpl.player_stat(element, "team")
                         == temp_teams_change[changing_players_elements.index(player_element)]
@@ -914,10 +1087,7 @@ class FPLteam:
                                 self.fpl.player_stat(player_element, "team")
                             )
 
-                            update_list(
-                                temp_teams, self.fpl.player_stat(element, "team"),
-                                self.fpl.player_stat(player_element, "team")
-                            )
+                            temp_squad.swap(player_element, *self.squad_player(mode, element))
                             break
                     else:
                         if player_team_number < 3:
@@ -928,15 +1098,12 @@ class FPLteam:
                                 self.fpl.player_stat(player_element, "team")
                             )
 
-                            update_list(
-                                temp_teams, self.fpl.player_stat(element, "team"),
-                                self.fpl.player_stat(player_element, "team")
-                            )
+                            temp_squad.swap(player_element, *self.squad_player(mode, element))
                             break
 
     def change_players_more_loops(
             self, used_players_elements: list, changing_players_elements: list, player_element: str, max_budget: list,
-            temp_teams: list, temp_teams_change: list, mode: str
+            temp_squad: SquadState, temp_teams_change: list, mode: str
     ) -> None:
         """
         Loops after the first loop through players in the change_players method
@@ -949,8 +1116,8 @@ class FPLteam:
         :type player_element: str
         :param max_budget: A list containing the maximum budget for the player change
         :type max_budget: list
-        :param temp_teams: A list of the team's players' premier league teams
-        :type temp_teams: list
+        :param temp_squad: A copy of the team's squad that follows the changes
+        :type temp_squad: SquadState
         :param temp_teams_change: A list of the changing players' premier league teams
         :type temp_teams_change: list
         :param mode: Option between 'normal' and 'free_hit' that determines the type of update
@@ -962,19 +1129,19 @@ class FPLteam:
             calculation_mode = "point_calculation"
         elif mode == "free_hit":
             calculation_mode = "captain_points"
-        for element in self.fpl.player_data["id_x"]:
+        # Players of the same position with valid and better points that fit the budget, best first
+        other_costs = sum([self.fpl.player_stat(pl_element, "cost") for pl_element in changing_players_elements
+                           if pl_element != player_element])
+        candidates = self.fpl.players.candidates(
+            self.fpl.player_stat(player_element, "position"), calculation_mode,
+            min_score=max(self.fpl.player_stat(player_element, calculation_mode), 0),
+            max_cost=max_budget[0] - other_costs
+        )
+        for element in candidates:
             if (
                 self.player_checks(element, player_element, used_players_elements)
                 # Check if the player is already in the players that are about to change
                 and element not in changing_players_elements
-                # Check for valid points
-                and self.fpl.player_stat(element, calculation_mode) > 0
-                # Check for better points
-                and sum([self.fpl.player_stat(pl_element, calculation_mode)
-                         for pl_element in changing_players_elements])
-                < self.fpl.player_stat(element, calculation_mode)
-                + sum([self.fpl.player_stat(pl_element, calculation_mode)
-                       for pl_element in changing_players_elements if pl_element != player_element])
             ):
                 temporary_budget = round(
                     (
@@ -985,7 +1152,7 @@ class FPLteam:
                 )
                 if temporary_budget <= max_budget[0]:
                     # Checking the budget limit
-                    player_team_number = (temp_teams.count(self.fpl.player_stat(element, "team")))
+                    player_team_number = temp_squad.team_count(self.fpl.player_stat(element, "team"))
                     if (
                         self.fpl.player_stat(element, "team")
                         == (temp_teams_change[changing_players_elements.index(player_element)])
@@ -999,10 +1166,7 @@ class FPLteam:
                                 self.fpl.player_stat(player_element, "team")
                             )
 
-                            update_list(
-                                temp_teams, self.fpl.player_stat(element, "team"),
-                                self.fpl.player_stat(player_element, "team")
-                            )
+                            temp_squad.swap(player_element, *self.squad_player(mode, element))
                             break
                     else:
                         if self.fpl.player_stat(element, "team") in temp_teams_change:
@@ -1053,10 +1217,7 @@ class FPLteam:
                                 self.fpl.player_stat(player_element, "team")
                             )
 
-                            update_list(
-                                temp_teams, self.fpl.player_stat(element, "team"),
-                                self.fpl.player_stat(player_element, "team")
-                            )
+                            temp_squad.swap(player_element, *self.squad_player(mode, element))
                             break
 
     def update_team_first_loop(self, used_players_elements: list, player_element: str,
@@ -1074,7 +1235,17 @@ class FPLteam:
         :type mode: str
         :return: None
         """
-        for element in self.fpl.player_data["id_x"]:
+        calculation_mode = ""
+        if mode == "normal":
+            calculation_mode = "point_calculation"
+        elif mode == "free_hit":
+            calculation_mode = "captain_points"
+        # Players of the same position that fit the budget, best first
+        candidates = self.fpl.players.candidates(
+            self.fpl.player_stat(player_element, "position"), calculation_mode,
+            max_cost=max_budget - self.starters_budget + self.fpl.player_stat(player_element, "cost")
+        )
+        for element in candidates:
             if self.player_checks(element, player_element, used_players_elements):
                 temporary_budget = round(
                     (
@@ -1085,20 +1256,18 @@ class FPLteam:
                 )
                 if temporary_budget <= max_budget:
                     # Checking the budget limit
-                    player_team_number = (self.player_teams.count(self.fpl.player_stat(element, "team")))
+                    player_team_number = self.squad.team_count(self.fpl.player_stat(element, "team"))
                     if (
                         self.fpl.player_stat(element, "team")
-                        == self.player_teams[self.team_elements.index(player_element)]
+                        == self.squad.team(player_element)
                     ):
                         # Check team limit
                         if player_team_number < 4:
-                            self.add_player(mode=mode, element=element)
-                            self.remove_player(mode=mode, element=player_element)
+                            self.swap_player(mode=mode, out_element=player_element, element=element)
                             break
                     else:
                         if player_team_number < 3:
-                            self.add_player(mode=mode, element=element)
-                            self.remove_player(mode=mode, element=player_element)
+                            self.swap_player(mode=mode, out_element=player_element, element=element)
                             break
 
     def update_team_more_loops(self, used_players_elements: list, player_element: str,
@@ -1121,13 +1290,14 @@ class FPLteam:
             calculation_mode = "point_calculation"
         elif mode == "free_hit":
             calculation_mode = "captain_points"
-        for element in self.fpl.player_data["id_x"]:
-            if (
-                self.player_checks(element, player_element, used_players_elements)
-                # Check for better points
-                and self.fpl.player_stat(element, calculation_mode)
-                > self.fpl.player_stat(player_element, calculation_mode)
-            ):
+        # Players of the same position with better points that fit the budget, best first
+        candidates = self.fpl.players.candidates(
+            self.fpl.player_stat(player_element, "position"), calculation_mode,
+            min_score=self.fpl.player_stat(player_element, calculation_mode),
+            max_cost=max_budget - self.starters_budget + self.fpl.player_stat(player_element, "cost")
+        )
+        for element in candidates:
+            if self.player_checks(element, player_element, used_players_elements):
                 temporary_budget = round(
                     (
                      self.starters_budget
@@ -1137,21 +1307,20 @@ class FPLteam:
                 )
                 if temporary_budget <= max_budget:
                     # Checking the budget limit
-                    player_team_number = (self.player_teams.count(self.fpl.player_stat(element, "team")))
+                    player_team_number = self.squad.team_count(self.fpl.player_stat(element, "team"))
                     if (
                         self.fpl.player_stat(element, "team")
-                        == self.player_teams[self.team_elements.index(player_element)]
+                        == self.squad.team(player_element)
                     ):
                         # Check team limit
                         if player_team_number < 4:
-                            self.add_player(mode=mode, element=element)
-                            self.remove_player(mode=mode, element=player_element)
+                            self.swap_player(mode=mode, out_element=player_element, element=element)
                             break
                     else:
-                        if self.fpl.player_stat(element, "team") in self.player_teams:
+                        if self.squad.team_count(self.fpl.player_stat(element, "team")) > 0:
                             # Check for players on the team limit in order to pick the best ones in the
                             # next loop
-                            for pl_element in self.team_elements:
+                            for pl_element in self.squad.elements():
                                 if (
                                     # Checking for players other than the player that's currently
                                     # updating
@@ -1187,346 +1356,117 @@ class FPLteam:
                                 ):
                                     used_players_elements.append(pl_element)
                         if player_team_number < 3:
-                            self.add_player(mode=mode, element=element)
-                            self.remove_player(mode=mode, element=player_element)
+                            self.swap_player(mode=mode, out_element=player_element, element=element)
                             break
 
     def transfer_single_loop(self) -> None:
         """
-        Single transfer suggestion loop
+        Single transfer suggestion loop (every player of the team is checked at once in fpltransfers)
 
         :return: None
         """
         max_budget_single_transfer = round(self.total_budget - self.changes_budget, 1)
-        used_players_elements = []
-        for pl_element in self.team_elements:
-            possible_transfers = {}
-            for element in self.fpl.player_data["id_x"]:
-                if (
-                    self.player_checks(element, pl_element, used_players_elements)
-                    # Check for better transfer points
-                    and (
-                         self.fpl.player_stat(element, "transfer_points")
-                         >= self.player_points[self.team_elements.index(pl_element)]
-                    )
-                ):
-                    temporary_budget = round(
-                        (
-                         self.starters_budget
-                         + self.fpl.player_stat(element, "cost")
-                         - self.fpl.player_stat(pl_element, "cost")
-                        ), 1
-                    )
-                    if temporary_budget <= max_budget_single_transfer:
-                        # Checking the budget limit
-                        player_team_number = (
-                            self.player_teams.count(self.fpl.player_stat(element, "team"))
-                        )
-                        if (
-                            self.fpl.player_stat(element, "team")
-                            == self.player_teams[self.team_elements.index(pl_element)]
-                        ):
-                            # Check team limit
-                            if player_team_number < 4:
-                                transfer_per_dif = round(
-                                    (self.fpl.player_stat(element, "transfer_points")
-                                     / (self.fpl.player_stat(element, "transfer_points")
-                                        + self.fpl.player_stat(pl_element, "point_calculation"))) * 100, 2
-                                )
-                                possible_transfers.update({self.fpl.player_stat(element, "name"): transfer_per_dif})
-                        else:
-                            if player_team_number < 3:
-                                transfer_per_dif = round(
-                                    (self.fpl.player_stat(element, "transfer_points")
-                                     / (self.fpl.player_stat(element, "transfer_points")
-                                        + self.fpl.player_stat(pl_element, "point_calculation"))) * 100, 2
-                                )
-                                possible_transfers.update({self.fpl.player_stat(element, "name"): transfer_per_dif})
-            percentage_list = list(possible_transfers.values())
-            percentage_list.sort(reverse=True)
-            sorted_possible_transfers = {}
-            for number in percentage_list:
-                for name, percentage in possible_transfers.items():
-                    if number == percentage:
-                        sorted_possible_transfers.update({name: percentage})
-            print(f"\nPossible transfers for {self.fpl.player_stat(pl_element, 'name')}: ")
-            if len(possible_transfers) == 0:
+        suggestions = fpltransfers.single_transfer_suggestions(
+            self.fpl.players, self.squad, self.unavailable_players_list_elements, self.starters_budget,
+            max_budget_single_transfer
+        )
+        for suggestion in suggestions:
+            print(f"\nPossible transfers for {self.fpl.player_stat(suggestion['out'], 'name')}: ")
+            if len(suggestion["in"]) == 0:
                 print("-")
             else:
                 print("Name\t\t\tBetter Value Possibility")
-                for name in sorted_possible_transfers:
-                    print(f"{name:<24}{sorted_possible_transfers[name]} %")
+                for element, percentage in zip(suggestion["in"], suggestion["value_possibility"]):
+                    print(f"{self.fpl.player_stat(element, 'name'):<24}{percentage} %")
 
-    def transfer_double_first_loop(self, used_players_elements: list, possible_transfers_elements: dict, key: int,
-                                   player_element: str,
-                                   max_budget: list, teams: list, teams_transfer: list, mode: str) -> None:
+    def transfer_double_loop(self, mode: str, processes: int = fpltransfers.MAX_PROCESSES) -> None:
         """
-        Double transfer suggestion first loop through players
-        (Just replacing the original players of the possible transfer)
+        Double transfer suggestion loop. Every pair of the team is searched independently (in parallel processes) and
+        the suggestions are ranked by value possibility
 
-        :param used_players_elements: A list of the player IDs already used in the loops
-        :type used_players_elements: list
-        :param possible_transfers_elements: A dictionary of the possible double transfer combinations
-        :type possible_transfers_elements: dict
-        :param key: The key of the possible_transfers dictionary
-        :type key: int
-        :param player_element: A player ID from the team list
-        :type player_element: str
-        :param max_budget: A list of the possible max budgets
-        :type max_budget: list
-        :param teams: A list of the premier league teams of the players in the team, which updates while transfer
-        calculations are taking place
-        :type teams: list
-        :param teams_transfer: A list of the premier league teams of the players in the possible_transfers dictionary
-        :type teams_transfer: list
         :param mode: Option between 'normal' and 'free_hit' that determines the type of update
         :type mode: str
+        :param processes: The number of processes the pairs are divided into
+        :type processes: int
         :return: None
         """
-        calculation_mode_transfer = ""
-        if mode == "normal":
-            calculation_mode_transfer = "transfer_points"
-        elif mode == "free_hit":
-            calculation_mode_transfer = "captain_points"
-        for element in self.fpl.player_data["id_x"]:
-            if (
-                self.player_checks(element, player_element, used_players_elements)
-                # Check if the name is already in the changing duo
-                and element not in possible_transfers_elements[key]
-                # Check for valid transfer points
-                and self.fpl.player_stat(element, calculation_mode_transfer) > 0
-            ):
-                temporary_budget = round(
-                    (
-                     self.fpl.player_stat(element, "cost")
-                     + sum([self.fpl.player_stat(pl_element, "cost")
-                            for pl_element in possible_transfers_elements[key]
-                            if pl_element != player_element])
-                    ), 1
-                )
-                if temporary_budget <= max_budget[key]:
-                    # Checking the budget limit
-                    player_team_number = (teams.count(self.fpl.player_stat(element, "team")))
-                    if (
-                        self.fpl.player_stat(element, "team")
-                        == teams_transfer[0][possible_transfers_elements[key].index(player_element)]
-                    ):
-                        # Check team limit
-                        if player_team_number < 4:
-                            possible_transfers_elements[key] = list(map(lambda x: element if x == player_element else x,
-                                                                        possible_transfers_elements[key]))
-
-                            teams_transfer[0].insert(0, self.fpl.player_stat(element, "team"))
-                            teams_transfer[0].remove(self.fpl.player_stat(
-                                player_element, "team"))
-
-                            teams.append(self.fpl.player_stat(element, "team"))
-                            teams.remove(self.fpl.player_stat(player_element, "team"))
-                            break
-                    else:
-                        if player_team_number < 3:
-                            possible_transfers_elements[key] = list(map(lambda x: element if x == player_element else x,
-                                                                        possible_transfers_elements[key]))
-
-                            teams_transfer[0].insert(0, self.fpl.player_stat(element, "team"))
-                            teams_transfer[0].remove(self.fpl.player_stat(
-                                player_element, "team"))
-
-                            teams.append(self.fpl.player_stat(element, "team"))
-                            teams.remove(self.fpl.player_stat(player_element, "team"))
-                            break
+        # Combinations of 2 from the team
+        possible_transfers = self.transfer_combinations()
+        search = fpltransfers.DoubleTransferSearch(
+            self.fpl.players, self.squad.copy(), self.unavailable_players_list_elements, self.bank_budget, mode,
+            self.pl_all_teams()
+        )
+        results = fpltransfers.search_double_transfers(search, list(possible_transfers.values()), processes)
+
+        for result in results:
+            print(f"\nPossible transfers for ['{self.fpl.player_stat(result['out'][0], 'name')}', "
+                  f"'{self.fpl.player_stat(result['out'][1], 'name')}']:")
+            if result["value_possibility"] < 50:
+                print("-")
+            else:
+                player_string = "["
+                for pl_element in result["in"]:
+                    player_string += f"'{self.fpl.player_stat(pl_element, 'name')}', "
+                player_string = player_string[:-2] + "]"
+                print("Players\t\t\t\t\tBetter Value Possibility")
+                print(f"{player_string:<40}{result['value_possibility']} %")
 
-    def transfer_double_more_loops(self, used_players_elements: list, possible_transfers_elements: dict, key: int,
-                                   player_element: str,
-                                   max_budget: list, teams: list, teams_transfer: list, mode: str) -> None:
+    def transfer_plan(self, mode: str, free_transfers: int = 1) -> None:
         """
-        Double transfer suggestion loops after the first loop through players
+        Suggests the best sets of up to MAX_TRANSFERS transfers, taking the -4 points of every extra transfer into
+        account
 
-        :param used_players_elements: A list of the player IDs already used in the loops
-        :type used_players_elements: list
-        :param possible_transfers_elements: A dictionary of the possible double transfer combinations
-        :type possible_transfers_elements: dict
-        :param key: The key of the possible_transfers dictionary
-        :type key: int
-        :param player_element: A player ID from the team list
-        :type player_element: str
-        :param max_budget: A list of the possible max budgets
-        :type max_budget: list
-        :param teams: A list of the premier league teams of the players in the team, which updates while transfer
-        calculations are taking place
-        :type teams: list
-        :param teams_transfer: A list of the premier league teams of the players in the possible_transfers dictionary
-        :type teams_transfer: list
         :param mode: Option between 'normal' and 'free_hit' that determines the type of update
         :type mode: str
+        :param free_transfers: The number of transfers without a hit
+        :type free_transfers: int
         :return: None
         """
-        calculation_mode_transfer = ""
-        if mode == "normal":
-            calculation_mode_transfer = "transfer_points"
-        elif mode == "free_hit":
-            calculation_mode_transfer = "captain_points"
-        for element in self.fpl.player_data["id_x"]:
-            if (
-                self.player_checks(element, player_element, used_players_elements)
-                # Check if the name is already in the changing duo
-                and element not in possible_transfers_elements[key]
-                # Check for valid transfer points
-                and self.fpl.player_stat(element, calculation_mode_transfer) > 0
-                # Check for better transfer points
-                and sum([self.fpl.player_stat(pl_element, calculation_mode_transfer)
-                         for pl_element in possible_transfers_elements[key]])
-                < self.fpl.player_stat(element, calculation_mode_transfer)
-                + [self.fpl.player_stat(pl_element, calculation_mode_transfer)
-                   for pl_element in possible_transfers_elements[key] if pl_element != player_element]
-            ):
-                temporary_budget = round(
-                    (
-                     self.fpl.player_stat(element, "cost")
-                     + sum([self.fpl.player_stat(player, "cost")
-                            for player in possible_transfers_elements[key]
-                            if player != player_element])
-                    ), 1
-                )
-                if temporary_budget <= max_budget[key]:
-                    # Checking the budget limit
-                    player_team_number = (teams.count(self.fpl.player_stat(element, "team")))
-                    if (
-                        self.fpl.player_stat(element, "team")
-                        == (teams_transfer[0][possible_transfers_elements[key].index(player_element)])
-                    ):
-                        # Check team limit
-                        if player_team_number < 4:
-                            possible_transfers_elements[key] = list(map(lambda x: element if x == player_element else x,
-                                                                        possible_transfers_elements[key]))
-
-                            teams_transfer[0].insert(0, self.fpl.player_stat(element, "team"))
-                            teams_transfer[0].remove(self.fpl.player_stat(
-                                player_element, "team"))
-
-                            teams.append(self.fpl.player_stat(element, "team"))
-                            teams.remove(self.fpl.player_stat(
-                                player_element, "team"))
-                            break
-                    else:
-                        if self.fpl.player_stat(element, "team") in teams_transfer[0]:
-                            # Check for players on the team limit in order to pick the
-                            # best ones in the next loop
-                            for pl_element in possible_transfers_elements[key]:
-                                if (
-                                    # Checking for players other than the player
-                                    # that's currently updating
-                                    pl_element != player_element
-                                    # Check for better transfer points
-                                    and self.fpl.player_stat(pl_element, calculation_mode_transfer)
-                                    > self.fpl.player_stat(element, calculation_mode_transfer) > 0
-                                    # Check team limit
-                                    and player_team_number > 2
-                                    # Don't enter the name twice in the list
-                                    and element not in used_players_elements
-                                ):
-                                    used_players_elements.append(element)
-                                elif (
-                                      # Checking for players other than the player
-                                      # that's currently updating
-                                      pl_element != player_element
-                                      # Check for better transfer points
-                                      and 0 < self.fpl.player_stat(pl_element, calculation_mode_transfer)
-                                      < self.fpl.player_stat(element, calculation_mode_transfer)
-                                      # Check team limit
-                                      and player_team_number > 2
-                                      # Don't enter the name twice in the list
-                                      and pl_element not in used_players_elements
-                                ):
-                                    used_players_elements.append(pl_element)
-                        if player_team_number < 3:
-                            possible_transfers_elements[key] = list(map(lambda x: element if x == player_element else x,
-                                                                        possible_transfers_elements[key]))
-
-                            teams_transfer[0].insert(0, self.fpl.player_stat(element, "team"))
-                            teams_transfer[0].remove(self.fpl.player_stat(
-                                player_element, "team"))
-
-                            teams.append(self.fpl.player_stat(element, "team"))
-                            teams.remove(self.fpl.player_stat(
-                                player_element, "team"))
-                            break
-
-    def transfer_double_loop(self, mode: str) -> None:
-        """
-        Double transfer suggestion loop
-
-        :param mode: Option between 'normal' and 'free_hit' that determines the type of update
-        :type mode: str
+        plan = fpltransfers.plan_transfers(
+            self.fpl.players, self.squad, self.unavailable_players_list_elements, self.bank_budget, mode,
+            free_transfers=free_transfers
+        )
+        if len(plan["move_sets"]) == 0:
+            print("\nThere are no possible transfers for the given budget.")
+            return None
+        if not plan["complete"]:
+            print("\nThe search stopped early, so better transfers might exist.")
+        print("\nTransfers\tHits\tNet gain\tBank")
+        for move_set in plan["move_sets"]:
+            print(f"{move_set['transfers']:<16}{-move_set['hits']:<8}{round(move_set['net_gain'], 2):<16}"
+                  f"{move_set['bank']}")
+            for out_element, in_element in zip(move_set["out"], move_set["in"]):
+                print(f"    {self.fpl.player_stat(out_element, 'name'):<24}"
+                      f"-> {self.fpl.player_stat(in_element, 'name')}")
+
+    def gameweek_plan(self, first_gw_number: int, free_transfers: int = 1) -> None:
+        """
+        Suggests a transfer schedule for the next PLAN_HORIZON GWs, banking the free transfers that aren't used
+
+        :param first_gw_number: The first GW of the schedule
+        :type first_gw_number: int
+        :param free_transfers: The number of free transfers of the first GW
+        :type free_transfers: int
         :return: None
         """
-        calculation_mode = ""
-        calculation_mode_transfer = ""
-        if mode == "normal":
-            calculation_mode = "point_calculation"
-            calculation_mode_transfer = "transfer_points"
-        elif mode == "free_hit":
-            calculation_mode = "captain_points"
-            calculation_mode_transfer = "captain_points"
-        # Combinations of 2 from the team
-        possible_transfers = self.transfer_combinations()
-
-        # Values that are going to be checked from the team
-        max_budget = []
-        starting_transfer_points_list = []
-        for key in possible_transfers.keys():
-            player_budget = self.bank_budget
-            for pl_element in possible_transfers[key]:
-                player_budget += self.fpl.player_stat(pl_element, "cost")
-            max_budget.append(round(player_budget, 1))
-            changing_player_points = [self.fpl.player_stat(pl_element, calculation_mode)
-                                      for pl_element in possible_transfers[key]]
-            starting_transfer_points_list.append(changing_player_points)
-        all_teams = self.pl_all_teams()
-
-        for key in possible_transfers.keys():
-            # Loop on all duo combinations
-            used_players_elements = []
-            teams_transfer = []
-            teams = [x for x in self.player_teams]
-            teams_transfer.append([self.fpl.player_stat(possible_transfers[key][0], "team"),
-                                   self.fpl.player_stat(possible_transfers[key][1], "team")])
-            print(f"\nPossible transfers for ['{self.fpl.player_stat(possible_transfers[key][0], 'name')}', "
-                  f"'{self.fpl.player_stat(possible_transfers[key][1], 'name')}']:")
-            for n in range(11):
-                # Loop again and retry used players
-                self.retry_players(all_teams, used_players_elements)
-                for i in range(11):
-                    # Loop again and retry all players
-                    # (basically try the players that might have been suitable before the change
-                    # by looping again)
-                    for player_element in possible_transfers[key]:
-                        if player_element in self.team_elements or player_element in used_players_elements:
-                            # First check replacing players without checking points just to remove them
-                            self.transfer_double_first_loop(used_players_elements, possible_transfers, key,
-                                                            player_element, max_budget, teams, teams_transfer,
-                                                            mode=mode)
-                        else:
-                            self.transfer_double_more_loops(used_players_elements, possible_transfers, key,
-                                                            player_element, max_budget, teams, teams_transfer,
-                                                            mode=mode)
-
-            final_transfer_points = [self.fpl.player_stat(pl_element, calculation_mode_transfer)
-                                     for pl_element in possible_transfers[key]]
-            value_possibility = round(((final_transfer_points[0] / (final_transfer_points[0]
-                                                                    + starting_transfer_points_list[key][0]))
-                                       + (final_transfer_points[1] / (final_transfer_points[1]
-                                                                      + starting_transfer_points_list[key][1])))
-                                      / 2 * 100, 2)
-            if value_possibility < 50:
-                print("-")
-            else:
-                player_string = "["
-                for pl_element in possible_transfers[key]:
-                    player_string += f"'{self.fpl.player_stat(pl_element, 'name')}', "
-                player_string = player_string[:-2] + "]"
-                print("Players\t\t\t\t\tBetter Value Possibility")
-                print(f"{player_string:<40}{value_possibility} %")
+        last_gw_number = min(first_gw_number + fpltransfers.PLAN_HORIZON - 1, MAX_GW_NUMBER)
+        gameweek_scores = self.fpl.gameweek_points(first_gw_number, last_gw_number)
+        plan = fpltransfers.plan_gameweeks(
+            self.fpl.players, self.squad, gameweek_scores, self.unavailable_players_list_elements, self.bank_budget,
+            free_transfers=free_transfers
+        )
+        if not plan["complete"]:
+            print("\nThe search stopped early, so a better schedule might exist.")
+        print("\nGW\tFree transfers\tHits\tPoints\t\tBank")
+        for gw, gameweek in enumerate(plan["gameweeks"], start=first_gw_number):
+            print(f"{gw:<8}{gameweek['free_transfers']:<16}{-gameweek['hits']:<8}{round(gameweek['points'], 2):<16}"
+                  f"{gameweek['bank']}")
+            if len(gameweek["out"]) == 0:
+                print("    Roll the free transfer")
+            for out_element, in_element in zip(gameweek["out"], gameweek["in"]):
+                print(f"    {self.fpl.player_stat(out_element, 'name'):<24}"
+                      f"-> {self.fpl.player_stat(in_element, 'name')}")
+        print(f"Total points: {round(plan['points'], 2)}")
 
     def transfer_combinations(self) -> dict:
         """
@@ -1660,7 +1600,7 @@ class FPLteam:
             # Check the excluded players
             and element not in self.unavailable_players_list_elements
             # Check if the player is already in the team
-            and element not in self.team_elements
+            and element not in self.squad
             # Check position
             and self.fpl.player_stat(element, "position") == self.fpl.player_stat(player_element, "position")
         ):
@@ -1681,7 +1621,7 @@ class FPLteam:
             if (
                 self.fpl.player_stat(manager_element, "position") == "MNG"
                 and self.fpl.player_stat(manager_element, "cost") <= self.bank_budget
-                and self.player_teams.count(self.fpl.player_stat(manager_element, "team")) < 3
+                and self.squad.team_count(self.fpl.player_stat(manager_element, "team")) < 3
             ):
                 self.managers.append(self.fpl.player_stat(manager_element, "name"))
                 self.manager_points.append(self.fpl.player_stat(manager_element, "manager_points"))
@@ -1726,6 +1666,61 @@ def enter_budget_choice() -> str:
         return budget_choice
 
 
+def enter_builder_choice() -> str:
+    """
+    Gives the choice between the exact optimizer and the greedy loops for building a new team
+
+    :return: A string of 'exact' or 'greedy'
+    """
+    builder_choice = ""
+    while builder_choice != "exact" and builder_choice != "greedy":
+        builder_choice = input("\nDo you want to build the team with the exact optimizer or the greedy "
+                               "update (exact/greedy/cancel)? ").lower()
+        if builder_choice == "cancel":
+            raise ValueError
+        if builder_choice != "exact" and builder_choice != "greedy":
+            print("\nInvalid answer.")
+    return builder_choice
+
+
+def enter_free_transfers() -> int:
+    """
+    Requests the number of free transfers for the transfer planner
+
+    :return: An integer of the free transfers
+    """
+    while True:
+        free_transfers = input("\nHow many free transfers do you have? ")
+        if free_transfers.lower() == "cancel":
+            raise ValueError
+        try:
+            free_transfers = int(free_transfers)
+            if free_transfers < 0:
+                raise ValueError
+            return free_transfers
+        except ValueError:
+            print("\nInvalid number.")
+
+
+def enter_first_gw() -> int:
+    """
+    Requests the first GW of the transfer schedule
+
+    :return: An integer of the GW
+    """
+    while True:
+        first_gw_number = input("\nFirst GW of the schedule: ")
+        if first_gw_number.lower() == "cancel":
+            raise ValueError
+        try:
+            first_gw_number = int(first_gw_number)
+            if first_gw_number < MIN_GW_NUMBER or first_gw_number > MAX_GW_NUMBER:
+                raise ValueError
+            return first_gw_number
+        except ValueError:
+            print("\nInvalid GW number.")
+
+
 def enter_player() -> str:
     """
     Requests a player input (used in the enter_new_team method)
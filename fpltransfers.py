@@ -0,0 +1,715 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import fploptimizer
+from fplsquad import SquadState
+from fplstats import PlayerTable
+
+MAX_PROCESSES = os.cpu_count() or 1
+# Number of passes of the double transfer search (as in the FPLteam update loops)
+SEARCH_PASSES = 11
+# Points lost for every transfer over the free transfers
+HIT_COST = 4
+MAX_TRANSFERS = 5
+TOP_MOVE_SETS = 10
+# Number of suggestions shown for every player of the single transfer suggestion
+TOP_SINGLE_TRANSFERS = 10
+# Number of explored move sets after which the planner stops and returns the best move sets found
+NODE_LIMIT = 2000000
+# Free transfers that can be banked by rolling them over
+MAX_FREE_TRANSFERS = 5
+# Number of Gameweeks planned by the Gameweek planner
+PLAN_HORIZON = 6
+# Transfers per Gameweek and move sets tried for every plan of the Gameweek planner
+MAX_WEEKLY_TRANSFERS = 2
+WEEKLY_MOVE_SETS = 5
+# Number of plans kept after every Gameweek
+BEAM_WIDTH = 20
+WEEKLY_NODE_LIMIT = 200000
+
+# Search of the worker process, set once by init_worker
+worker_search = None
+
+
+class DoubleTransferSearch:
+    """
+    Everything the double transfer suggestion needs, without any connection to the FPL API, so that it can be sent to
+    worker processes once and searched there for any pair of players
+
+    Attributes:
+        players: PlayerTable of the player stats (only read)
+        elements: List of the player IDs in the order of the player data
+        squad: SquadState of the team
+        unavailable_players_elements: List of the excluded player IDs
+        bank_budget: Float of the budget left in the bank
+        calculation_mode: The stat of the points of the team's players
+        calculation_mode_transfer: The stat of the points of the transferred players
+        all_teams: List of all the premier league teams
+    """
+    def __init__(self, players: PlayerTable, squad: SquadState, unavailable_players_elements: list,
+                 bank_budget: float, mode: str, all_teams: list):
+        self.players = players
+        self.elements = players.columns["id_x"].tolist()
+        self.squad = squad
+        self.unavailable_players_elements = list(unavailable_players_elements)
+        self.bank_budget = bank_budget
+        self.calculation_mode = ""
+        self.calculation_mode_transfer = ""
+        if mode == "normal":
+            self.calculation_mode = "point_calculation"
+            self.calculation_mode_transfer = "transfer_points"
+        elif mode == "free_hit":
+            self.calculation_mode = "captain_points"
+            self.calculation_mode_transfer = "captain_points"
+        self.all_teams = all_teams
+
+    def stat(self, element, statistic_value: str):
+        return self.players.stat(element, statistic_value)
+
+    def search(self, pair: list) -> dict:
+        """
+        Searches the best replacements of a pair of players of the team
+
+        :param pair: The player IDs of the two players leaving
+        :type pair: list
+        :return: A dictionary of the players leaving ('out'), the players coming in ('in') and the value possibility
+        """
+        transfer = list(pair)
+        squad = self.squad.copy()
+        used_players_elements = []
+        teams_transfer = [self.stat(pair[0], "team"), self.stat(pair[1], "team")]
+        max_budget = round(self.bank_budget + sum(self.stat(element, "cost") for element in pair), 1)
+        starting_transfer_points = [self.stat(element, self.calculation_mode) for element in pair]
+
+        for n in range(SEARCH_PASSES):
+            # Loop again and retry used players
+            self.retry_players(used_players_elements)
+            for i in range(SEARCH_PASSES):
+                # Loop again and retry all players
+                # (basically try the players that might have been suitable before the change by looping again)
+                for player_element in list(transfer):
+                    if player_element in self.squad or player_element in used_players_elements:
+                        # First check replacing players without checking points just to remove them
+                        self.first_loop(used_players_elements, transfer, player_element, max_budget, squad,
+                                        teams_transfer)
+                    else:
+                        self.more_loops(used_players_elements, transfer, player_element, max_budget, squad,
+                                        teams_transfer)
+
+        final_transfer_points = [self.stat(element, self.calculation_mode_transfer) for element in transfer]
+        value_possibility = round(((final_transfer_points[0] / (final_transfer_points[0]
+                                                                + starting_transfer_points[0]))
+                                   + (final_transfer_points[1] / (final_transfer_points[1]
+                                                                  + starting_transfer_points[1])))
+                                  / 2 * 100, 2)
+        return {"out": list(pair), "in": transfer, "value_possibility": value_possibility}
+
+    def retry_players(self, used_players_elements: list) -> None:
+        """
+        Makes the used players available again if their premier league team has less than 3 players in the team
+
+        :param used_players_elements: A list of the player IDs already used in the loops
+        :type used_players_elements: list
+        :return: None
+        """
+        teams = {team for team in self.all_teams if self.squad.team_count(team) < 3}
+        used_players_elements[:] = [element for element in used_players_elements
+                                    if self.stat(element, "team") not in teams]
+
+    def player_checks(self, element, player_element, used_players_elements: list) -> bool:
+        """
+        Checks if a player can replace a player of the team (as in FPLteam.player_checks)
+
+        :param element: ID of the player in check
+        :param player_element: ID of the player being replaced in the process
+        :param used_players_elements: A list of the player elements already used in the loops
+        :type used_players_elements: list
+        :return: True or False
+        """
+        return (
+            element not in used_players_elements
+            and element not in self.unavailable_players_elements
+            and element not in self.squad
+            and self.stat(element, "position") == self.stat(player_element, "position")
+        )
+
+    def replace(self, transfer: list, element, player_element, squad: SquadState, teams_transfer: list) -> None:
+        """
+        Puts a player in the place of another one in the pair
+
+        :param transfer: The player IDs of the pair
+        :type transfer: list
+        :param element: ID of the player coming in
+        :param player_element: ID of the player leaving
+        :param squad: The squad the pair is tried in
+        :type squad: SquadState
+        :param teams_transfer: A list of the premier league teams of the players of the pair
+        :type teams_transfer: list
+        :return: None
+        """
+        transfer[:] = [element if x == player_element else x for x in transfer]
+        teams_transfer.insert(0, self.stat(element, "team"))
+        teams_transfer.remove(self.stat(player_element, "team"))
+        squad.swap(
+            player_element, element, self.stat(element, "position"), self.stat(element, "team"),
+            round(self.stat(element, "cost"), 1), self.stat(element, self.calculation_mode_transfer)
+        )
+
+    def first_loop(self, used_players_elements: list, transfer: list, player_element, max_budget: float,
+                   squad: SquadState, teams_transfer: list) -> None:
+        """
+        First loop through players (just replacing the original players of the pair)
+
+        :param used_players_elements: A list of the player IDs already used in the loops
+        :type used_players_elements: list
+        :param transfer: The player IDs of the pair
+        :type transfer: list
+        :param player_element: A player ID from the pair
+        :param max_budget: The maximum budget of the pair
+        :type max_budget: float
+        :param squad: The squad the pair is tried in
+        :type squad: SquadState
+        :param teams_transfer: A list of the premier league teams of the players of the pair
+        :type teams_transfer: list
+        :return: None
+        """
+        for element in self.elements:
+            if (
+                self.player_checks(element, player_element, used_players_elements)
+                # Check if the name is already in the changing duo
+                and element not in transfer
+                # Check for valid transfer points
+                and self.stat(element, self.calculation_mode_transfer) > 0
+            ):
+                temporary_budget = round(
+                    self.stat(element, "cost")
+                    + sum([self.stat(pl_element, "cost") for pl_element in transfer if pl_element != player_element]),
+                    1
+                )
+                if temporary_budget <= max_budget:
+                    # Checking the budget limit
+                    player_team_number = squad.team_count(self.stat(element, "team"))
+                    if self.stat(element, "team") == teams_transfer[transfer.index(player_element)]:
+                        # Check team limit
+                        if player_team_number < 4:
+                            self.replace(transfer, element, player_element, squad, teams_transfer)
+                            break
+                    else:
+                        if player_team_number < 3:
+                            self.replace(transfer, element, player_element, squad, teams_transfer)
+                            break
+
+    def more_loops(self, used_players_elements: list, transfer: list, player_element, max_budget: float,
+                   squad: SquadState, teams_transfer: list) -> None:
+        """
+        Loops after the first loop through players
+
+        :param used_players_elements: A list of the player IDs already used in the loops
+        :type used_players_elements: list
+        :param transfer: The player IDs of the pair
+        :type transfer: list
+        :param player_element: A player ID from the pair
+        :param max_budget: The maximum budget of the pair
+        :type max_budget: float
+        :param squad: The squad the pair is tried in
+        :type squad: SquadState
+        :param teams_transfer: A list of the premier league teams of the players of the pair
+        :type teams_transfer: list
+        :return: None
+        """
+        points = self.calculation_mode_transfer
+        for element in self.elements:
+            if (
+                self.player_checks(element, player_element, used_players_elements)
+                # Check if the name is already in the changing duo
+                and element not in transfer
+                # Check for valid transfer points
+                and self.stat(element, points) > 0
+                # Check for better transfer points
+                and sum([self.stat(pl_element, points) for pl_element in transfer])
+                < self.stat(element, points)
+                + sum([self.stat(pl_element, points) for pl_element in transfer if pl_element != player_element])
+            ):
+                temporary_budget = round(
+                    self.stat(element, "cost")
+                    + sum([self.stat(player, "cost") for player in transfer if player != player_element]),
+                    1
+                )
+                if temporary_budget <= max_budget:
+                    # Checking the budget limit
+                    player_team_number = squad.team_count(self.stat(element, "team"))
+                    if self.stat(element, "team") == teams_transfer[transfer.index(player_element)]:
+                        # Check team limit
+                        if player_team_number < 4:
+                            self.replace(transfer, element, player_element, squad, teams_transfer)
+                            break
+                    else:
+                        if self.stat(element, "team") in teams_transfer:
+                            # Check for players on the team limit in order to pick the best ones in the next loop
+                            for pl_element in transfer:
+                                if (
+                                    pl_element != player_element
+                                    # Check for better transfer points
+                                    and self.stat(pl_element, points) > self.stat(element, points) > 0
+                                    # Check team limit
+                                    and player_team_number > 2
+                                    # Don't enter the name twice in the list
+                                    and element not in used_players_elements
+                                ):
+                                    used_players_elements.append(element)
+                                elif (
+                                    pl_element != player_element
+                                    # Check for better transfer points
+                                    and 0 < self.stat(pl_element, points) < self.stat(element, points)
+                                    # Check team limit
+                                    and player_team_number > 2
+                                    # Don't enter the name twice in the list
+                                    and pl_element not in used_players_elements
+                                ):
+                                    used_players_elements.append(pl_element)
+                        if player_team_number < 3:
+                            self.replace(transfer, element, player_element, squad, teams_transfer)
+                            break
+
+
+def single_transfer_suggestions(players: PlayerTable, squad: SquadState, unavailable_players_elements: list,
+                                starters_budget: float, max_budget: float, top: int = TOP_SINGLE_TRANSFERS) -> list:
+    """
+    Finds the best single transfers for every player of the team at once. The position, transfer points, budget,
+    team limit and availability checks are masks of squad players x all players, and the value possibilities of every
+    pair come from one array operation
+
+    :param players: The player table
+    :type players: PlayerTable
+    :param squad: The squad of the team
+    :type squad: SquadState
+    :param unavailable_players_elements: The excluded player IDs
+    :type unavailable_players_elements: list
+    :param starters_budget: The budget used for the team's players
+    :type starters_budget: float
+    :param max_budget: The maximum budget of the team's players
+    :type max_budget: float
+    :param top: The number of suggestions per player
+    :type top: int
+    :return: A list (in the order of the squad) of dictionaries of the player leaving ('out'), the players that can
+    come in ('in') and their value possibilities ('value_possibility'), sorted by value possibility (descending)
+    """
+    columns = players.columns
+    elements = np.asarray(columns["id_x"])
+    positions = np.asarray(columns["position"])
+    costs = np.asarray(columns["cost"], dtype=float)
+    transfer_points = np.asarray(columns["transfer_points"], dtype=float)
+    point_calculation = np.asarray(columns["point_calculation"], dtype=float)
+    club_names, clubs = np.unique(np.asarray(columns["team"]), return_inverse=True)
+    club_counts = np.array([squad.team_count(club) for club in club_names])
+
+    team = squad.players()
+    team_rows = np.array([players.rows[player[0]] for player in team])
+    team_scores = np.array([player[4] for player in team], dtype=float)
+    available = ~np.isin(elements, squad.elements() + list(unavailable_players_elements))
+
+    mask = (
+        available[None, :]
+        & (positions[None, :] == positions[team_rows][:, None])
+        # Check for better transfer points
+        & (transfer_points[None, :] >= team_scores[:, None])
+        # Checking the budget limit
+        & (np.round(starters_budget + costs[None, :] - costs[team_rows][:, None], 1) <= max_budget)
+        # Check team limit (a player of the same team takes the place of the one leaving)
+        & ((clubs[None, :] == clubs[team_rows][:, None]) | (club_counts[clubs] < 3)[None, :])
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value_possibility = np.round(
+            transfer_points[None, :] / (transfer_points[None, :] + point_calculation[team_rows][:, None]) * 100, 2
+        )
+    value_possibility = np.where(mask, value_possibility, -np.inf)
+
+    suggestions = []
+    for i, player in enumerate(team):
+        count = min(top, int(mask[i].sum()))
+        best = np.argpartition(-value_possibility[i], count - 1)[:count] if count > 0 else np.array([], dtype=int)
+        best = best[np.argsort(-value_possibility[i, best], kind="stable")]
+        suggestions.append({
+            "out": player[0],
+            "in": elements[best].tolist(),
+            "value_possibility": value_possibility[i, best].tolist(),
+        })
+    return suggestions
+
+
+def init_worker(search: DoubleTransferSearch) -> None:
+    """
+    Keeps the search in the worker process, so that the player table is sent once per worker instead of once per pair
+
+    :param search: The search of the double transfers
+    :type search: DoubleTransferSearch
+    :return: None
+    """
+    global worker_search
+    worker_search = search
+
+
+def search_pair(pair: list) -> dict:
+    """
+    Searches a pair in a worker process
+
+    :param pair: The player IDs of the two players leaving
+    :type pair: list
+    :return: The result of DoubleTransferSearch.search
+    """
+    return worker_search.search(pair)
+
+
+def search_double_transfers(search: DoubleTransferSearch, pairs: list, processes: int = MAX_PROCESSES) -> list:
+    """
+    Searches every pair (in parallel processes if more than 1) and ranks the results by value possibility
+
+    :param search: The search of the double transfers
+    :type search: DoubleTransferSearch
+    :param pairs: The pairs of player IDs of the team
+    :type pairs: list
+    :param processes: The number of worker processes
+    :type processes: int
+    :return: A list of the results of DoubleTransferSearch.search sorted by value possibility (descending)
+    """
+    if processes > 1 and len(pairs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(pairs)), initializer=init_worker,
+                                 initargs=(search,)) as executor:
+            results = list(executor.map(search_pair, pairs))
+    else:
+        results = [search.search(pair) for pair in pairs]
+    return sorted(results, key=lambda result: result["value_possibility"], reverse=True)
+
+
+def plan_transfers(players: PlayerTable, squad: SquadState, unavailable_players_elements: list, bank_budget: float,
+                   mode: str, free_transfers: int = 1, max_transfers: int = MAX_TRANSFERS, top: int = TOP_MOVE_SETS,
+                   node_limit: int = NODE_LIMIT) -> dict:
+    """
+    Finds the best sets of 1 to 'max_transfers' transfers for the team, with HIT_COST points taken off for every
+    transfer over the free transfers. Every player of the team can be replaced by a player of the same position, as
+    long as the bank covers the move set and no premier league team has more than 3 players. The search is a
+    branch-and-bound over the players of every position sorted by score: a branch stops as soon as even the best
+    players of the positions left can't beat the worst of the best move sets found
+
+    :param players: The player table
+    :type players: PlayerTable
+    :param squad: The squad of the team
+    :type squad: SquadState
+    :param unavailable_players_elements: The excluded player IDs
+    :type unavailable_players_elements: list
+    :param bank_budget: The budget left in the bank
+    :type bank_budget: float
+    :param mode: Option between 'normal' and 'free_hit' that determines the points used
+    :type mode: str
+    :param free_transfers: The number of transfers without a hit
+    :type free_transfers: int
+    :param max_transfers: The maximum number of transfers of a move set
+    :type max_transfers: int
+    :param top: The number of move sets returned
+    :type top: int
+    :param node_limit: The number of explored move sets after which the search stops
+    :type node_limit: int
+    :return: A dictionary of the best move sets (sorted by net gain) under 'move_sets' and whether the search was
+    completed under 'complete'. Every move set is a dictionary of the players leaving ('out'), the players coming in
+    ('in'), the number of transfers, the hit points, the gain, the net gain and the bank after the move set
+    """
+    calculation_mode = ""
+    if mode == "normal":
+        calculation_mode = "point_calculation"
+    elif mode == "free_hit":
+        calculation_mode = "captain_points"
+    return search_move_sets(players, squad, players.columns[calculation_mode], unavailable_players_elements,
+                            bank_budget, free_transfers=free_transfers, max_transfers=max_transfers, top=top,
+                            node_limit=node_limit)
+
+
+def search_move_sets(players: PlayerTable, squad: SquadState, scores, unavailable_players_elements: list,
+                     bank_budget: float, free_transfers: int = 1, max_transfers: int = MAX_TRANSFERS,
+                     top: int = TOP_MOVE_SETS, node_limit: int = NODE_LIMIT) -> dict:
+    """
+    The search of plan_transfers for any score of the players
+
+    :param players: The player table
+    :type players: PlayerTable
+    :param squad: The squad of the team
+    :type squad: SquadState
+    :param scores: The score of every player (in the order of the player table)
+    :param unavailable_players_elements: The excluded player IDs
+    :type unavailable_players_elements: list
+    :param bank_budget: The budget left in the bank
+    :type bank_budget: float
+    :param free_transfers: The number of transfers without a hit
+    :type free_transfers: int
+    :param max_transfers: The maximum number of transfers of a move set
+    :type max_transfers: int
+    :param top: The number of move sets returned
+    :type top: int
+    :param node_limit: The number of explored move sets after which the search stops
+    :type node_limit: int
+    :return: The dictionary of plan_transfers
+    """
+    columns = players.columns
+    elements = np.asarray(columns["id_x"])
+    positions = np.asarray(columns["position"])
+    clubs = np.asarray(columns["team"])
+    costs = np.rint(np.asarray(columns["cost"], dtype=float) * 10).astype(np.int64)
+    scores = np.asarray(scores, dtype=float)
+
+    # The players that can come in, per position and sorted by score (and cost for equal scores)
+    available = np.isfinite(scores) & ~np.isin(elements, squad.elements() + list(unavailable_players_elements))
+    candidates = {}
+    for position in fploptimizer.POSITIONS:
+        rows = np.flatnonzero(available & (positions == position))
+        rows = rows[np.lexsort((costs[rows], -scores[rows]))]
+        candidates[position] = (elements[rows].tolist(), scores[rows].tolist(), costs[rows].tolist(),
+                                clubs[rows].tolist())
+
+    # The players that can leave
+    team = []
+    for element in squad.elements():
+        row = players.rows[element]
+        team.append((element, positions[row], clubs[row], int(costs[row]), float(scores[row])))
+    # Best gain and most money freed by replacing every player of the team
+    best_gains = []
+    best_savings = []
+    for element, position, club, cost, score in team:
+        position_scores, position_costs = candidates[position][1], candidates[position][2]
+        best_gains.append(position_scores[0] - score if position_scores else -np.inf)
+        best_savings.append(max(0, cost - min(position_costs)) if position_costs else 0)
+
+    max_transfers = min(max_transfers, len(team))
+    club_count = dict(squad.team_counts)
+    # Number of players per club from every player of the team to the end (a club can go over the limit while a move
+    # set is open, as long as enough of its players are left to leave)
+    clubs_left = [{} for _ in range(len(team) + 1)]
+    for i in range(len(team) - 1, -1, -1):
+        clubs_left[i] = dict(clubs_left[i + 1])
+        clubs_left[i][team[i][2]] = clubs_left[i].get(team[i][2], 0) + 1
+    # Number of players over the limit of every club together
+    overflow = [0]
+    moves = []
+    best = []
+    nodes = [0]
+
+    def hit(transfer_number: int) -> int:
+        return HIT_COST if transfer_number > free_transfers else 0
+
+    def later_bound(start: int, transfer_number: int) -> float:
+        # The best net gain of the transfers after this one: the best gains of the players left, with the free
+        # transfers given to the biggest ones
+        transfers_left = max_transfers - transfer_number
+        free_left = max(0, free_transfers - transfer_number)
+        gains = sorted(best_gains[start:], reverse=True)[:transfers_left]
+        return sum(max(0.0, gain - (0 if n < free_left else HIT_COST)) for n, gain in enumerate(gains))
+
+    def later_savings(start: int, transfer_number: int) -> int:
+        # The most money the transfers after this one can free
+        return sum(sorted(best_savings[start:], reverse=True)[:max_transfers - transfer_number])
+
+    def threshold() -> float:
+        return best[0][0] if len(best) == top else -np.inf
+
+    def record(net_gain: float, gain: float, hits: int, budget_left: int) -> None:
+        move_set = {
+            "out": [team[i][0] for i, j in moves],
+            "in": [candidates[team[i][1]][0][j] for i, j in moves],
+            "transfers": len(moves),
+            "hits": hits,
+            "gain": gain,
+            "net_gain": net_gain,
+            "bank": round(budget_left / 10, 1),
+        }
+        entry = (net_gain, -nodes[0], move_set)
+        if len(best) < top:
+            heapq.heappush(best, entry)
+        else:
+            heapq.heappushpop(best, entry)
+
+    def search(start: int, gain: float, hits: int, budget_left: int, last_candidate: dict) -> bool:
+        # Returns False when the node limit is reached
+        transfer_number = len(moves) + 1
+        if transfer_number > max_transfers:
+            return True
+        for i in range(start, len(team)):
+            element, position, club, cost, score = team[i]
+            bound = later_bound(i + 1, transfer_number)
+            savings = later_savings(i + 1, transfer_number)
+            candidate_elements, candidate_scores, candidate_costs, candidate_clubs = candidates[position]
+            transfer_hit = hit(transfer_number)
+            club_count[club] -= 1
+            club_overflow = 1 if club_count[club] >= fploptimizer.MAX_PLAYERS_PER_TEAM else 0
+            overflow[0] -= club_overflow
+            for j in range(last_candidate.get(position, -1) + 1, len(candidate_elements)):
+                new_gain = gain + candidate_scores[j] - score
+                # The scores only get worse for the next players, so the rest of the players are skipped
+                if new_gain - hits - transfer_hit + bound <= threshold() + fploptimizer.SCORE_TOLERANCE:
+                    break
+                new_budget = budget_left + cost - candidate_costs[j]
+                candidate_club = candidate_clubs[j]
+                # Players of the club over the limit after the transfer, which the next transfers need to take out
+                candidate_overflow = club_count.get(candidate_club, 0) + 1 - fploptimizer.MAX_PLAYERS_PER_TEAM
+                if (
+                    new_budget + savings < 0
+                    or candidate_overflow > clubs_left[i + 1].get(candidate_club, 0)
+                    or overflow[0] + (candidate_overflow > 0) > max_transfers - transfer_number
+                ):
+                    continue
+                nodes[0] += 1
+                if nodes[0] > node_limit:
+                    club_count[club] += 1
+                    overflow[0] += club_overflow
+                    return False
+                club_count[candidate_club] = club_count.get(candidate_club, 0) + 1
+                overflow[0] += candidate_overflow > 0
+                moves.append((i, j))
+                previous_candidate = last_candidate.get(position, -1)
+                last_candidate[position] = j
+                # Only the finished squad needs to respect the club limit
+                if new_budget >= 0 and overflow[0] == 0:
+                    record(new_gain - hits - transfer_hit, new_gain, hits + transfer_hit, new_budget)
+                complete = search(i + 1, new_gain, hits + transfer_hit, new_budget, last_candidate)
+                last_candidate[position] = previous_candidate
+                moves.pop()
+                club_count[candidate_club] -= 1
+                overflow[0] -= candidate_overflow > 0
+                if not complete:
+                    club_count[club] += 1
+                    overflow[0] += club_overflow
+                    return False
+            club_count[club] += 1
+            overflow[0] += club_overflow
+        return True
+
+    complete = search(0, 0.0, 0, int(round(bank_budget * 10)), {})
+    move_sets = [entry[2] for entry in sorted(best, key=lambda entry: (-entry[0], -entry[1]))]
+    return {"move_sets": move_sets, "complete": complete}
+
+
+def plan_gameweeks(players: PlayerTable, squad: SquadState, gameweek_scores: np.ndarray,
+                   unavailable_players_elements: list, bank_budget: float, free_transfers: int = 1,
+                   max_transfers: int = MAX_WEEKLY_TRANSFERS, move_sets: int = WEEKLY_MOVE_SETS,
+                   beam_width: int = BEAM_WIDTH) -> dict:
+    """
+    Plans the transfers of the next Gameweeks with a beam search. Every plan either rolls its free transfer (up to
+    MAX_FREE_TRANSFERS) or makes one of the best move sets of search_move_sets, scored by the points the players make
+    in the Gameweeks left. The plans with the same squad and free transfers are merged into the best one, and only
+    the 'beam_width' plans with the most points (including the points their squad makes in the Gameweeks left) are
+    kept for the next Gameweek. The points of a squad in a Gameweek are the points of its best starting 11 (see
+    starting_points), so bench players don't count
+
+    :param players: The player table
+    :type players: PlayerTable
+    :param squad: The squad of the team
+    :type squad: SquadState
+    :param gameweek_scores: The points of every player (in the order of the player table) per Gameweek
+    :type gameweek_scores: np.ndarray
+    :param unavailable_players_elements: The excluded player IDs
+    :type unavailable_players_elements: list
+    :param bank_budget: The budget left in the bank
+    :type bank_budget: float
+    :param free_transfers: The number of free transfers of the first Gameweek
+    :type free_transfers: int
+    :param max_transfers: The maximum number of transfers per Gameweek
+    :type max_transfers: int
+    :param move_sets: The number of move sets tried for every plan and Gameweek
+    :type move_sets: int
+    :param beam_width: The number of plans kept after every Gameweek
+    :type beam_width: int
+    :return: A dictionary of the Gameweeks of the best plan under 'gameweeks', its total points under 'points' and
+    whether every search was completed under 'complete'. Every Gameweek is a dictionary of the players leaving
+    ('out'), the players coming in ('in'), the hit points, the free transfers available, the bank after the
+    transfers and the points of the starting 11 minus the hits
+    """
+    columns = players.columns
+    gameweek_scores = np.asarray(gameweek_scores, dtype=float)
+    # Points of every player from every Gameweek to the end of the period (the last column is 0)
+    scores_left = np.cumsum(gameweek_scores[:, ::-1], axis=1)[:, ::-1]
+    scores_left = np.concatenate([scores_left, np.zeros((len(gameweek_scores), 1))], axis=1)
+    plans = [{"squad": squad.copy(), "bank": round(bank_budget, 1), "free_transfers": free_transfers,
+              "points": 0.0, "gameweeks": []}]
+    complete = True
+
+    for gw in range(gameweek_scores.shape[1]):
+        next_plans = {}
+        for plan in plans:
+            result = search_move_sets(
+                players, plan["squad"], scores_left[:, gw], unavailable_players_elements, plan["bank"],
+                free_transfers=plan["free_transfers"], max_transfers=max_transfers, top=move_sets,
+                node_limit=WEEKLY_NODE_LIMIT
+            )
+            complete = complete and result["complete"]
+            # Rolling the free transfer
+            roll = {"out": [], "in": [], "transfers": 0, "hits": 0, "bank": plan["bank"]}
+            for move_set in [roll] + result["move_sets"]:
+                new_squad = plan["squad"].copy()
+                for out_element, in_element in zip(move_set["out"], move_set["in"]):
+                    row = players.rows[in_element]
+                    new_squad.swap(out_element, in_element, columns["position"][row], columns["team"][row],
+                                   round(float(columns["cost"][row]), 1), float(scores_left[row, gw]))
+                rows = [players.rows[element] for element in new_squad.elements()]
+                squad_points = starting_points(columns["position"][rows], gameweek_scores[rows, gw:])
+                gameweek_points = float(squad_points[0]) - move_set["hits"]
+                next_free_transfers = min(
+                    MAX_FREE_TRANSFERS, max(plan["free_transfers"] - move_set["transfers"], 0) + 1
+                )
+                next_plan = {
+                    "squad": new_squad,
+                    "bank": move_set["bank"],
+                    "free_transfers": next_free_transfers,
+                    "points": plan["points"] + gameweek_points,
+                    "gameweeks": plan["gameweeks"] + [{
+                        "out": list(move_set["out"]),
+                        "in": list(move_set["in"]),
+                        "hits": move_set["hits"],
+                        "free_transfers": plan["free_transfers"],
+                        "bank": move_set["bank"],
+                        "points": gameweek_points,
+                    }],
+                    # Points so far plus the points the squad makes in the Gameweeks left
+                    "projection": plan["points"] + gameweek_points + float(squad_points[1:].sum()),
+                }
+                key = (frozenset(new_squad.elements()), next_free_transfers)
+                if (
+                    key not in next_plans
+                    or (next_plan["points"], next_plan["bank"])
+                    > (next_plans[key]["points"], next_plans[key]["bank"])
+                ):
+                    next_plans[key] = next_plan
+        plans = sorted(next_plans.values(), key=lambda plan: plan["projection"], reverse=True)[:beam_width]
+
+    best_plan = max(plans, key=lambda plan: plan["points"])
+    return {"gameweeks": best_plan["gameweeks"], "points": best_plan["points"], "complete": complete}
+
+
+def starting_points(positions, points: np.ndarray) -> np.ndarray:
+    """
+    Calculates the points of the best starting 11 of a squad in every Gameweek: the best players of every position
+    for the best of the valid systems (fploptimizer.valid_systems). A squad that can't field any system (e.g. one
+    with fewer than 11 players) gets the points of all its players
+
+    :param positions: The position of every player of the squad
+    :param points: An array of the points of every player of the squad per Gameweek
+    :type points: np.ndarray
+    :return: An array of the points of the best starting 11 per Gameweek
+    """
+    positions = np.asarray(positions)
+    points = np.asarray(points, dtype=float)
+    # Points of the best n players of every position (row n holds the sum of the best n)
+    best_sums = {}
+    for position in fploptimizer.POSITIONS:
+        position_points = -np.sort(-points[positions == position], axis=0)
+        best_sums[position] = np.concatenate([np.zeros((1, points.shape[1])), np.cumsum(position_points, axis=0)])
+    system_points = [
+        best_sums["GKP"][1] + best_sums["DEF"][system[0]] + best_sums["MID"][system[1]] + best_sums["FWD"][system[2]]
+        for system in fploptimizer.valid_systems()
+        if (
+            len(best_sums["GKP"]) > 1 and len(best_sums["DEF"]) > system[0] and len(best_sums["MID"]) > system[1]
+            and len(best_sums["FWD"]) > system[2]
+        )
+    ]
+    if len(system_points) == 0:
+        return points.sum(axis=0)
+    return np.max(system_points, axis=0)
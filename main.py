@@ -1,11 +1,14 @@
 import requests.exceptions
 
+import os
 import fplapi
+from fplhttp import client
 from fplteam import FPLteam
 from fplstats import FPLstats
 import time
 import logos
 from getpass import getpass
+from multiprocessing import freeze_support
 
 
 def menu() -> None:
@@ -270,5 +273,11 @@ def user_get_password() -> str:
     return password
 
 
-logos.print_header()
-menu()
+if __name__ == "__main__":
+    # The worker processes of the transfer suggestions import this module again (and the .exe runs it again)
+    freeze_support()
+    logos.print_header()
+    menu()
+    if os.environ.get("FPL_HTTP_STATS", "") == "1":
+        # Requests, bytes and time per endpoint of the session
+        print("\n" + client.report())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from fplsquad import SquadState
+
+POSITIONS = ["GKP", "DEF", "MID", "FWD"]
+CLUBS = ["ARS", "CHE", "LIV", "MCI", "TOT", "NEW"]
+
+
+def random_player_data(rng: np.random.Generator, player_number: int = 40) -> pd.DataFrame:
+    """
+    Creates the player data of a small random league
+
+    :param rng: The random generator
+    :type rng: np.random.Generator
+    :param player_number: The number of players
+    :type player_number: int
+    :return: A dataframe with the columns the player table, the searches and the optimizer use
+    """
+    return pd.DataFrame({
+        "id_x": np.arange(1, player_number + 1),
+        "name": [f"Player {element}" for element in range(1, player_number + 1)],
+        "position": [POSITIONS[row % len(POSITIONS)] for row in range(player_number)],
+        "team": rng.choice(CLUBS, size=player_number),
+        "cost": rng.integers(40, 110, size=player_number) / 10,
+        "point_calculation": np.round(rng.uniform(1, 50, size=player_number), 1),
+        "captain_points": np.round(rng.uniform(1, 50, size=player_number), 1),
+        "transfer_points": np.round(rng.uniform(1, 50, size=player_number), 1),
+    })
+
+
+def random_squad(rng: np.random.Generator, player_data: pd.DataFrame, size: int = 11,
+                 score: str = "point_calculation") -> SquadState:
+    """
+    Picks a random squad with at most 3 players per club
+
+    :param rng: The random generator
+    :type rng: np.random.Generator
+    :param player_data: The dataframe of random_player_data
+    :type player_data: pd.DataFrame
+    :param size: The number of players
+    :type size: int
+    :param score: The score of the squad players
+    :type score: str
+    :return: The SquadState
+    """
+    squad = SquadState()
+    for row in rng.permutation(len(player_data)):
+        if len(squad) == size:
+            break
+        if squad.team_count(player_data["team"][row]) < 3:
+            squad.add(int(player_data["id_x"][row]), player_data["position"][row], player_data["team"][row],
+                      float(player_data["cost"][row]), float(player_data[score][row]))
+    return squad
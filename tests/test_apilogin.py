@@ -0,0 +1,67 @@
+import time
+
+import apilogin
+import fplapi
+
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def saved_login(tmp_path, refresh_token="refresh"):
+    store = apilogin.TokenStore(str(tmp_path / "tokens.json"))
+    store.save("user@example.com", "password", {"access_token": "revoked", "refresh_token": refresh_token,
+                                                "expires_in": 3600}, 7)
+    return apilogin.Login("user@example.com", "password", token_store=store)
+
+
+def test_rejected_token_is_refreshed(tmp_path, monkeypatch):
+    login = saved_login(tmp_path)
+    monkeypatch.setattr(apilogin.Login, "refresh", staticmethod(lambda token: {"access_token": "new",
+                                                                                "expires_in": 3600}))
+    api = object.__new__(fplapi.FPLapi.__wrapped__)
+    api.apilogin = login
+    tokens = []
+
+    def get(url, headers):
+        tokens.append(headers["X-API-Authorization"])
+        return Response(401 if headers["X-API-Authorization"] == "Bearer revoked" else 200)
+
+    monkeypatch.setattr(fplapi.client, "get", get)
+
+    assert api.authorized_get("https://example.com/my-team/7").status_code == 200
+    assert tokens == ["Bearer revoked", "Bearer new"]
+    entry = login.token_store.load("user@example.com", "password")
+    assert entry["access_token"] == "new" and entry["expires_at"] > time.time()
+
+
+def test_rejected_refresh_falls_back_to_the_login(tmp_path, monkeypatch):
+    login = saved_login(tmp_path)
+
+    def refresh(token):
+        raise apilogin.requests.exceptions.HTTPError("revoked")
+
+    def sign_in(self, username, password):
+        self.team_id = 7
+        return {"access_token": "signed", "refresh_token": "new refresh", "expires_in": 3600}
+
+    monkeypatch.setattr(apilogin.Login, "refresh", staticmethod(refresh))
+    monkeypatch.setattr(apilogin.Login, "sign_in", sign_in)
+    api = object.__new__(fplapi.FPLapi.__wrapped__)
+    api.apilogin = login
+    monkeypatch.setattr(fplapi.client, "get", lambda url, headers: Response(
+        200 if headers["X-API-Authorization"] == "Bearer signed" else 403))
+
+    assert api.authorized_get("https://example.com/my-team/7").status_code == 200
+    assert login.token_store.load("user@example.com", "password")["refresh_token"] == "new refresh"
+
+
+def test_gives_up_after_the_login(tmp_path, monkeypatch):
+    login = saved_login(tmp_path, refresh_token=None)
+    monkeypatch.setattr(apilogin.Login, "sign_in", lambda self, username, password: {"access_token": "signed"})
+    api = object.__new__(fplapi.FPLapi.__wrapped__)
+    api.apilogin = login
+    monkeypatch.setattr(fplapi.client, "get", lambda url, headers: Response(401))
+
+    assert api.authorized_get("https://example.com/my-team/7").status_code == 401
@@ -0,0 +1,20 @@
+import time
+
+import fplapi
+
+
+def test_player_histories_arrive_as_they_finish_and_keep_the_shared_rate(monkeypatch):
+    delays = {1: 0.3, 2: 0.0, 3: 0.1}
+
+    def history(player_id):
+        time.sleep(delays[player_id])
+        return {"player": player_id}
+
+    monkeypatch.setattr(fplapi, "fpl_player_history_all", history)
+    shared_rate = fplapi.rate_limiter.rate
+
+    histories = list(fplapi.fetch_player_histories([1, 2, 3], max_workers=3, requests_per_second=1))
+
+    assert [player_id for player_id, player_history in histories] == [2, 3, 1]
+    assert all(player_history == {"player": player_id} for player_id, player_history in histories)
+    assert fplapi.rate_limiter.rate == shared_rate
@@ -0,0 +1,38 @@
+import numpy as np
+
+import fplbatch
+from fplstats import PlayerTable
+from fpl_data import random_player_data, random_squad
+
+
+def test_result_file_names_stay_in_the_output_directory():
+    assert fplbatch.result_file_name({"team_id": 1, "name": "../../etc/passwd"}) == "001_etc_passwd.json"
+    assert fplbatch.result_file_name({"team_id": 2, "name": "a/b"}) == "002_a_b.json"
+    assert fplbatch.result_file_name({"team_id": 3, "name": "a/b"}) == "003_a_b.json"
+    assert fplbatch.result_file_name({"team_id": 4, "name": "..."}) == "004_team.json"
+
+
+def test_a_failing_team_is_reported_in_its_result():
+    player_data = random_player_data(np.random.default_rng(0), player_number=60)
+    fplbatch.init_worker(PlayerTable(player_data), None)
+
+    result = fplbatch.analyze_team({"team_id": 1, "name": "broken", "elements": list(range(1, 12)), "bank": "x"})
+
+    assert result["team_id"] == 1
+    assert result["error"].startswith("ValueError")
+
+
+def test_team_result_uses_the_team_prices():
+    rng = np.random.default_rng(1)
+    player_data = random_player_data(rng, player_number=60)
+    player_data["team"] = [f"Club {row % 20}" for row in range(60)]
+    squad = random_squad(rng, player_data, size=11)
+    elements = squad.elements()
+    fplbatch.init_worker(PlayerTable(player_data), None)
+
+    result = fplbatch.analyze_team({"team_id": 1, "name": "main", "elements": elements,
+                                    "prices": [5.0] * 11, "bank": 1.0})
+
+    assert "error" not in result
+    assert result["team_value"] == 55.0
+    assert [player["price"] for player in result["team"]] == [5.0] * 11
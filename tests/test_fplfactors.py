@@ -0,0 +1,72 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from fplfactors import FactorStore, fit_gameweeks
+from fplscoring import HISTORY_FIELDS
+
+FINISHED_GAMEWEEKS = {1: "2024-08-16T19:00:00Z", 2: "2024-08-24T11:30:00Z"}
+
+
+def random_histories(rng, player_number=30):
+    histories = {}
+    for player_id in range(1, player_number + 1):
+        histories[player_id] = {}
+        for gw in FINISHED_GAMEWEEKS:
+            if rng.random() < 0.2:
+                # No fixture in the GW
+                continue
+            history = {field: float(rng.uniform(0.5, 15)) for field in HISTORY_FIELDS}
+            history["date"] = f"2024-08-{17 + 8 * (gw - 1)}T14:00:00Z"
+            histories[player_id][gw] = history
+    return histories
+
+
+def collect(store, histories, player_ids, update_gws, fdr):
+    for player_id in player_ids:
+        for gw in update_gws:
+            store.add(gw, player_id, histories[player_id].get(int(gw)), fdr[player_id])
+
+
+def update(store, update_gws, fitter):
+    fitted_gameweeks = fit_gameweeks(store, update_gws, fitter, processes=1)
+    for gw in update_gws:
+        gw_factors, last_date = fitted_gameweeks[gw]
+        store.commit(gw, gw_factors, last_date or FINISHED_GAMEWEEKS[int(gw)])
+
+
+@pytest.mark.parametrize("fitter", ["incremental", "least_squares"])
+def test_resumed_update_matches_an_uninterrupted_one(tmp_path, fitter):
+    rng = np.random.default_rng(0)
+    histories = random_histories(rng)
+    player_ids = sorted(histories)
+    fdr = {player_id: float(rng.integers(1, 6)) for player_id in player_ids}
+
+    store = FactorStore(str(tmp_path / "factors.json"), str(tmp_path / "checkpoint.json"))
+    update_gws = store.update_gameweeks(FINISHED_GAMEWEEKS)
+    collect(store, histories, player_ids, update_gws, fdr)
+    update(store, update_gws, fitter)
+
+    # The same update, interrupted after 12 players
+    factors_path = str(tmp_path / "resumed_factors.json")
+    checkpoint_path = str(tmp_path / "resumed_checkpoint.json")
+    store = FactorStore(factors_path, checkpoint_path)
+    update_gws = store.update_gameweeks(FINISHED_GAMEWEEKS)
+    collect(store, histories, player_ids[:12], update_gws, fdr)
+    store.save_checkpoint()
+
+    store = FactorStore(factors_path, checkpoint_path)
+    update_gws = store.update_gameweeks(FINISHED_GAMEWEEKS)
+    missing_players = store.missing_players(player_ids, update_gws)
+    assert missing_players == player_ids[12:]
+    # The players arrive in any order
+    collect(store, histories, missing_players[::-1], update_gws, fdr)
+    update(store, update_gws, fitter)
+
+    assert not os.path.exists(checkpoint_path)
+    with open(tmp_path / "factors.json", "r") as file:
+        expected = json.load(file)
+    with open(factors_path, "r") as file:
+        assert json.load(file) == expected
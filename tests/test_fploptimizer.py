@@ -0,0 +1,63 @@
+from itertools import combinations, product
+
+import numpy as np
+import pytest
+
+import fploptimizer
+
+POOL_SIZES = {"GKP": 3, "DEF": 6, "MID": 6, "FWD": 5}
+
+
+def random_pool(rng):
+    positions = [position for position, size in POOL_SIZES.items() for _ in range(size)]
+    return {
+        "elements": np.arange(1, len(positions) + 1),
+        "positions": np.array(positions),
+        "teams": rng.choice(["ARS", "CHE", "LIV", "MCI"], size=len(positions)),
+        "costs": rng.integers(40, 120, size=len(positions)) / 10,
+        "scores": np.round(rng.uniform(1, 50, size=len(positions)), 1),
+    }
+
+
+def brute_force(pool, system, budget):
+    """
+    Best total score of every valid starting 11 of the system (None if none fits)
+    """
+    rows = {position: np.flatnonzero(pool["positions"] == position) for position in fploptimizer.POSITIONS}
+    counts = [1] + list(system)
+    best = None
+    for picks in product(*[combinations(rows[position], count)
+                           for position, count in zip(fploptimizer.POSITIONS, counts)]):
+        team = [row for position_picks in picks for row in position_picks]
+        clubs = list(pool["teams"][team])
+        if max(clubs.count(club) for club in clubs) > fploptimizer.MAX_PLAYERS_PER_TEAM:
+            continue
+        if np.rint(pool["costs"][team] * 10).sum() > round(budget * 10):
+            continue
+        score = pool["scores"][team].sum()
+        if best is None or score > best:
+            best = score
+    return best
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_optimize_squad_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    pool = random_pool(rng)
+    system = [[3, 4, 3], [4, 4, 2], [5, 3, 2], [4, 5, 1]][seed % 4]
+    budget = float(rng.integers(700, 1000)) / 10
+    candidates = fploptimizer.SquadCandidates(pool["elements"], pool["positions"], pool["teams"], pool["costs"],
+                                              pool["scores"])
+
+    result = fploptimizer.optimize_squad(candidates, system, budget)
+    expected = brute_force(pool, system, budget)
+
+    if expected is None:
+        assert result is None
+        return
+    assert result["optimal"]
+    assert result["score"] == pytest.approx(expected)
+    rows = [element - 1 for element in result["elements"]]
+    assert len(set(rows)) == 11
+    assert np.rint(pool["costs"][rows] * 10).sum() <= round(budget * 10)
+    assert result["score"] == pytest.approx(pool["scores"][rows].sum())
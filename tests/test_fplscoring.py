@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fplscoring import FACTOR_NAMES, ScoringEngine, average_factors, normalize
+
+
+def random_stats(rng, player_number=50):
+    return pd.DataFrame({
+        "total_points": rng.integers(5, 200, player_number).astype(float),
+        "value_season": rng.uniform(0.5, 30, player_number),
+        "points_per_game": rng.uniform(0.5, 9, player_number),
+        "form_new": rng.uniform(0.1, 12, player_number),
+        "bonus_new": rng.uniform(0.5, 30, player_number),
+        "cost": rng.uniform(4, 14, player_number),
+        "fdr_final": rng.uniform(1, 5, player_number),
+    })
+
+
+def random_factors(rng, gw_number):
+    return {
+        str(gw): {factor_name: float(rng.uniform(-0.5, 1.5)) for factor_name in FACTOR_NAMES}
+        for gw in range(1, gw_number + 1)
+    }
+
+
+def power_formulas(player_data, gw_number, factors_average):
+    """The point formulas as FPLstats calculated them before the scoring engine"""
+    tp, ppg, value, bonus, form, fdr = (factors_average[factor_name] for factor_name in FACTOR_NAMES)
+    return {
+        "point_calculation": (
+            player_data["total_points"] ** tp
+            * player_data["value_season"] ** value
+            * player_data["points_per_game"] ** ppg
+            * player_data["form_new"] ** form
+            * player_data["bonus_new"] ** bonus
+            / player_data["fdr_final"] ** fdr
+        ),
+        "captain_points": (
+            player_data["total_points"] ** (2 * tp)
+            * player_data["points_per_game"] ** ppg
+            * player_data["form_new"] ** form
+            * player_data["bonus_new"] ** bonus
+            / player_data["fdr_final"] ** fdr
+        ),
+        "transfer_points": (
+            np.abs(player_data["total_points"] - 4) ** (tp + value + ppg)
+            * player_data["bonus_new"] ** bonus
+            * np.abs(player_data["form_new"] - (4 / 5.0)) ** form
+            / (player_data["cost"] ** value * player_data["fdr_final"] ** fdr * gw_number ** ppg)
+        ),
+        "manager_points": (
+            player_data["total_points"] ** (3 * tp)
+            * player_data["form_new"] ** form
+            / player_data["fdr_final"] ** fdr
+        ),
+    }
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_engine_matches_the_power_formulas(seed):
+    rng = np.random.default_rng(seed)
+    player_data = random_stats(rng)
+    gw_number = int(rng.integers(4, 30))
+    factors = random_factors(rng, gw_number)
+    first_gw_number = int(rng.integers(1, gw_number))
+    last_gw_number = int(rng.integers(first_gw_number, gw_number + 1))
+
+    factors_average = dict(zip(FACTOR_NAMES, average_factors(factors, first_gw_number, last_gw_number)))
+    expected = power_formulas(player_data, gw_number, factors_average)
+    engine = ScoringEngine(player_data, gw_number)
+    scores = normalize(engine.scores(average_factors(factors, first_gw_number, last_gw_number)))
+
+    for s, score_name in enumerate(engine.score_names):
+        points = expected[score_name].to_numpy()
+        points = points * 100 / (max(points) + 1)
+        assert scores[:, s] == pytest.approx(points, rel=1e-9)
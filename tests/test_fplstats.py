@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fplstats import PlayerTable, PriceOverlay
+from fpl_data import random_player_data
+
+
+def test_price_overlay_leaves_the_shared_data_unchanged():
+    player_data = random_player_data(np.random.default_rng(0))
+    shared_costs = player_data["cost"].copy()
+    prices = PriceOverlay()
+    table = PlayerTable(player_data, prices)
+
+    prices.update({3: 12.3, 7: 4.1})
+    table.reprice()
+
+    assert table.stat(3, "cost") == pytest.approx(12.3)
+    assert table.stat(7, "cost") == pytest.approx(4.1)
+    assert table.stat(4, "cost") == pytest.approx(shared_costs[3])
+    assert player_data["cost"].equals(shared_costs)
+
+    prices.clear()
+    table.reprice()
+    assert table.columns["cost"] == pytest.approx(shared_costs.to_numpy())
+
+
+def test_tables_with_other_prices_share_every_other_column():
+    player_data = random_player_data(np.random.default_rng(1))
+    table = PlayerTable(player_data)
+
+    team_table = table.with_prices(PriceOverlay({5: 15.0}))
+
+    assert team_table.stat(5, "cost") == pytest.approx(15.0)
+    assert table.stat(5, "cost") == pytest.approx(player_data["cost"][4])
+    assert team_table.columns["point_calculation"] is table.columns["point_calculation"]
+
+
+def test_candidates_respect_the_budget_in_price_units():
+    player_data = random_player_data(np.random.default_rng(2))
+    player_data["cost"] = [5.0 if row % 8 < 4 else 5.1 for row in range(40)]
+    table = PlayerTable(player_data)
+
+    # 8.2 - 3.2 is 4.999999999999999 in floats
+    for max_cost in (5.0, 8.2 - 3.2, 5.04):
+        candidates = table.candidates("DEF", "point_calculation", max_cost=max_cost)
+        assert candidates and all(table.stat(element, "cost") == 5.0 for element in candidates)
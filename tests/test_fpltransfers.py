@@ -0,0 +1,119 @@
+from itertools import combinations, product
+
+import numpy as np
+import pytest
+
+import fpltransfers
+from fplstats import PlayerTable
+from fpl_data import random_player_data, random_squad
+
+TOP = 5
+
+
+def brute_force_move_sets(player_data, squad, bank_budget, free_transfers, max_transfers):
+    """
+    Net gains of every valid move set of up to 'max_transfers' transfers, best first
+    """
+    rows = {element: row for row, element in enumerate(player_data["id_x"])}
+    scores = player_data["point_calculation"].to_numpy()
+    costs = np.rint(player_data["cost"].to_numpy() * 10).astype(int)
+    team = squad.elements()
+    budget = int(round(bank_budget * 10))
+    # Every set of players leaving and coming in counts once (whichever player replaces whom)
+    net_gains = {}
+    for transfer_number in range(1, max_transfers + 1):
+        for out_elements in combinations(team, transfer_number):
+            options = [
+                [element for element in player_data["id_x"]
+                 if player_data["position"][rows[element]] == player_data["position"][rows[out_element]]
+                 and element not in team]
+                for out_element in out_elements
+            ]
+            for in_elements in product(*options):
+                if len(set(in_elements)) < transfer_number:
+                    continue
+                new_team = [element for element in team if element not in out_elements] + list(in_elements)
+                clubs = [player_data["team"][rows[element]] for element in new_team]
+                if max(clubs.count(club) for club in set(clubs)) > 3:
+                    continue
+                budget_left = budget + sum(costs[rows[element]] for element in out_elements) - sum(
+                    costs[rows[element]] for element in in_elements)
+                if budget_left < 0:
+                    continue
+                gain = sum(scores[rows[element]] for element in in_elements) - sum(
+                    scores[rows[element]] for element in out_elements)
+                net_gains[(frozenset(out_elements), frozenset(in_elements))] = (
+                    gain - fpltransfers.HIT_COST * max(0, transfer_number - free_transfers)
+                )
+    return sorted(net_gains.values(), reverse=True)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_move_sets_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    player_data = random_player_data(rng, player_number=28)
+    squad = random_squad(rng, player_data, size=8)
+    bank_budget = float(rng.integers(0, 30)) / 10
+    free_transfers = int(rng.integers(1, 3))
+
+    result = fpltransfers.plan_transfers(PlayerTable(player_data), squad, [], bank_budget, "normal",
+                                         free_transfers=free_transfers, max_transfers=2, top=TOP)
+    expected = brute_force_move_sets(player_data, squad, bank_budget, free_transfers, 2)[:TOP]
+
+    assert result["complete"]
+    assert [move_set["net_gain"] for move_set in result["move_sets"]] == pytest.approx(expected)
+
+
+def test_move_sets_swap_players_between_full_clubs():
+    rng = np.random.default_rng(0)
+    player_data = random_player_data(rng, player_number=16)
+    # Three ARS and three CHE players, and a better (cheaper) player of each club for the other's position
+    player_data["team"] = ["ARS", "ARS", "ARS", "CHE", "CHE", "CHE", "CHE", "ARS"] + ["LIV"] * 8
+    player_data["point_calculation"] = [10.0] * 6 + [30.0, 30.0] + [1.0] * 8
+    player_data["cost"] = [5.0] * 6 + [4.5, 4.5] + [5.0] * 8
+    squad = random_squad(np.random.default_rng(1), player_data.iloc[:6].reset_index(drop=True), size=6)
+
+    result = fpltransfers.plan_transfers(PlayerTable(player_data), squad, [], 0.0, "normal", free_transfers=2,
+                                         max_transfers=2, top=1)
+
+    assert sorted(result["move_sets"][0]["in"]) == [7, 8]
+    assert result["move_sets"][0]["net_gain"] == pytest.approx(40.0)
+
+
+def test_starting_points_leave_the_bench_out():
+    positions = ["GKP", "GKP"] + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+    points = np.array([[6, 9], [2, 1], [5, 5], [4, 4], [3, 3], [1, 1], [1, 8],
+                       [7, 7], [6, 6], [5, 5], [1, 1], [0, 0], [9, 9], [8, 8], [2, 2]], dtype=float)
+
+    # GW1: GKP 6, DEF 5+4+3, MID 7+6+5+1, FWD 9+8+2 (3-4-3); GW2: GKP 9, DEF 8+5+4+3, MID 7+6+5, FWD 9+8+2 (4-3-3)
+    assert fpltransfers.starting_points(positions, points).tolist() == pytest.approx([56.0, 66.0])
+
+
+def test_gameweek_plan_scores_the_starting_11():
+    rng = np.random.default_rng(3)
+    player_data = random_player_data(rng, player_number=60)
+    player_data["team"] = [f"Club {row % 20}" for row in range(60)]
+    squad = random_squad(rng, player_data, size=15)
+    gameweek_scores = rng.uniform(0, 10, size=(60, 3))
+    rows = [squad_row for squad_row in range(60) if player_data["id_x"][squad_row] in squad]
+
+    plan = fpltransfers.plan_gameweeks(PlayerTable(player_data), squad, gameweek_scores, [], 0.0,
+                                       max_transfers=0, beam_width=1)
+
+    expected = fpltransfers.starting_points(player_data["position"][rows], gameweek_scores[rows])
+    assert [gameweek["points"] for gameweek in plan["gameweeks"]] == pytest.approx(expected.tolist())
+    assert expected.sum() < gameweek_scores[rows].sum()
+
+
+def test_double_transfers_in_processes_match_the_sequential_search():
+    rng = np.random.default_rng(5)
+    player_data = random_player_data(rng, player_number=40)
+    squad = random_squad(rng, player_data, size=6)
+    search = fpltransfers.DoubleTransferSearch(PlayerTable(player_data), squad, [], 1.5, "normal",
+                                               sorted(set(player_data["team"])))
+    pairs = [list(pair) for pair in combinations(squad.elements(), 2)]
+
+    sequential = fpltransfers.search_double_transfers(search, pairs, processes=1)
+    pooled = fpltransfers.search_double_transfers(search, pairs, processes=2)
+
+    assert pooled == sequential